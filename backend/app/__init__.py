@@ -6,6 +6,7 @@ from flask_cors import CORS
 from flask_migrate import Migrate
 
 from app.models import db, migrate
+from app.models.utils import enable_sqlite_savepoints
 from config.config import get_config
 
 
@@ -46,14 +47,32 @@ def create_app(config_name=None):
     # Register error handlers
     register_error_handlers(app)
     
+    # FinBERT loads lazily on first use; optionally warm it up in the background
+    if config.FINBERT_PRELOAD:
+        from app.services.model_registry import get_model_registry
+        get_model_registry().preload(config)
+    
     # Create database tables (with error handling)
     with app.app_context():
+        # Savepoints (BatchWriter) need explicit transactions on SQLite
+        enable_sqlite_savepoints(db.engine)
+        
         try:
             db.create_all()
             app.logger.info("Database tables created successfully")
         except Exception as e:
             app.logger.warning(f"Could not create database tables: {str(e)}")
             app.logger.info("Application will continue without database for now")
+        
+        # Databases from before company_latest existed need it built once
+        try:
+            from app.models import CompanyLatest
+            written = CompanyLatest.populate_if_empty()
+            if written:
+                app.logger.info(f"Built company_latest for {written} companies")
+        except Exception as e:
+            db.session.rollback()
+            app.logger.warning(f"Could not build company_latest: {str(e)}")
     
     return app
 
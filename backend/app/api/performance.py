@@ -14,6 +14,7 @@ from typing import Dict, Any, List
 from app import db
 from app.models import Company, Transcript, SentimentAnalysis
 from app.services.fmp_client import FMPClient
+from app.services.model_registry import get_model_registry
 from app.services.sentiment_analyzer import SentimentAnalyzer
 from app.services.data_collector import DataCollector
 from config.config import Config
@@ -23,7 +24,7 @@ performance_bp = Blueprint('performance', __name__, url_prefix='/api/performance
 # Initialize services
 config = Config()
 fmp_client = FMPClient(config)
-sentiment_analyzer = SentimentAnalyzer(config)
+sentiment_analyzer = SentimentAnalyzer(config)  # FinBERT loads on the first sentiment test
 
 # Redis client for caching tests
 try:
@@ -108,7 +109,8 @@ def performance_status():
             'service_latencies': {
                 'database_ms': round(db_latency, 2),
                 'redis_ms': round(redis_latency, 2) if redis_latency else None
-            }
+            },
+            'models': get_model_registry().status()
         })
     except Exception as e:
         return jsonify({
@@ -4,11 +4,12 @@ from datetime import datetime, date, timedelta
 import logging
 
 from app.api import api_bp
-from app.models import db, Company, Transcript, SentimentAnalysis, TrendAnalysis, MonthlyReport, Alert, Watchlist
+from app.models import db, Company, CompanyLatest, Transcript, SentimentAnalysis, TrendAnalysis, MonthlyReport, Alert, Watchlist
 from app.services.data_collector import DataCollector
 from app.services.trend_analyzer import TrendAnalyzer
 from app.services.cache_service import get_cache_service
 from sqlalchemy import text
+from sqlalchemy.orm import contains_eager
 
 logger = logging.getLogger(__name__)
 cache = get_cache_service()
@@ -66,14 +67,14 @@ def dashboard():
         
         # Get recent notable companies
         # First get the latest analysis date
-        latest_date = db.session.query(db.func.max(TrendAnalysis.analysis_date)).scalar()
+        latest_date = db.session.query(db.func.max(CompanyLatest.trend_analysis_date)).scalar()
         
         notable = (
-            db.session.query(Company, TrendAnalysis)
-            .join(TrendAnalysis)
-            .filter(TrendAnalysis.analysis_date == latest_date)
-            .filter(db.func.abs(TrendAnalysis.sentiment_change) > 0.2)
-            .order_by(db.func.abs(TrendAnalysis.sentiment_change).desc())
+            db.session.query(Company, CompanyLatest)
+            .join(CompanyLatest)
+            .filter(CompanyLatest.trend_analysis_date == latest_date)
+            .filter(db.func.abs(CompanyLatest.sentiment_change) > 0.2)
+            .order_by(db.func.abs(CompanyLatest.sentiment_change).desc())
             .limit(10)
             .all()
         ) if latest_date else []
@@ -134,8 +135,8 @@ def list_companies():
         sector = request.args.get('sector', '')
         trend = request.args.get('trend', '')
         
-        # Build query
-        query = Company.query
+        # Build query, with each company's latest state from the same row scan
+        query = Company.query.outerjoin(CompanyLatest).options(contains_eager(Company.latest))
         
         if search:
             query = query.filter(
@@ -149,13 +150,19 @@ def list_companies():
             query = query.filter(Company.sector == sector)
         
         if trend:
-            query = query.join(TrendAnalysis).filter(TrendAnalysis.trend_category == trend)
+            query = query.filter(CompanyLatest.trend_category == trend)
         
         # Paginate
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
-            'companies': [company.to_dict(include_latest=True) for company in pagination.items],
+            'companies': [
+                company.to_dict(
+                    include_latest=True,
+                    latest_state=company.latest.to_latest_state() if company.latest else {}
+                )
+                for company in pagination.items
+            ],
             'total': pagination.total,
             'page': page,
             'per_page': per_page,
@@ -489,7 +496,7 @@ def run_collection():
         # For now, just run it
         
         collector = DataCollector()
-        results = collector.run_weekly_collection()
+        results = collector.run_incremental_collection()
         
         return jsonify(results)
         
@@ -509,10 +516,15 @@ def collection_status():
         from app.models import APIUsage
         usage_stats = APIUsage.get_usage_summary(days=7)
         
+        # How far incremental collection has got on each exchange
+        from app.models import CollectionWatermark
+        watermarks = [watermark.to_dict() for watermark in CollectionWatermark.query.all()]
+        
         return jsonify({
             'recent_transcripts': len(recent_transcripts),
             'last_collection': recent_transcripts[0].fmp_fetch_date.isoformat() if recent_transcripts else None,
-            'api_usage': usage_stats
+            'api_usage': usage_stats,
+            'watermarks': watermarks
         })
         
     except Exception as e:
@@ -7,23 +7,31 @@ migrate = Migrate()
 
 # Import all models
 from .company import Company
+from .company_latest import CompanyLatest
 from .transcript import Transcript
+from .transcript_body import TranscriptBody
 from .sentiment import SentimentAnalysis
 from .trend import TrendAnalysis
 from .report import MonthlyReport
 from .api_usage import APIUsage
 from .alert import Alert
 from .watchlist import Watchlist
+from .backfill import BackfillCheckpoint
+from .watermark import CollectionWatermark
 
 __all__ = [
     'db',
     'migrate',
     'Company',
+    'CompanyLatest',
     'Transcript',
+    'TranscriptBody',
     'SentimentAnalysis', 
     'TrendAnalysis',
     'MonthlyReport',
     'APIUsage',
     'Alert',
-    'Watchlist'
+    'Watchlist',
+    'BackfillCheckpoint',
+    'CollectionWatermark'
 ] 
\ No newline at end of file
@@ -1,10 +1,11 @@
 """API Usage tracking model"""
 from datetime import datetime, date, timedelta
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 from sqlalchemy import Index, UniqueConstraint
 
 from . import db
+from .utils import upsert_rows
 
 
 class APIUsage(db.Model):
@@ -75,6 +76,27 @@ class APIUsage(db.Model):
         
         db.session.commit()
     
+    @classmethod
+    def add_counts(cls, totals: Dict[Tuple[date, str], Tuple[int, int, int]]):
+        """Add (calls, successes, errors) per (date, endpoint) in one upsert
+        
+        Does not commit.
+        """
+        rows = [
+            {
+                'date': day,
+                'endpoint': endpoint,
+                'calls_made': calls,
+                'success_count': successes,
+                'error_count': errors
+            }
+            for (day, endpoint), (calls, successes, errors) in totals.items()
+        ]
+        upsert_rows(
+            cls, rows, ['date', 'endpoint'],
+            add_columns=('calls_made', 'success_count', 'error_count')
+        )
+    
     @classmethod
     def get_daily_usage(cls, date: date) -> List['APIUsage']:
         """Get usage for a specific date"""
@@ -0,0 +1,150 @@
+"""Backfill checkpoint model"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Index, UniqueConstraint, and_, or_
+
+from . import db
+
+
+class BackfillCheckpoint(db.Model):
+    """Progress of one transcript in a named backfill run"""
+    __tablename__ = 'backfill_checkpoints'
+
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    id = db.Column(db.Integer, primary_key=True)
+    run_name = db.Column(db.String(50), nullable=False)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id', ondelete='CASCADE'), nullable=False)
+    ticker = db.Column(db.String(10), nullable=False)
+    fiscal_year = db.Column(db.Integer, nullable=False)
+    fiscal_quarter = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Constraints and indexes
+    __table_args__ = (
+        UniqueConstraint('run_name', 'ticker', 'fiscal_year', 'fiscal_quarter', name='_run_ticker_period_uc'),
+        Index('idx_backfill_run_status', 'run_name', 'status'),
+    )
+
+    def __repr__(self):
+        return f'<BackfillCheckpoint {self.run_name} {self.ticker} {self.fiscal_year}Q{self.fiscal_quarter}: {self.status}>'
+
+    @property
+    def key(self) -> Tuple[str, int, int]:
+        """(ticker, year, quarter) as used by the ingestion pipeline"""
+        return (self.ticker, self.fiscal_year, self.fiscal_quarter)
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary"""
+        return {
+            'id': self.id,
+            'run_name': self.run_name,
+            'company_id': self.company_id,
+            'ticker': self.ticker,
+            'fiscal_year': self.fiscal_year,
+            'fiscal_quarter': self.fiscal_quarter,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    @classmethod
+    def has_run(cls, run_name: str) -> bool:
+        """Whether a run already has a saved plan"""
+        return db.session.query(cls.query.filter_by(run_name=run_name).exists()).scalar()
+
+    @classmethod
+    def add_pending(cls, run_name: str, pending: Dict[Tuple[str, int, int], int]) -> int:
+        """Record planned transcripts not yet in the run; returns how many were added
+
+        Existing checkpoints keep their status, so planning again never
+        repeats finished work. Does not commit.
+        """
+        existing = {
+            (ticker, year, quarter)
+            for ticker, year, quarter in db.session.query(cls.ticker, cls.fiscal_year, cls.fiscal_quarter)
+            .filter_by(run_name=run_name)
+        }
+
+        added = [
+            cls(
+                run_name=run_name,
+                company_id=company_id,
+                ticker=ticker,
+                fiscal_year=year,
+                fiscal_quarter=quarter,
+                status=cls.PENDING
+            )
+            for (ticker, year, quarter), company_id in pending.items()
+            if (ticker, year, quarter) not in existing
+        ]
+        db.session.add_all(added)
+        return len(added)
+
+    @classmethod
+    def get_resumable(cls, run_name: str, max_attempts: int) -> List['BackfillCheckpoint']:
+        """Checkpoints still to do: pending, or failed with attempts left"""
+        return (
+            cls.query
+            .filter(cls.run_name == run_name)
+            .filter(or_(
+                cls.status == cls.PENDING,
+                and_(cls.status == cls.FAILED, cls.attempts < max_attempts)
+            ))
+            .order_by(cls.ticker, cls.fiscal_year, cls.fiscal_quarter)
+            .all()
+        )
+
+    @classmethod
+    def mark(
+        cls,
+        run_name: str,
+        keys: Iterable[Tuple[str, int, int]],
+        status: str,
+        error: Optional[str] = None
+    ) -> int:
+        """Set the status of (ticker, year, quarter) checkpoints in one UPDATE
+
+        Counts an attempt for each. Does not commit, so the caller can make
+        the update part of the transaction that stored the transcripts.
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+
+        return (
+            cls.query
+            .filter(cls.run_name == run_name)
+            .filter(or_(*[
+                and_(cls.ticker == ticker, cls.fiscal_year == year, cls.fiscal_quarter == quarter)
+                for ticker, year, quarter in keys
+            ]))
+            .update(
+                {
+                    cls.status: status,
+                    cls.attempts: cls.attempts + 1,
+                    cls.last_error: error,
+                    cls.updated_at: datetime.utcnow()
+                },
+                synchronize_session=False
+            )
+        )
+
+    @classmethod
+    def get_summary(cls, run_name: str) -> Dict[str, int]:
+        """Number of checkpoints in each status for a run"""
+        rows = (
+            db.session.query(cls.status, db.func.count(cls.id))
+            .filter(cls.run_name == run_name)
+            .group_by(cls.status)
+            .all()
+        )
+        return {status: count for status, count in rows}
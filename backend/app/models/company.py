@@ -1,11 +1,13 @@
 """Company model"""
 from datetime import datetime, timedelta
-from typing import List, Optional
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
 
 from sqlalchemy import Index
 from sqlalchemy.orm import relationship, backref
 
 from . import db
+from .utils import upsert_rows
 
 
 class Company(db.Model):
@@ -36,6 +38,9 @@ class Company(db.Model):
         Index('idx_companies_market_cap', market_cap),
     )
     
+    # Fields bulk_upsert takes from the company list
+    UPSERT_FIELDS = ('name', 'market_cap', 'sector', 'industry', 'exchange', 'earnings_call_has_transcripts')
+    
     def __repr__(self):
         return f'<Company {self.ticker}: {self.name}>'
     
@@ -71,7 +76,8 @@ class Company(db.Model):
     def latest_trend(self):
         """Get the most recent trend analysis"""
         return self.trend_analyses.order_by(
-            db.desc('analysis_date')
+            db.desc('analysis_date'),
+            db.desc('id')
         ).first()
     
     def get_transcript_history(self, limit: int = 8):
@@ -87,8 +93,12 @@ class Company(db.Model):
             .all()
         )
     
-    def to_dict(self, include_latest: bool = False) -> dict:
-        """Convert to dictionary"""
+    def to_dict(self, include_latest: bool = False, latest_state: Optional[Dict[str, Any]] = None) -> dict:
+        """Convert to dictionary
+        
+        latest_state, if given, is this company's CompanyLatest.to_latest_state()
+        and saves the two per-company queries include_latest otherwise runs.
+        """
         data = {
             'id': self.id,
             'ticker': self.ticker,
@@ -104,20 +114,28 @@ class Company(db.Model):
         }
         
         if include_latest:
-            latest_transcript = self.latest_transcript
-            if latest_transcript:
-                data['latest_transcript'] = {
-                    'date': latest_transcript.call_date.isoformat(),
-                    'fiscal_period': f"{latest_transcript.fiscal_year} Q{latest_transcript.fiscal_quarter}"
-                }
-            
-            latest_trend = self.latest_trend
-            if latest_trend:
-                data['latest_trend'] = {
-                    'category': latest_trend.trend_category,
-                    'sentiment_change': float(latest_trend.sentiment_change) if latest_trend.sentiment_change else None,
-                    'confidence_change': float(latest_trend.confidence_change) if latest_trend.confidence_change else None
-                }
+            if latest_state is None:
+                latest_state = self._latest_state_dict(self.latest_transcript, self.latest_trend)
+            data.update(latest_state)
+        
+        return data
+    
+    @staticmethod
+    def _latest_state_dict(latest_transcript, latest_trend) -> Dict[str, Any]:
+        """latest_transcript / latest_trend entries of to_dict, from models or a CompanyLatest row"""
+        data = {}
+        if latest_transcript:
+            data['latest_transcript'] = {
+                'date': latest_transcript.call_date.isoformat(),
+                'fiscal_period': f"{latest_transcript.fiscal_year} Q{latest_transcript.fiscal_quarter}"
+            }
+        
+        if latest_trend:
+            data['latest_trend'] = {
+                'category': latest_trend.trend_category,
+                'sentiment_change': float(latest_trend.sentiment_change) if latest_trend.sentiment_change else None,
+                'confidence_change': float(latest_trend.confidence_change) if latest_trend.confidence_change else None
+            }
         
         return data
     
@@ -159,4 +177,69 @@ class Company(db.Model):
             .filter(Transcript.fmp_fetch_date >= cutoff_date)
             .distinct()
             .all()
-        ) 
\ No newline at end of file
+        ) 
+    
+    @classmethod
+    def bulk_upsert(cls, records: Iterable[Dict[str, Any]], chunk_size: int = 500) -> Dict[str, int]:
+        """Insert or update companies by ticker; returns inserted/updated/unchanged counts
+        
+        Each chunk costs one SELECT of the existing rows plus, if anything is
+        new or different, one INSERT ... ON CONFLICT (ticker) DO UPDATE that
+        only rewrites rows whose fields changed. Fields missing from a record
+        keep their stored value. Does not commit.
+        """
+        # Later records for the same ticker win, as they would updating one by one
+        by_ticker = {}
+        for record in records:
+            if record.get('ticker'):
+                by_ticker[record['ticker']] = record
+        
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        tickers = list(by_ticker)
+        for start in range(0, len(tickers), max(1, chunk_size)):
+            chunk = tickers[start:start + max(1, chunk_size)]
+            existing = {
+                row.ticker: row
+                for row in db.session.query(cls.ticker, *[getattr(cls, field) for field in cls.UPSERT_FIELDS])
+                .filter(cls.ticker.in_(chunk))
+            }
+            
+            rows = []
+            for ticker in chunk:
+                record = by_ticker[ticker]
+                current = existing.get(ticker)
+                row = {'ticker': ticker}
+                for field in cls.UPSERT_FIELDS:
+                    if field in record:
+                        row[field] = record[field]
+                    else:
+                        row[field] = getattr(current, field) if current is not None else None
+                
+                if current is None:
+                    counts['inserted'] += 1
+                elif any(not cls._same_value(getattr(current, field), row[field]) for field in cls.UPSERT_FIELDS):
+                    counts['updated'] += 1
+                else:
+                    counts['unchanged'] += 1
+                    continue
+                rows.append(row)
+            
+            if rows:
+                upsert_rows(
+                    cls, rows, ['ticker'],
+                    update_columns=cls.UPSERT_FIELDS,
+                    set_values={'last_updated': datetime.utcnow()},
+                    skip_unchanged=True
+                )
+        
+        return counts
+    
+    @staticmethod
+    def _same_value(stored: Any, new: Any) -> bool:
+        """Compare a stored column value with an incoming one (Numeric comes back as Decimal)"""
+        if isinstance(stored, Decimal) and new is not None:
+            try:
+                return stored == Decimal(str(new)).quantize(stored)
+            except (ArithmeticError, ValueError):
+                return False
+        return stored == new
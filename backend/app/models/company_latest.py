@@ -0,0 +1,169 @@
+"""Company latest state model"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import Index, and_, func
+from sqlalchemy.orm import relationship, backref
+
+from . import db
+from .utils import upsert_rows
+
+
+class CompanyLatest(db.Model):
+    """Denormalized latest transcript, sentiment and trend of one company
+
+    Derived entirely from transcripts, sentiment_analysis and trend_analysis:
+    writers call refresh() for the companies they touched before committing,
+    and rebuild() recomputes every row from scratch.
+    """
+    __tablename__ = 'company_latest'
+
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id', ondelete='CASCADE'), primary_key=True)
+
+    # Latest transcript by fiscal period, with its sentiment analysis
+    transcript_id = db.Column(db.Integer)
+    call_date = db.Column(db.DateTime)
+    fiscal_year = db.Column(db.Integer)
+    fiscal_quarter = db.Column(db.Integer)
+    overall_sentiment = db.Column(db.Float)
+    management_confidence_score = db.Column(db.Float)
+    guidance_sentiment = db.Column(db.Float)
+
+    # Latest trend analysis by analysis date
+    trend_id = db.Column(db.Integer)
+    trend_analysis_date = db.Column(db.Date)
+    trend_category = db.Column(db.String(20))
+    sentiment_change = db.Column(db.Float)
+    confidence_change = db.Column(db.Float)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    company = relationship(
+        'Company',
+        backref=backref('latest', uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+    )
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_company_latest_trend', 'trend_category'),
+        Index('idx_company_latest_trend_date', 'trend_analysis_date'),
+    )
+
+    # Columns recomputed by refresh
+    FIELDS = (
+        'transcript_id', 'call_date', 'fiscal_year', 'fiscal_quarter',
+        'overall_sentiment', 'management_confidence_score', 'guidance_sentiment',
+        'trend_id', 'trend_analysis_date', 'trend_category', 'sentiment_change', 'confidence_change'
+    )
+
+    def __repr__(self):
+        return f'<CompanyLatest {self.company_id}: {self.fiscal_year}Q{self.fiscal_quarter} {self.trend_category}>'
+
+    def to_latest_state(self) -> Dict[str, Any]:
+        """latest_state argument for Company.to_dict"""
+        from .company import Company
+        return Company._latest_state_dict(
+            self if self.transcript_id is not None else None,
+            self if self.trend_id is not None else None
+        )
+
+    @classmethod
+    def compute(cls, company_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Current latest state of the given companies, in one query
+
+        Ranks each company's transcripts and trend analyses with a window
+        function and joins the first of each to the company, ordered the
+        same way as Company.latest_transcript and Company.latest_trend.
+        """
+        from .company import Company
+        from .transcript import Transcript
+        from .sentiment import SentimentAnalysis
+        from .trend import TrendAnalysis
+
+        company_ids = list(set(company_ids))
+        if not company_ids:
+            return []
+
+        transcripts = (
+            db.session.query(
+                Transcript.id.label('transcript_id'),
+                Transcript.company_id,
+                Transcript.call_date,
+                Transcript.fiscal_year,
+                Transcript.fiscal_quarter,
+                SentimentAnalysis.overall_sentiment,
+                SentimentAnalysis.management_confidence_score,
+                SentimentAnalysis.guidance_sentiment,
+                func.row_number().over(
+                    partition_by=Transcript.company_id,
+                    order_by=(Transcript.fiscal_year.desc(), Transcript.fiscal_quarter.desc())
+                ).label('position')
+            )
+            .outerjoin(SentimentAnalysis, SentimentAnalysis.transcript_id == Transcript.id)
+            .filter(Transcript.company_id.in_(company_ids))
+            .subquery()
+        )
+        trends = (
+            db.session.query(
+                TrendAnalysis.id.label('trend_id'),
+                TrendAnalysis.company_id,
+                TrendAnalysis.analysis_date.label('trend_analysis_date'),
+                TrendAnalysis.trend_category,
+                TrendAnalysis.sentiment_change,
+                TrendAnalysis.confidence_change,
+                func.row_number().over(
+                    partition_by=TrendAnalysis.company_id,
+                    order_by=(TrendAnalysis.analysis_date.desc(), TrendAnalysis.id.desc())
+                ).label('position')
+            )
+            .filter(TrendAnalysis.company_id.in_(company_ids))
+            .subquery()
+        )
+
+        columns = [transcripts.c[field] for field in cls.FIELDS[:7]] + [trends.c[field] for field in cls.FIELDS[7:]]
+        rows = (
+            db.session.query(Company.id.label('company_id'), *columns)
+            .outerjoin(transcripts, and_(transcripts.c.company_id == Company.id, transcripts.c.position == 1))
+            .outerjoin(trends, and_(trends.c.company_id == Company.id, trends.c.position == 1))
+            .filter(Company.id.in_(company_ids))
+            .all()
+        )
+        return [dict(row._mapping) for row in rows]
+
+    @classmethod
+    def refresh(cls, company_ids: Iterable[int]) -> int:
+        """Recompute the given companies' rows; returns the number written. Does not commit."""
+        rows = cls.compute(company_ids)
+        if rows:
+            upsert_rows(cls, rows, ['company_id'], update_columns=cls.FIELDS, set_values={'updated_at': datetime.utcnow()})
+        return len(rows)
+
+    @classmethod
+    def rebuild(cls, chunk_size: int = 500) -> int:
+        """Recompute every row from the source tables; returns the number written. Does not commit."""
+        from .company import Company
+
+        cls.query.delete(synchronize_session=False)
+        company_ids = [company_id for company_id, in db.session.query(Company.id).order_by(Company.id)]
+        written = 0
+        for start in range(0, len(company_ids), max(1, chunk_size)):
+            written += cls.refresh(company_ids[start:start + max(1, chunk_size)])
+        return written
+
+    @classmethod
+    def populate_if_empty(cls) -> int:
+        """Rebuild the table if it is empty while transcripts or trends exist; returns rows written. Commits.
+        
+        Covers databases created before this table, or filled by hand.
+        """
+        from .transcript import Transcript
+        from .trend import TrendAnalysis
+        
+        if db.session.query(cls.query.exists()).scalar():
+            return 0
+        if not (db.session.query(Transcript.query.exists()).scalar() or db.session.query(TrendAnalysis.query.exists()).scalar()):
+            return 0
+        written = cls.rebuild()
+        db.session.commit()
+        return written
@@ -1,8 +1,8 @@
 """Transcript model"""
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Set, Tuple
 
-from sqlalchemy import Index, UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint, and_
 from sqlalchemy.orm import relationship
 
 from . import db
@@ -17,8 +17,6 @@ class Transcript(db.Model):
     call_date = db.Column(db.DateTime, nullable=False)
     fiscal_year = db.Column(db.Integer, nullable=False)
     fiscal_quarter = db.Column(db.Integer, nullable=False)
-    raw_text = db.Column(db.Text)
-    cleaned_text = db.Column(db.Text)
     word_count = db.Column(db.Integer)
     fmp_fetch_date = db.Column(db.DateTime, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -41,6 +39,30 @@ class Transcript(db.Model):
     def __repr__(self):
         return f'<Transcript {self.company.ticker if self.company else "?"} {self.fiscal_year}Q{self.fiscal_quarter}>'
     
+    @property
+    def raw_text(self) -> Optional[str]:
+        """Transcript as fetched; its body is loaded on first access"""
+        return self.body.raw_text if self.body is not None else None
+    
+    @raw_text.setter
+    def raw_text(self, text: Optional[str]):
+        self._get_or_create_body().raw_text = text
+    
+    @property
+    def cleaned_text(self) -> Optional[str]:
+        """Transcript after cleaning; its body is loaded on first access"""
+        return self.body.cleaned_text if self.body is not None else None
+    
+    @cleaned_text.setter
+    def cleaned_text(self, text: Optional[str]):
+        self._get_or_create_body().cleaned_text = text
+    
+    def _get_or_create_body(self):
+        if self.body is None:
+            from .transcript_body import TranscriptBody
+            self.body = TranscriptBody()
+        return self.body
+    
     @property
     def fiscal_period(self) -> str:
         """Get fiscal period as string"""
@@ -114,6 +136,56 @@ class Transcript(db.Model):
             fiscal_quarter=quarter
         ).first()
     
+    @classmethod
+    def get_stored_periods(
+        cls,
+        tickers: Iterable[str],
+        years: Iterable[int]
+    ) -> Tuple[Dict[str, int], Set[Tuple[str, int, int]]]:
+        """Company IDs for the tickers and their stored (ticker, year, quarter) keys in the given years
+        
+        Both come from one query: companies left-joined to their transcripts,
+        so a company without transcripts still appears once.
+        """
+        from .company import Company
+        
+        tickers = set(tickers)
+        years = set(years)
+        if not tickers:
+            return {}, set()
+        
+        rows = (
+            db.session.query(Company.ticker, Company.id, cls.fiscal_year, cls.fiscal_quarter)
+            .outerjoin(cls, and_(cls.company_id == Company.id, cls.fiscal_year.in_(years)))
+            .filter(Company.ticker.in_(tickers))
+            .all()
+        )
+        
+        company_ids = {}
+        stored = set()
+        for ticker, company_id, year, quarter in rows:
+            company_ids[ticker] = company_id
+            if year is not None:
+                stored.add((ticker, year, quarter))
+        return company_ids, stored
+    
+    @classmethod
+    def find_missing(cls, keys: Iterable[Tuple[str, int, int]]) -> Dict[Tuple[str, int, int], int]:
+        """Map the (ticker, year, quarter) keys not stored yet to their company ID
+        
+        Keys whose ticker is not a known company are left out.
+        """
+        keys = list(dict.fromkeys(keys))
+        company_ids, stored = cls.get_stored_periods(
+            (ticker for ticker, _, _ in keys),
+            (year for _, year, _ in keys)
+        )
+        return {
+            key: company_ids[key[0]]
+            for key in keys
+            if key[0] in company_ids and key not in stored
+        }
+    
     @classmethod
     def get_recent(cls, days: int = 7, limit: int = 50):
         """Get recently fetched transcripts"""
@@ -0,0 +1,119 @@
+"""Transcript body model"""
+import zlib
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy.orm import relationship, backref
+
+from . import db
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Codec for new bodies: zstd when zstandard is installed, zlib otherwise
+CODEC = 'zstd' if zstandard is not None else 'zlib'
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 6
+
+
+class TranscriptBody(db.Model):
+    """Raw and cleaned text of one transcript, stored compressed
+
+    Kept out of the transcripts table so listings and joins don't carry
+    hundreds of KB per row. Loaded only when Transcript.raw_text or
+    cleaned_text is read, and each text is decompressed once per instance.
+    Every row records its codec, so zstd and zlib rows can be read alike.
+    """
+    __tablename__ = 'transcript_bodies'
+
+    transcript_id = db.Column(db.Integer, db.ForeignKey('transcripts.id', ondelete='CASCADE'), primary_key=True)
+    codec = db.Column(db.String(10), nullable=False, default=CODEC)
+    raw_data = db.Column(db.LargeBinary)
+    cleaned_data = db.Column(db.LargeBinary)
+    raw_size = db.Column(db.Integer)  # Uncompressed UTF-8 bytes
+    cleaned_size = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationships
+    transcript = relationship(
+        'Transcript',
+        backref=backref('body', uselist=False, cascade='all, delete-orphan')
+    )
+
+    def __repr__(self):
+        return f'<TranscriptBody {self.transcript_id}: {self.codec} {self.stored_size}/{self.text_size} bytes>'
+
+    @property
+    def raw_text(self) -> Optional[str]:
+        """Transcript as fetched"""
+        return self._get_text('raw')
+
+    @raw_text.setter
+    def raw_text(self, text: Optional[str]):
+        self._set_text('raw', text)
+
+    @property
+    def cleaned_text(self) -> Optional[str]:
+        """Transcript after cleaning"""
+        return self._get_text('cleaned')
+
+    @cleaned_text.setter
+    def cleaned_text(self, text: Optional[str]):
+        self._set_text('cleaned', text)
+
+    @property
+    def text_size(self) -> int:
+        """Uncompressed bytes of both texts"""
+        return (self.raw_size or 0) + (self.cleaned_size or 0)
+
+    @property
+    def stored_size(self) -> int:
+        """Compressed bytes of both texts"""
+        return len(self.raw_data or b'') + len(self.cleaned_data or b'')
+
+    def _texts(self) -> Dict[str, Optional[str]]:
+        # Decompressed texts of this instance; not mapped, so dropped with it
+        return self.__dict__.setdefault('_decompressed', {})
+
+    def _get_text(self, name: str) -> Optional[str]:
+        texts = self._texts()
+        if name not in texts:
+            texts[name] = self.decompress(self.codec, getattr(self, f'{name}_data'))
+        return texts[name]
+
+    def _set_text(self, name: str, text: Optional[str]):
+        other = 'cleaned' if name == 'raw' else 'raw'
+        if self.codec is not None and self.codec != CODEC and getattr(self, f'{other}_data') is not None:
+            # Re-encode the other text so the row keeps a single codec
+            other_text = self._get_text(other)
+            setattr(self, f'{other}_data', self.compress(other_text))
+
+        self.codec = CODEC
+        setattr(self, f'{name}_data', self.compress(text))
+        setattr(self, f'{name}_size', len(text.encode('utf-8')) if text is not None else None)
+        self._texts()[name] = text
+
+    @staticmethod
+    def compress(text: Optional[str]) -> Optional[bytes]:
+        """Encode text with the current codec"""
+        if text is None:
+            return None
+        data = text.encode('utf-8')
+        if CODEC == 'zstd':
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        return zlib.compress(data, ZLIB_LEVEL)
+
+    @staticmethod
+    def decompress(codec: str, data: Optional[bytes]) -> Optional[str]:
+        """Decode data stored with the given codec"""
+        if data is None:
+            return None
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("zstandard is not installed; cannot read zstd transcript bodies")
+            return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+        if codec == 'zlib':
+            return zlib.decompress(data).decode('utf-8')
+        raise ValueError(f"Unknown transcript body codec: {codec}")
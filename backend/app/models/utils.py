@@ -1,9 +1,14 @@
 """Database utilities for cross-database compatibility"""
-from sqlalchemy import JSON
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import JSON, event, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.dialects.postgresql import JSONB
 from flask import current_app
 import os
 
+from . import db
+
 
 def get_json_type():
     """Return appropriate JSON type based on database being used"""
@@ -13,4 +18,99 @@ def get_json_type():
     if 'postgresql' in database_url or 'postgres' in database_url:
         return JSONB
     else:
-        return JSON 
\ No newline at end of file
+        return JSON
+
+
+def enable_sqlite_savepoints(engine):
+    """Make SQLite transactions explicit so savepoints nest inside them
+
+    In its default mode pysqlite only opens a transaction before DML, so a
+    SAVEPOINT issued first becomes the outer transaction and its RELEASE
+    commits. This is SQLAlchemy's documented pysqlite recipe: turn off the
+    driver's own transaction handling and emit BEGIN ourselves.
+    """
+    if engine.dialect.name != 'sqlite' or event.contains(engine, 'begin', _sqlite_begin):
+        return
+    event.listen(engine, 'connect', _sqlite_connect)
+    event.listen(engine, 'begin', _sqlite_begin)
+
+
+def _sqlite_connect(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+def _sqlite_begin(conn):
+    # AUTOCOMMIT connections (VACUUM and the like) must stay outside a transaction
+    if conn.get_execution_options().get('isolation_level') != 'AUTOCOMMIT':
+        conn.exec_driver_sql('BEGIN')
+
+
+def upsert_rows(model, rows: List[Dict[str, Any]], index_elements: Sequence[str],
+                update_columns: Sequence[str] = (), add_columns: Sequence[str] = (),
+                set_values: Optional[Dict[str, Any]] = None, skip_unchanged: bool = False):
+    """Insert rows, or update the ones whose index_elements already exist. Does not commit.
+
+    update_columns are overwritten with the incoming values and add_columns
+    have them added to the stored ones; set_values are written to every row
+    inserted or updated. With skip_unchanged, existing rows whose
+    update_columns already match are left alone. Uses the dialect's
+    ON CONFLICT upsert on PostgreSQL and SQLite and the ORM elsewhere.
+    """
+    if not rows:
+        return
+    set_values = set_values or {}
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in ('postgresql', 'sqlite'):
+        _merge_rows(model, rows, index_elements, update_columns, add_columns, set_values, skip_unchanged)
+        return
+
+    table = model.__table__
+    insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c[column] for column in index_elements],
+        set_={
+            **{column: stmt.excluded[column] for column in update_columns},
+            **{column: db.func.coalesce(table.c[column], 0) + stmt.excluded[column] for column in add_columns},
+            **set_values
+        },
+        # Leave rows alone if nothing changed since we read them
+        where=db.or_(*[
+            table.c[column].is_distinct_from(stmt.excluded[column])
+            for column in update_columns
+        ]) if skip_unchanged and update_columns else None
+    )
+    db.session.execute(stmt, [{**row, **set_values} for row in rows])
+
+
+def _merge_rows(model, rows: List[Dict[str, Any]], index_elements: Sequence[str],
+                update_columns: Sequence[str], add_columns: Sequence[str],
+                set_values: Dict[str, Any], skip_unchanged: bool):
+    """ORM fallback for upsert_rows, for dialects without a native upsert"""
+    columns = [getattr(model, column) for column in index_elements]
+    keys = [tuple(row[column] for column in index_elements) for row in rows]
+    if len(columns) == 1:
+        condition = columns[0].in_([key[0] for key in keys])
+    else:
+        condition = tuple_(*columns).in_(keys)
+    existing = {
+        tuple(getattr(record, column) for column in index_elements): record
+        for record in model.query.filter(condition)
+    }
+
+    for key, row in zip(keys, rows):
+        record = existing.get(key)
+        if record is None:
+            existing[key] = model(**{**row, **set_values})
+            db.session.add(existing[key])
+            continue
+        if skip_unchanged and all(getattr(record, column) == row[column] for column in update_columns) and not add_columns:
+            continue
+        for column in update_columns:
+            setattr(record, column, row[column])
+        for column in add_columns:
+            setattr(record, column, (getattr(record, column) or 0) + row[column])
+        for column, value in set_values.items():
+            setattr(record, column, value)
+    db.session.flush()
@@ -0,0 +1,55 @@
+"""Collection watermark model"""
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import UniqueConstraint
+
+from . import db
+
+
+class CollectionWatermark(db.Model):
+    """Latest event timestamp fully collected from one source and exchange"""
+    __tablename__ = 'collection_watermarks'
+
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(50), nullable=False)
+    exchange = db.Column(db.String(20), nullable=False)
+    last_event_at = db.Column(db.DateTime, nullable=False)
+    last_run_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('source', 'exchange', name='_source_exchange_uc'),
+    )
+
+    def __repr__(self):
+        return f'<CollectionWatermark {self.source}/{self.exchange}: {self.last_event_at}>'
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary"""
+        return {
+            'source': self.source,
+            'exchange': self.exchange,
+            'last_event_at': self.last_event_at.isoformat() if self.last_event_at else None,
+            'last_run_at': self.last_run_at.isoformat() if self.last_run_at else None
+        }
+
+    @classmethod
+    def get_watermark(cls, source: str, exchange: str) -> Optional[datetime]:
+        """Last fully collected event timestamp, None before the first run"""
+        watermark = cls.query.filter_by(source=source, exchange=exchange).first()
+        return watermark.last_event_at if watermark else None
+
+    @classmethod
+    def advance(cls, source: str, exchange: str, event_at: datetime) -> 'CollectionWatermark':
+        """Move the watermark forward to event_at (never back) and stamp the run; caller commits"""
+        watermark = cls.query.filter_by(source=source, exchange=exchange).first()
+        if watermark is None:
+            watermark = cls(source=source, exchange=exchange, last_event_at=event_at)
+            db.session.add(watermark)
+        elif event_at > watermark.last_event_at:
+            watermark.last_event_at = event_at
+        watermark.last_run_at = datetime.utcnow()
+        return watermark
@@ -0,0 +1,179 @@
+"""Resumable Historical Transcript Backfill"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models import db, BackfillCheckpoint, Transcript
+from app.services.ingestion_pipeline import IngestionPipeline
+
+logger = logging.getLogger(__name__)
+
+
+def _format_duration(seconds: float) -> str:
+    """Compact h/m/s duration for progress lines"""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+class BackfillEngine:
+    """Backfills historical transcripts with progress saved per (ticker, year, quarter)
+
+    ``plan`` lists each company's available transcripts on a pool of worker
+    threads (all sharing the API rate limit) and saves the ones missing from
+    the database as pending checkpoints. ``run`` streams them through the
+    ingestion pipeline; each committed chunk marks its checkpoints done in the
+    same transaction, so a crashed or interrupted run picks up from the last
+    commit. Failed transcripts are retried on later runs up to
+    ``max_attempts`` times.
+    """
+
+    def __init__(
+        self,
+        earnings_client,
+        sentiment_analyzer,
+        config,
+        run_name: str = 'historical',
+        workers: Optional[int] = None,
+        commit_every: Optional[int] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.earnings_client = earnings_client
+        self.sentiment_analyzer = sentiment_analyzer
+        self.config = config
+        self.run_name = run_name
+        self.workers = max(1, workers or config.BACKFILL_WORKERS)
+        self.commit_every = max(1, commit_every or config.INGEST_COMMIT_EVERY)
+        self.max_attempts = max(1, max_attempts or config.BACKFILL_MAX_ATTEMPTS)
+        self.progress_seconds = config.BACKFILL_PROGRESS_SECONDS
+
+        self._total = 0
+        self._done = 0
+        self._started = 0.0
+        self._last_report = 0.0
+
+    def plan(self, companies, start_date: datetime, replan: bool = False) -> Dict[Tuple[str, int, int], int]:
+        """Pending (ticker, year, quarter) -> company_id for this run
+
+        Resumes the saved plan if the run has one, unless ``replan`` asks to
+        list the companies again (adding any new transcripts to the plan).
+        """
+        if replan or not BackfillCheckpoint.has_run(self.run_name):
+            self._plan_companies(companies, start_date)
+        else:
+            logger.info(f"Resuming backfill '{self.run_name}' from its checkpoints")
+
+        pending = {
+            checkpoint.key: checkpoint.company_id
+            for checkpoint in BackfillCheckpoint.get_resumable(self.run_name, self.max_attempts)
+        }
+        logger.info(
+            f"Backfill '{self.run_name}': {len(pending)} transcripts to ingest "
+            f"({BackfillCheckpoint.get_summary(self.run_name)})"
+        )
+        return pending
+
+    def _plan_companies(self, companies, start_date: datetime):
+        """List available transcripts for every company and save the missing ones"""
+        tickers = [company.ticker for company in companies]
+        logger.info(f"Listing transcripts for {len(tickers)} companies on {self.workers} workers")
+
+        candidates: List[Tuple[str, int, int]] = []
+        listed = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            listings = executor.map(self.earnings_client.get_available_transcripts, tickers)
+            for ticker, available in zip(tickers, listings):
+                listed += 1
+                if listed % 50 == 0:
+                    logger.info(f"Listed {listed}/{len(tickers)} companies")
+                if not available:
+                    logger.warning(f"No transcripts available for {ticker}")
+                    continue
+
+                for transcript_meta in available:
+                    # Skip transcripts older than our range
+                    transcript_date = transcript_meta.get('date')
+                    if transcript_date:
+                        try:
+                            t_date = datetime.fromisoformat(transcript_date.replace('Z', '+00:00'))
+                            if t_date.replace(tzinfo=None) < start_date:
+                                continue
+                        except ValueError:
+                            pass
+
+                    year = transcript_meta.get('year')
+                    quarter = transcript_meta.get('quarter')
+                    if year and quarter:
+                        candidates.append((ticker, year, quarter))
+
+        # Drop the periods already stored, in one query rather than one per transcript
+        missing = Transcript.find_missing(candidates)
+        added = BackfillCheckpoint.add_pending(self.run_name, missing)
+        db.session.commit()
+        logger.info(f"Planned {len(missing)} missing transcripts, {added} new to the checkpoint table")
+
+    def run(self, pending: Dict[Tuple[str, int, int], int]) -> Dict[str, Any]:
+        """Ingest the pending transcripts, checkpointing each committed chunk"""
+        self._total = len(pending)
+        self._done = 0
+        self._started = self._last_report = time.time()
+
+        pipeline = IngestionPipeline(self.earnings_client, self.sentiment_analyzer, self.config)
+        pipeline.commit_every = self.commit_every
+        stats = pipeline.run(pending, on_commit=self._on_commit, on_committed=self._on_committed)
+
+        # Stored chunks were checkpointed as they committed; record the rest
+        for key, reason in pipeline.failures.items():
+            BackfillCheckpoint.mark(self.run_name, [key], BackfillCheckpoint.FAILED, reason)
+        db.session.commit()
+        self._report_progress(len(pipeline.failures))
+
+        completed_ids = sorted({
+            company_id for key, company_id in pending.items()
+            if key not in pipeline.failures
+        }) if stats.persisted else []
+
+        return {
+            'run_name': self.run_name,
+            'planned': self._total,
+            'ingested': stats.persisted,
+            'failed': len(pipeline.failures),
+            'company_ids': completed_ids,
+            'checkpoints': BackfillCheckpoint.get_summary(self.run_name),
+            'pipeline': stats.to_dict(),
+            'fetch_requests': self.earnings_client.get_fetch_stats()
+        }
+
+    def _on_commit(self, keys: List[Tuple[str, int, int]]):
+        """Mark a chunk done inside the transaction that stores it"""
+        BackfillCheckpoint.mark(self.run_name, keys, BackfillCheckpoint.DONE)
+
+    def _on_committed(self, keys: List[Tuple[str, int, int]]):
+        """Count a chunk once it has committed, and report progress now and then"""
+        self._done += len(keys)
+
+        now = time.time()
+        if now - self._last_report >= self.progress_seconds:
+            self._last_report = now
+            self._report_progress()
+
+    def _report_progress(self, failed: Optional[int] = None):
+        """Log progress, throughput and the estimated time left"""
+        elapsed = max(time.time() - self._started, 1e-9)
+        rate = self._done / elapsed
+        remaining = self._total - self._done - (failed or 0)
+        eta = _format_duration(remaining / rate) if rate and remaining > 0 else ('-' if remaining > 0 else '0s')
+        percent = 100.0 * self._done / self._total if self._total else 100.0
+
+        logger.info(
+            f"Backfill '{self.run_name}': {self._done}/{self._total} ({percent:.1f}%) "
+            f"in {_format_duration(elapsed)}, {rate * 3600:.0f} transcripts/hour, ETA {eta}"
+            + (f", {failed} failed" if failed else '')
+        )
@@ -0,0 +1,136 @@
+"""Unit-of-Work Batch Writer"""
+import logging
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from app.models import db, CompanyLatest
+from config.config import get_config
+
+logger = logging.getLogger(__name__)
+
+# A queued unit: its key, the company whose latest state it changes, and its rows
+_Unit = Tuple[Hashable, Optional[int], Tuple[Any, ...]]
+
+
+class BatchWriter:
+    """Queues derived rows (sentiment analyses, trends, alerts) and writes them in chunks
+
+    Each add() call queues one unit, e.g. a transcript with its sentiment
+    analysis, or a trend with its alerts; a unit is written or dropped as a
+    whole. Every ``chunk_size`` units are inserted with one flush inside a
+    savepoint and committed once, together with the company_latest rows of
+    the companies they touch. If the flush fails, the savepoint is rolled
+    back and the chunk is retried one unit per savepoint, so a bad row only
+    drops its own unit. On SQLite the savepoints only nest inside the
+    chunk's transaction with enable_sqlite_savepoints(), which create_app
+    installs.
+
+    Rows still queued are only written by flush(), which leaving a ``with``
+    block calls.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = None,
+                 before_commit: Optional[Callable[[List[Hashable]], None]] = None,
+                 after_commit: Optional[Callable[[List[Hashable]], None]] = None):
+        """before_commit, if given, is called with the keys of each chunk's
+        written units just before it commits, so whatever it adds to the
+        session is committed with them. It must only touch the session; the
+        chunk can still fail to commit. after_commit is called with the same
+        keys once the commit succeeded, for counters and other side effects
+        outside the database."""
+        if chunk_size is None:
+            chunk_size = get_config().WRITE_BATCH_SIZE
+        self.chunk_size = max(1, chunk_size)
+        self.before_commit = before_commit
+        self.after_commit = after_commit
+        self.failures: Dict[Hashable, str] = {}
+        self.stats = {'written': 0, 'failed': 0, 'commits': 0, 'retried_chunks': 0}
+        self._units: List[_Unit] = []
+
+    def __enter__(self) -> 'BatchWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._units = []
+
+    def add(self, *rows: Any, key: Hashable = None, company_id: Optional[int] = None):
+        """Queue rows to be written together; writes a chunk once enough are queued
+
+        company_id defaults to the rows' own company_id, for rows that have
+        one; pass it for rows that don't, such as sentiment analyses.
+        """
+        rows = tuple(row for row in rows if row is not None)
+        if not rows:
+            return
+        if company_id is None:
+            company_id = next((row.company_id for row in rows if getattr(row, 'company_id', None) is not None), None)
+        self._units.append((key, company_id, rows))
+        if len(self._units) >= self.chunk_size:
+            self.flush()
+
+    def add_all(self, units: Iterable[Iterable[Any]]):
+        """Queue several units, one per iterable of rows"""
+        for rows in units:
+            self.add(*rows)
+
+    def flush(self) -> List[Hashable]:
+        """Write and commit everything queued; returns the keys of the units written"""
+        written = []
+        while self._units:
+            chunk, self._units = self._units[:self.chunk_size], self._units[self.chunk_size:]
+            written.extend(self._write_chunk(chunk))
+        return written
+
+    def _write_chunk(self, chunk: List[_Unit]) -> List[Hashable]:
+        """Insert one chunk and commit it"""
+        try:
+            with db.session.begin_nested():
+                for _, _, rows in chunk:
+                    db.session.add_all(rows)
+            written = chunk
+        except Exception as e:
+            logger.warning(f"Writing {len(chunk)} units at once failed, retrying one at a time: {str(e)}")
+            self.stats['retried_chunks'] += 1
+            written = [unit for unit in chunk if self._write_unit(unit)]
+
+        keys = [key for key, _, _ in written]
+        try:
+            CompanyLatest.refresh(self._company_ids(written))
+            if self.before_commit is not None and keys:
+                self.before_commit(keys)
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Error committing {len(written)} units: {str(e)}")
+            db.session.rollback()
+            for key, _, _ in written:
+                self._fail(key, f'commit failed: {e}')
+            return []
+
+        self.stats['written'] += len(written)
+        self.stats['commits'] += 1
+        if self.after_commit is not None and keys:
+            self.after_commit(keys)
+        return keys
+
+    def _write_unit(self, unit: _Unit) -> bool:
+        """Insert one unit in its own savepoint; False if it was rolled back"""
+        key, _, rows = unit
+        try:
+            with db.session.begin_nested():
+                db.session.add_all(rows)
+            return True
+        except Exception as e:
+            logger.error(f"Dropped {key if key is not None else rows}: {str(e)}")
+            self._fail(key, str(e))
+            return False
+
+    def _fail(self, key: Hashable, reason: str):
+        self.stats['failed'] += 1
+        if key is not None:
+            self.failures[key] = reason
+
+    @staticmethod
+    def _company_ids(units: List[_Unit]) -> Set[int]:
+        return {company_id for _, company_id, _ in units if company_id is not None}
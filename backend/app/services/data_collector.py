@@ -1,13 +1,15 @@
 """Data Collection Service"""
 import logging
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Optional
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 import json
 
 from sqlalchemy import and_
 
-from app.models import db, Company, Transcript, SentimentAnalysis, TrendAnalysis, MonthlyReport
+from app.models import db, Company, CompanyLatest, Transcript, SentimentAnalysis, TrendAnalysis, MonthlyReport, CollectionWatermark
+from app.services.batch_writer import BatchWriter
 from app.services.earnings_call_client import EarningsCallClient
+from app.services.ingestion_pipeline import IngestionPipeline
 from app.services.transcript_processor import TranscriptProcessor
 from app.services.sentiment_analyzer import SentimentAnalyzer
 from app.services.trend_analyzer import TrendAnalyzer
@@ -21,6 +23,8 @@ logger = logging.getLogger(__name__)
 class DataCollector:
     """Service for automated data collection and analysis"""
     
+    WATERMARK_SOURCE = 'earnings_call'
+    
     def __init__(self, earnings_client: Optional[EarningsCallClient] = None, config: Optional[Config] = None):
         self.config = config or Config()
         self.earnings_client = earnings_client or EarningsCallClient(config=self.config)
@@ -51,24 +55,9 @@ class DataCollector:
             updated_companies = self.update_company_list()
             results['companies_updated'] = updated_companies
             
-            # Step 2: Fetch new transcripts (last 30 days)
-            logger.info("Step 2: Fetching new transcripts")
-            new_transcripts = self.fetch_new_transcripts(days_back=30)
-            results['new_transcripts'] = len(new_transcripts)
-            
-            # Step 3: Process transcripts
-            logger.info("Step 3: Processing transcripts")
-            processed = self.process_transcripts(new_transcripts)
-            
-            # Step 4: Run sentiment analysis
-            logger.info("Step 4: Running sentiment analysis")
-            analyses = self.analyze_transcripts(processed)
-            results['analyses_performed'] = len(analyses)
-            
-            # Step 5: Generate trend analysis
-            logger.info("Step 5: Generating trend analyses")
-            trends = self.generate_trend_analyses()
-            results['trends_analyzed'] = len(trends)
+            # Steps 2-5: Ingest what was released since the last run and update those companies' trends
+            logger.info("Steps 2-5: Collecting new transcripts since the watermark")
+            trends = self.collect_since_watermark(results)
             
             # Step 6: Generate monthly report
             logger.info("Step 6: Generating monthly report")
@@ -79,15 +68,116 @@ class DataCollector:
             results['end_time'] = datetime.utcnow().isoformat()
             results['duration_seconds'] = (datetime.utcnow() - start_time).total_seconds()
             
-            logger.info(f"Monthly collection complete. Processed {len(new_transcripts)} new transcripts")
+            logger.info(f"Monthly collection complete. Processed {results['new_transcripts']} new transcripts")
             
         except Exception as e:
             logger.error(f"Monthly collection failed: {str(e)}")
+            db.session.rollback()
             results['status'] = 'failed'
             results['errors'].append(str(e))
+        
+        # Write this run's API usage now rather than at the next interval
+        self.earnings_client.usage_buffer.flush()
             
         return results
     
+    def run_incremental_collection(self, exchange: str = 'nasdaq') -> Dict[str, Any]:
+        """Collect only what was released since the last run - cheap enough to run hourly"""
+        logger.info(f"Starting incremental transcript collection for {exchange}")
+        
+        start_time = datetime.utcnow()
+        results = {
+            'status': 'started',
+            'start_time': start_time.isoformat(),
+            'new_transcripts': 0,
+            'analyses_performed': 0,
+            'trends_analyzed': 0,
+            'errors': []
+        }
+        
+        try:
+            self.collect_since_watermark(results, exchange=exchange)
+            
+            results['status'] = 'completed'
+            results['end_time'] = datetime.utcnow().isoformat()
+            results['duration_seconds'] = (datetime.utcnow() - start_time).total_seconds()
+            
+            logger.info(f"Incremental collection complete. Processed {results['new_transcripts']} new transcripts")
+            
+        except Exception as e:
+            logger.error(f"Incremental collection failed: {str(e)}")
+            db.session.rollback()
+            results['status'] = 'failed'
+            results['errors'].append(str(e))
+        
+        # Write this run's API usage now rather than at the next interval
+        self.earnings_client.usage_buffer.flush()
+        
+        return results
+    
+    def collect_since_watermark(self, results: Dict[str, Any], exchange: str = 'nasdaq') -> List[TrendAnalysis]:
+        """Ingest the events after the exchange's watermark and recompute trends for the companies they changed
+        
+        Events are listed from COLLECTION_OVERLAP_HOURS before the watermark,
+        since a call's transcript can be published well after its event
+        date; the overlap only costs a database lookup, as stored periods are
+        skipped. The watermark then moves to the newest event seen, but no
+        further than the oldest event whose transcript failed to store, so
+        the next run retries it (for up to COLLECTION_RETRY_DAYS).
+        """
+        run_started = datetime.utcnow()
+        watermark = CollectionWatermark.get_watermark(self.WATERMARK_SOURCE, exchange)
+        if watermark is None:
+            since = run_started - timedelta(days=self.config.COLLECTION_LOOKBACK_DAYS)
+        else:
+            since = watermark - timedelta(hours=self.config.COLLECTION_OVERLAP_HOURS)
+        results['watermark'] = watermark.isoformat() if watermark else None
+        
+        # Step 2: Find transcripts released since the watermark that we don't have
+        events = self.earnings_client.get_recent_transcripts(exchange=exchange, since=since)
+        logger.info(f"Found {len(events)} transcripts released since {since.isoformat()}")
+        event_times = {}
+        for transcript_meta in events:
+            event_at = EarningsCallClient.event_time(transcript_meta)
+            key = (transcript_meta.get('ticker'), transcript_meta.get('year'), transcript_meta.get('quarter'))
+            if event_at is not None and (key not in event_times or event_at < event_times[key]):
+                event_times[key] = event_at
+        pending = self._plan_from_events(events)
+        
+        # Steps 3-4: Fetch, process, analyze and store them as one streaming pipeline
+        logger.info(f"Steps 3-4: Ingesting {len(pending)} new transcripts")
+        committed = []
+        pipeline = IngestionPipeline(self.earnings_client, self.sentiment_analyzer, self.config)
+        pipeline_stats = pipeline.run(pending, on_committed=committed.extend)
+        stored = set(committed)
+        results['new_transcripts'] = pipeline_stats.persisted
+        results['analyses_performed'] = pipeline_stats.analyzed
+        results['sentiment_throughput'] = pipeline_stats.sentiment.to_dict()
+        results['pipeline'] = pipeline_stats.to_dict()
+        results['fetch_requests'] = self.earnings_client.get_fetch_stats()
+        
+        # Advance past everything seen, holding back for recent transcripts that didn't make it
+        new_watermark = max(event_times.values(), default=watermark or since)
+        retry_cutoff = run_started - timedelta(days=self.config.COLLECTION_RETRY_DAYS)
+        unstored = [key for key in pending if key not in stored and key in event_times]
+        held = [event_times[key] for key in unstored if event_times[key] >= retry_cutoff]
+        if held:
+            logger.info(f"{len(held)} transcripts failed to store; holding the watermark for a retry")
+            new_watermark = min(new_watermark, min(held))
+        for key in unstored:
+            if event_times[key] < retry_cutoff:
+                logger.warning(f"Giving up on transcript {key[0]} {key[1]}Q{key[2]} after {self.config.COLLECTION_RETRY_DAYS} days")
+        CollectionWatermark.advance(self.WATERMARK_SOURCE, exchange, new_watermark)
+        db.session.commit()
+        results['new_watermark'] = CollectionWatermark.get_watermark(self.WATERMARK_SOURCE, exchange).isoformat()
+        
+        # Step 5: Recompute trends only for companies whose history changed
+        logger.info("Step 5: Generating trend analyses")
+        trends = self.generate_trend_analyses(company_ids={pending[key] for key in stored})
+        results['trends_analyzed'] = len(trends)
+        
+        return trends
+    
     def update_company_list(self) -> int:
         """Update list of companies with available transcripts"""
         updated_count = 0
@@ -101,44 +191,21 @@ class DataCollector:
             
             logger.info(f"Found {len(companies)} biotech/medtech companies")
             
-            for company_data in companies:
-                try:
-                    ticker = company_data.get('ticker')
-                    if not ticker:
-                        continue
-                    
-                    # Update or create company
-                    company = Company.query.filter_by(ticker=ticker).first()
-                    
-                    if company:
-                        # Update existing
-                        company.name = company_data.get('name', company.name)
-                        company.market_cap = company_data.get('market_cap', company.market_cap)
-                        company.sector = company_data.get('sector', company.sector)
-                        company.industry = company_data.get('industry', company.industry)
-                        company.exchange = company_data.get('exchange', company.exchange)
-                        company.earnings_call_has_transcripts = True
-                    else:
-                        # Create new
-                        company = Company(
-                            ticker=ticker,
-                            name=company_data.get('name'),
-                            market_cap=company_data.get('market_cap'),
-                            sector=company_data.get('sector'),
-                            industry=company_data.get('industry'),
-                            exchange=company_data.get('exchange'),
-                            earnings_call_has_transcripts=True
-                        )
-                        db.session.add(company)
-                    
-                    updated_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error updating company {ticker}: {str(e)}")
-                    continue
-            
+            # Upsert in chunks, rewriting only the companies that changed
+            counts = Company.bulk_upsert(
+                (
+                    {**company_data, 'earnings_call_has_transcripts': True}
+                    for company_data in companies
+                ),
+                chunk_size=self.config.COMPANY_UPSERT_CHUNK
+            )
             db.session.commit()
-            logger.info(f"Updated {updated_count} companies")
+            
+            updated_count = sum(counts.values())
+            logger.info(
+                f"Updated {updated_count} companies: {counts['inserted']} inserted, "
+                f"{counts['updated']} updated, {counts['unchanged']} unchanged"
+            )
             
         except Exception as e:
             logger.error(f"Error updating company list: {str(e)}")
@@ -149,54 +216,68 @@ class DataCollector:
     def fetch_new_transcripts(self, days_back: int = 30) -> List[Dict[str, Any]]:
         """Fetch transcripts released in the past month"""
         new_transcripts = []
+        pending = self.plan_new_transcripts(days_back=days_back)
+        
+        try:
+            # Fetch full transcripts concurrently under the shared rate limit
+            for (ticker, year, quarter), full_transcript in self.earnings_client.get_transcripts(pending):
+                if full_transcript:
+                    full_transcript['company_id'] = pending[(ticker, year, quarter)]
+                    new_transcripts.append(full_transcript)
+                    logger.info(f"New transcript: {ticker} {year}Q{quarter}")
+            logger.info(f"Earnings Call fetch requests: {self.earnings_client.get_fetch_stats()}")
+            
+        except Exception as e:
+            logger.error(f"Error fetching new transcripts: {str(e)}")
+            
+        return new_transcripts
+    
+    def plan_new_transcripts(self, days_back: int = 30) -> Dict[Tuple[str, int, int], int]:
+        """Map (ticker, year, quarter) to company ID for recent transcripts we don't have yet"""
+        pending = {}
         
         try:
             # Get recent transcripts from API
             recent_transcripts = self.earnings_client.get_recent_transcripts(days_back=days_back)
             logger.info(f"Found {len(recent_transcripts)} recent transcripts")
-            
-            for transcript_meta in recent_transcripts:
-                try:
-                    ticker = transcript_meta.get('ticker')
-                    year = transcript_meta.get('year')
-                    quarter = transcript_meta.get('quarter')
-                    
-                    if not all([ticker, year, quarter]):
-                        continue
-                    
-                    # Get company
-                    company = Company.query.filter_by(ticker=ticker).first()
-                    if not company:
-                        logger.warning(f"Company {ticker} not found in database")
-                        continue
-                    
-                    # Check if we already have this transcript
-                    exists = Transcript.query.filter_by(
-                        company_id=company.id,
-                        fiscal_year=year,
-                        fiscal_quarter=quarter
-                    ).first()
-                    
-                    if exists:
-                        logger.debug(f"Transcript already exists: {ticker} {year}Q{quarter}")
-                        continue
-                    
-                    # Fetch full transcript
-                    full_transcript = self.earnings_client.get_transcript(ticker, year, quarter)
-                    
-                    if full_transcript:
-                        full_transcript['company_id'] = company.id
-                        new_transcripts.append(full_transcript)
-                        logger.info(f"New transcript: {ticker} {year}Q{quarter}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing transcript: {str(e)}")
-                    continue
+            pending = self._plan_from_events(recent_transcripts)
             
         except Exception as e:
-            logger.error(f"Error fetching new transcripts: {str(e)}")
+            logger.error(f"Error finding new transcripts: {str(e)}")
             
-        return new_transcripts
+        return pending
+    
+    def _plan_from_events(self, recent_transcripts: List[Dict[str, Any]]) -> Dict[Tuple[str, int, int], int]:
+        """Map listed transcripts we don't have yet to their company IDs"""
+        candidates = []
+        for transcript_meta in recent_transcripts:
+            ticker = transcript_meta.get('ticker')
+            year = transcript_meta.get('year')
+            quarter = transcript_meta.get('quarter')
+            
+            if not all([ticker, year, quarter]):
+                continue
+            candidates.append((ticker, year, quarter))
+        
+        # Company IDs and already stored periods for every candidate in one query
+        company_ids, stored = Transcript.get_stored_periods(
+            (ticker for ticker, _, _ in candidates),
+            (year for _, year, _ in candidates)
+        )
+        
+        for ticker in sorted({ticker for ticker, _, _ in candidates} - company_ids.keys()):
+            logger.warning(f"Company {ticker} not found in database")
+        
+        pending = {}
+        for key in candidates:
+            if key[0] not in company_ids:
+                continue
+            if key in stored:
+                logger.debug(f"Transcript already exists: {key[0]} {key[1]}Q{key[2]}")
+                continue
+            pending[key] = company_ids[key[0]]
+        
+        return pending
     
     def process_transcripts(self, transcripts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process and store transcripts"""
@@ -235,6 +316,7 @@ class DataCollector:
                 continue
         
         try:
+            CompanyLatest.refresh({processed_result['company_id'] for processed_result in processed})
             db.session.commit()
         except Exception as e:
             logger.error(f"Error saving transcripts: {str(e)}")
@@ -246,62 +328,92 @@ class DataCollector:
         """Run sentiment analysis on processed transcripts"""
         analyses = []
         
-        for transcript_data in processed_transcripts:
-            try:
-                # Run sentiment analysis
-                analysis_result = self.sentiment_analyzer.analyze_transcript(
-                    transcript_data['processed_data']
-                )
-                
-                # Create database record
-                sentiment = SentimentAnalysis.create_from_analysis(
-                    transcript_data['transcript_id'],
-                    analysis_result
-                )
-                
-                db.session.add(sentiment)
-                analyses.append(sentiment)
-                
-                logger.info(f"Analyzed transcript for {transcript_data['ticker']}: "
-                          f"sentiment={analysis_result['overall_sentiment']:.2f}, "
-                          f"confidence={analysis_result['management_confidence_score']:.2f}")
-                
-            except Exception as e:
-                logger.error(f"Error analyzing transcript {transcript_data['transcript_id']}: {str(e)}")
-                continue
+        # Chunks from all transcripts share one FinBERT work queue; results
+        # stream back as each transcript's last chunk is scored
+        results = self.sentiment_analyzer.analyze_transcripts(
+            [transcript_data['processed_data'] for transcript_data in processed_transcripts]
+        )
         
-        try:
-            db.session.commit()
-        except Exception as e:
-            logger.error(f"Error saving sentiment analyses: {str(e)}")
-            db.session.rollback()
+        with BatchWriter() as writer:
+            for index, analysis_result in results:
+                transcript_data = processed_transcripts[index]
+                try:
+                    if analysis_result is None:
+                        continue
+                    
+                    # Create database record
+                    sentiment = SentimentAnalysis.create_from_analysis(
+                        transcript_data['transcript_id'],
+                        analysis_result
+                    )
+                    
+                    writer.add(sentiment, key=transcript_data['transcript_id'], company_id=transcript_data['company_id'])
+                    analyses.append(sentiment)
+                    
+                    logger.info(f"Analyzed transcript for {transcript_data['ticker']}: "
+                              f"sentiment={analysis_result['overall_sentiment']:.2f}, "
+                              f"confidence={analysis_result['management_confidence_score']:.2f}")
+                    
+                except Exception as e:
+                    logger.error(f"Error analyzing transcript {transcript_data['transcript_id']}: {str(e)}")
+                    continue
+        
+        logger.info(f"Sentiment throughput: {self.sentiment_analyzer.last_scheduler_stats.to_dict()}")
+        if writer.failures:
+            failed = set(writer.failures)
+            analyses = [sentiment for sentiment in analyses if sentiment.transcript_id not in failed]
             
         return analyses
     
-    def generate_trend_analyses(self) -> List[TrendAnalysis]:
-        """Generate trend analysis for all companies with new transcripts"""
+    def generate_trend_analyses(self, company_ids: Optional[Iterable[int]] = None) -> List[TrendAnalysis]:
+        """Generate trend analysis for the given companies, or all companies with new transcripts"""
         trends = []
         
         try:
-            # Get companies with recent transcripts
-            recent_companies = Company.get_with_recent_transcripts(days=7)
+            if company_ids is not None:
+                company_ids = list(company_ids)
+                recent_companies = Company.query.filter(Company.id.in_(company_ids)).all() if company_ids else []
+            else:
+                # Get companies with recent transcripts
+                recent_companies = Company.get_with_recent_transcripts(days=7)
             logger.info(f"Generating trends for {len(recent_companies)} companies")
             
-            for company in recent_companies:
-                try:
-                    # Analyze trend
-                    trend_result = self.trend_analyzer.analyze_company_trend(company.id)
-                    
-                    if trend_result:
-                        # Save to database
-                        trend_analysis = self.trend_analyzer.save_trend_analysis(trend_result)
-                        trends.append(trend_analysis)
+            # Keys of the trends already committed, so a retry can't write them twice
+            written = set()
+            try:
+                # All companies in one pass, trends and alerts written in batches
+                trend_results = self.trend_analyzer.analyze_company_trends(company.id for company in recent_companies)
+                with BatchWriter(after_commit=written.update) as writer:
+                    for company in recent_companies:
+                        trends.append(self.trend_analyzer.save_trend_analysis(trend_results[company.id], writer))
+                
+                for company in recent_companies:
+                    logger.info(f"Generated trend for {company.ticker}: {trend_results[company.id].trend_category}")
+                return [trend for trend in trends if ('trend', trend.company_id) in written]
+                
+            except Exception as e:
+                logger.error(f"Bulk trend analysis failed after writing {len(written)} trends, "
+                             f"retrying the rest one company at a time: {str(e)}")
+                db.session.rollback()
+            
+            trends = [trend for trend in trends if ('trend', trend.company_id) in written]
+            recent_companies = [company for company in recent_companies if ('trend', company.id) not in written]
+            with BatchWriter() as writer:
+                for company in recent_companies:
+                    try:
+                        # Analyze trend
+                        trend_result = self.trend_analyzer.analyze_company_trend(company.id)
                         
-                        logger.info(f"Generated trend for {company.ticker}: {trend_result.trend_category}")
-                    
-                except Exception as e:
-                    logger.error(f"Error generating trend for {company.ticker}: {str(e)}")
-                    continue
+                        if trend_result:
+                            # Queue for the batched write
+                            trend_analysis = self.trend_analyzer.save_trend_analysis(trend_result, writer)
+                            trends.append(trend_analysis)
+                            
+                            logger.info(f"Generated trend for {company.ticker}: {trend_result.trend_category}")
+                        
+                    except Exception as e:
+                        logger.error(f"Error generating trend for {company.ticker}: {str(e)}")
+                        continue
             
         except Exception as e:
             logger.error(f"Error generating trend analyses: {str(e)}")
@@ -0,0 +1,206 @@
+"""Disk-backed LRU Cache"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DiskLRUCache:
+    """Key/value cache stored in a SQLite file with least-recently-used size caps
+
+    Values are JSON-serializable objects. Every read bumps the entry's access
+    sequence number; once the cache holds more than ``max_entries``, or its
+    values more than ``max_bytes`` of JSON, the least recently used entries
+    are evicted. The caps are checked every ``evict_every`` writes and
+    whenever a twentieth of ``max_bytes`` has been written since the last
+    check, so they can be overshot by at most that much.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1_000_000, evict_every: int = 1000,
+                 max_bytes: Optional[int] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self._writes_since_evict = 0
+        self._bytes_since_evict = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed INTEGER NOT NULL, '
+            'size INTEGER NOT NULL DEFAULT 0)'
+        )
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(entries)')}
+        if 'size' not in columns:
+            # Files from before the byte cap: record each value's size once
+            self._conn.execute('ALTER TABLE entries ADD COLUMN size INTEGER NOT NULL DEFAULT 0')
+            self._conn.execute('UPDATE entries SET size = LENGTH(CAST(value AS BLOB))')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS ix_entries_accessed ON entries (accessed)')
+        self._conn.commit()
+
+        row = self._conn.execute('SELECT MAX(accessed) FROM entries').fetchone()
+        self._sequence = row[0] or 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a single value, or None if missing"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get the values present for the given keys"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        if not keys:
+            return found
+
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f'SELECT key, value FROM entries WHERE key IN ({placeholders})', batch
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = json.loads(value)
+
+            if found:
+                self._sequence += 1
+                self._conn.executemany(
+                    'UPDATE entries SET accessed = ? WHERE key = ?',
+                    [(self._sequence, key) for key in found]
+                )
+                self._conn.commit()
+
+        return found
+
+    def set(self, key: str, value: Any):
+        """Store a single value"""
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Iterable[Tuple[str, Any]]):
+        """Store several values in one transaction, evicting if over the cap"""
+        items = list(items)
+        if not items:
+            return
+
+        rows = []
+        for key, value in items:
+            value = json.dumps(value)
+            rows.append((key, value, len(value.encode('utf-8'))))
+
+        with self._lock:
+            self._sequence += 1
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO entries (key, value, accessed, size) VALUES (?, ?, ?, ?)',
+                [(key, value, self._sequence, size) for key, value, size in rows]
+            )
+            self._writes_since_evict += len(rows)
+            self._bytes_since_evict += sum(size for _, _, size in rows)
+            if (self._writes_since_evict >= self.evict_every
+                    or (self.max_bytes is not None and self._bytes_since_evict >= self.max_bytes // 20)):
+                self._evict()
+            self._conn.commit()
+
+    def delete(self, key: str):
+        """Remove a single entry"""
+        with self._lock:
+            self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._conn.execute('DELETE FROM entries')
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def total_bytes(self) -> int:
+        """Bytes of JSON held in values"""
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def _evict(self):
+        """Drop least recently used entries beyond max_entries and max_bytes (lock held)"""
+        self._writes_since_evict = 0
+        self._bytes_since_evict = 0
+        count, total = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                'DELETE FROM entries WHERE key IN '
+                '(SELECT key FROM entries ORDER BY accessed ASC LIMIT ?)',
+                (excess,)
+            )
+            logger.debug(f"Evicted {excess} entries from {self.path}")
+            count, total = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+
+        excess_bytes = total - self.max_bytes if self.max_bytes is not None else 0
+        if excess_bytes > 0:
+            # Oldest first, until what is left fits under max_bytes
+            cursor = self._conn.execute(
+                'DELETE FROM entries WHERE key IN ('
+                'SELECT key FROM ('
+                'SELECT key, size, SUM(size) OVER (ORDER BY accessed ASC, key ROWS UNBOUNDED PRECEDING) AS running '
+                'FROM entries) WHERE running - size < ?)',
+                (excess_bytes,)
+            )
+            logger.debug(f"Evicted {cursor.rowcount} entries ({excess_bytes} bytes over) from {self.path}")
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Iterate over entries, most recently used last"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT key, value FROM entries ORDER BY accessed ASC'
+            ).fetchall()
+        for key, value in rows:
+            yield key, json.loads(value)
+
+    def export(self, path: str) -> int:
+        """Write every entry to a JSON Lines file, returning the entry count"""
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for key, value in self.items():
+                f.write(json.dumps({'key': key, 'value': value}) + '\n')
+                count += 1
+        logger.info(f"Exported {count} cache entries to {path}")
+        return count
+
+    def warm(self, path: str, batch_size: int = 5000) -> int:
+        """Load entries from a JSON Lines export, returning the entry count"""
+        count = 0
+        batch: List[Tuple[str, Any]] = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                batch.append((entry['key'], entry['value']))
+                if len(batch) >= batch_size:
+                    self.set_many(batch)
+                    count += len(batch)
+                    batch = []
+        if batch:
+            self.set_many(batch)
+            count += len(batch)
+        logger.info(f"Warmed cache {self.path} with {count} entries from {path}")
+        return count
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
@@ -1,16 +1,24 @@
 """Earnings Call API Client"""
 import logging
-import time
-from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
 import requests
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
 from config.config import Config
+from app.services import response_cache
+from app.services.rate_limiter import get_rate_limiter, parse_retry_after
+from app.services.usage_buffer import get_usage_buffer
 
 logger = logging.getLogger(__name__)
 
+# Days from the start of a fiscal quarter's last month to the latest call reporting it,
+# with room for fiscal years that end after the calendar year they are named for
+CALL_LAG_DAYS = 210
+
 
 class EarningsCallError(Exception):
     """Base exception for Earnings Call API errors"""
@@ -25,22 +33,48 @@ class EarningsCallRateLimitError(EarningsCallError):
 class EarningsCallClient:
     """Client for Earnings Call API"""
     
+    # Response cache class per endpoint; a trailing slash matches the first path segment
+    CACHE_CLASSES = {
+        'transcript': response_cache.TRANSCRIPT,
+        'transcripts/': response_cache.SYMBOLS,
+        'symbols': response_cache.SYMBOLS,
+        'events': response_cache.EVENTS,
+        'search': response_cache.EVENTS,
+        'batch-transcripts': response_cache.EVENTS
+    }
+    
     def __init__(self, api_key: Optional[str] = None, config: Optional[Config] = None):
         """Initialize Earnings Call client"""
         self.config = config or Config()
         self.api_key = api_key or self.config.EARNINGS_CALL_API_KEY
-        self.base_url = "https://v2.api.earningscall.biz"  # Updated to v2 API
-        self.rate_limit_delay = 0.5  # 500ms between calls
+        self.base_url = self.config.EARNINGS_CALL_BASE_URL
         self.timeout = 30
+        self.max_concurrency = max(1, self.config.EARNINGS_CALL_MAX_CONCURRENCY)
+        self.rate_limit_retries = self.config.EARNINGS_CALL_RATE_LIMIT_RETRIES
+        self.batch_size = self.config.EARNINGS_CALL_BATCH_SIZE
+        self.response_cache = response_cache.get_response_cache(self.config)
+        self.usage_buffer = get_usage_buffer(self.config)
+        
+        # One bucket per API for the whole process, so parallel clients share the limit
+        self.rate_limiter = get_rate_limiter(
+            self.base_url,
+            self.config.EARNINGS_CALL_RATE_LIMIT,
+            self.config.EARNINGS_CALL_BURST
+        )
         
-        # Configure session with retry logic
+        # Configure session with retry logic; 429s are handled in _make_request
+        # so the backoff applies to every thread, not just the one that saw it
         self.session = requests.Session()
         retry_strategy = Retry(
             total=3,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 503, 504],
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=self.max_concurrency,
+            pool_maxsize=self.max_concurrency
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
         
@@ -50,8 +84,17 @@ class EarningsCallClient:
         })
         
         # Track API usage
-        self._last_request_time = 0
         self._request_count = 0
+        self._count_lock = threading.Lock()
+        
+        # Transcript fetch counts, to compare batched and one-at-a-time fetching
+        self.fetch_stats = {
+            'transcripts_requested': 0,
+            'batch_requests': 0,
+            'single_requests': 0,
+            'batch_hits': 0,
+            'fallbacks': 0
+        }
     
     def _make_request(
         self, 
@@ -61,44 +104,79 @@ class EarningsCallClient:
         data: Optional[Dict[str, Any]] = None
     ) -> Any:
         """Make API request with rate limiting and error handling"""
-        # Enforce rate limiting
-        self._enforce_rate_limit()
-        
         url = f"{self.base_url}/{endpoint}"
         
+        # Serve from the response cache when the entry is still fresh
+        cache_class = cache_key = entry = None
+        headers = {}
+        if self.response_cache is not None:
+            cache_class = self.response_cache.classify(endpoint, self.CACHE_CLASSES)
+        if cache_class is not None:
+            cache_key = self.response_cache.key(self.base_url, method, endpoint, params, data)
+            entry, usable = self.response_cache.lookup(cache_key)
+            if usable:
+                logger.debug(f"Cached response for {endpoint}")
+                return entry['body']
+            if self.response_cache.offline:
+                raise EarningsCallError(f"No cached response for {endpoint} (offline)")
+            headers = self.response_cache.revalidation_headers(entry)
+        
         # Add API key to params (v2 API requires it as query parameter)
         if params is None:
             params = {}
         params['apikey'] = self.api_key
         
         try:
-            logger.debug(f"Making {method} request to {url}")
-            
-            if method == 'GET':
-                response = self.session.get(url, params=params, timeout=self.timeout)
-            elif method == 'POST':
-                response = self.session.post(url, json=data, params=params, timeout=self.timeout)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
-            
-            # Track successful request
-            self._track_api_usage(endpoint, True)
+            for attempt in range(self.rate_limit_retries + 1):
+                # Enforce rate limiting
+                self._enforce_rate_limit()
+                
+                logger.debug(f"Making {method} request to {url}")
+                
+                if method == 'GET':
+                    response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                elif method == 'POST':
+                    response = self.session.post(url, json=data, params=params, headers=headers, timeout=self.timeout)
+                else:
+                    raise ValueError(f"Unsupported method: {method}")
+                
+                if response.status_code != 429:
+                    break
+                
+                # Rate limited: hold back every thread until the server says to retry
+                retry_after = parse_retry_after(response.headers.get('Retry-After'), default=2.0 ** attempt)
+                logger.warning(f"Rate limited on {endpoint}, pausing all requests for {retry_after:.1f}s")
+                self.rate_limiter.pause(retry_after)
+                if attempt < self.rate_limit_retries:
+                    # The final 429 is counted with the error below
+                    self._track_api_usage(endpoint, False)
             
             # Check for rate limit
             if response.status_code == 429:
                 raise EarningsCallRateLimitError("Rate limit exceeded")
             
+            # Cached entry is still current
+            if response.status_code == 304 and entry is not None:
+                self.response_cache.refresh(cache_key, entry, response.headers)
+                self._track_api_usage(endpoint, True)
+                return entry['body']
+            
             # Check for other errors
             response.raise_for_status()
             
             # Parse JSON response
-            data = response.json()
+            result = response.json()
             
             # Check for API errors in response
-            if isinstance(data, dict) and 'error' in data:
-                raise EarningsCallError(f"API Error: {data['error']}")
+            if isinstance(result, dict) and 'error' in result:
+                raise EarningsCallError(f"API Error: {result['error']}")
             
-            return data
+            if cache_key is not None:
+                self.response_cache.store(cache_key, cache_class, result, response.headers)
+            
+            # Track successful request
+            self._track_api_usage(endpoint, True)
+            return result
             
         except requests.exceptions.Timeout:
             logger.error(f"Request timeout for {endpoint}")
@@ -116,17 +194,25 @@ class EarningsCallClient:
             raise
     
     def _enforce_rate_limit(self):
-        """Enforce rate limiting between requests"""
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
-        
-        if time_since_last_request < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_request
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
+        """Wait for a token from the shared rate limiter"""
+        waited = self.rate_limiter.acquire()
+        if waited:
+            logger.debug(f"Rate limiting: waited {waited:.2f} seconds")
         
-        self._last_request_time = time.time()
-        self._request_count += 1
+        with self._count_lock:
+            self._request_count += 1
+    
+    def _count_fetch(self, name: str, amount: int = 1):
+        with self._count_lock:
+            self.fetch_stats[name] += amount
+    
+    def get_fetch_stats(self) -> Dict[str, Any]:
+        """Transcript fetch counts, with the requests batching saved over one per transcript"""
+        with self._count_lock:
+            stats = dict(self.fetch_stats)
+        stats['requests'] = stats['batch_requests'] + stats['single_requests']
+        stats['requests_saved'] = stats['transcripts_requested'] - stats['requests']
+        return stats
     
     def _track_api_usage(self, endpoint: str, success: bool):
         """Track API usage for monitoring"""
@@ -134,6 +220,8 @@ class EarningsCallClient:
             f"API call to {endpoint}: {'success' if success else 'failed'} "
             f"(Total calls: {self._request_count})"
         )
+        # Counted in memory and written to api_usage in batches, per endpoint family
+        self.usage_buffer.record(f"earnings_call:{endpoint.partition('/')[0]}", success)
     
     # Transcript Methods
     
@@ -153,24 +241,158 @@ class EarningsCallClient:
             'quarter': quarter
         }
         
+        self._count_fetch('single_requests')
         try:
             result = self._make_request(endpoint, params=params)
             if result:
-                # Standardize the response format
-                return {
-                    'symbol': ticker,
-                    'year': year,
-                    'quarter': quarter,
-                    'date': result.get('date'),
-                    'content': result.get('transcript', ''),
-                    'participants': result.get('participants', []),
-                    'qa_session': result.get('qa_session', [])
-                }
+                return self._standardize_transcript(ticker, year, quarter, result)
             return None
         except EarningsCallError as e:
             logger.error(f"Failed to fetch transcript for {ticker} {year}Q{quarter}: {e}")
             return None
     
+    @staticmethod
+    def _standardize_transcript(ticker: str, year: int, quarter: int, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Standardize the response format of a single or batched transcript"""
+        return {
+            'symbol': ticker,
+            'year': year,
+            'quarter': quarter,
+            'date': result.get('date'),
+            'content': result.get('transcript', '') or result.get('content', ''),
+            'participants': result.get('participants', []),
+            'qa_session': result.get('qa_session', [])
+        }
+    
+    def get_transcripts(
+        self,
+        keys: Iterable[Tuple[str, int, int]],
+        exchange: str = 'nasdaq'
+    ) -> Iterator[Tuple[Tuple[str, int, int], Optional[Dict[str, Any]]]]:
+        """Fetch several transcripts concurrently, yielding ((ticker, year, quarter), transcript) as each completes
+        
+        Keys are split into groups by _plan_groups, each fetched with one
+        batch-transcripts request; anything a batch lacks is fetched on its
+        own. Up to max_concurrency requests are in flight at once, all drawing
+        from the shared rate limiter. Only a few more than that are started
+        ahead of the consumer, so a slow consumer holds back fetching instead
+        of piling up transcripts in memory. Failed fetches yield None, like
+        get_transcript.
+        """
+        groups = iter(self._plan_groups(keys))
+        window = self.max_concurrency * 2
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {}
+            
+            def submit_next() -> bool:
+                group = next(groups, None)
+                if group is None:
+                    return False
+                self._count_fetch('transcripts_requested', len(group))
+                if len(group) == 1:
+                    future = executor.submit(self._fetch_single, group[0], exchange)
+                else:
+                    future = executor.submit(self._fetch_batch, group, exchange)
+                futures[future] = group
+                return True
+            
+            while len(futures) < window and submit_next():
+                pass
+            
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    futures.pop(future)
+                    submit_next()
+                    yield from future.result()
+    
+    def _plan_groups(self, keys: Iterable[Tuple[str, int, int]]) -> List[List[Tuple[str, int, int]]]:
+        """Split keys into batch request groups
+        
+        A ticker's keys always share a group, so no ticker's history is
+        downloaded by two requests, and tickers are ordered by the periods
+        they need so each group's date range stays narrow. A group holds up
+        to batch_size keys unless one ticker alone needs more; batch_size 1
+        fetches every key on its own.
+        """
+        keys = list(keys)
+        if self.batch_size <= 1:
+            return [[key] for key in keys]
+        
+        by_ticker: Dict[str, List[Tuple[str, int, int]]] = {}
+        for key in keys:
+            by_ticker.setdefault(key[0].upper(), []).append(key)
+        ordered = sorted(
+            by_ticker.values(),
+            key=lambda ticker_keys: (min(key[1:] for key in ticker_keys), max(key[1:] for key in ticker_keys))
+        )
+        
+        groups = []
+        group: List[Tuple[str, int, int]] = []
+        for ticker_keys in ordered:
+            if group and len(group) + len(ticker_keys) > self.batch_size:
+                groups.append(group)
+                group = []
+            group.extend(ticker_keys)
+        if group:
+            groups.append(group)
+        return groups
+    
+    @staticmethod
+    def _batch_date_range(keys: List[Tuple[str, int, int]]) -> Tuple[str, str]:
+        """Start and end call dates that cover the given fiscal periods"""
+        # A fiscal year's first calls can fall in the calendar year before it
+        start_year = min(year for _, year, _ in keys) - 1
+        end_year, end_quarter = max((year, quarter) for _, year, quarter in keys)
+        end_date = date(end_year, end_quarter * 3, 1) + timedelta(days=CALL_LAG_DAYS)
+        return f"{start_year}-01-01", end_date.isoformat()
+    
+    def _fetch_single(
+        self,
+        key: Tuple[str, int, int],
+        exchange: str
+    ) -> List[Tuple[Tuple[str, int, int], Optional[Dict[str, Any]]]]:
+        """One transcript with its own request"""
+        ticker, year, quarter = key
+        return [(key, self.get_transcript(ticker, year, quarter, exchange))]
+    
+    def _fetch_batch(
+        self,
+        keys: List[Tuple[str, int, int]],
+        exchange: str
+    ) -> List[Tuple[Tuple[str, int, int], Optional[Dict[str, Any]]]]:
+        """A group of transcripts with one batch request, fetching any it lacks one by one"""
+        wanted = {(ticker.upper(), year, quarter): (ticker, year, quarter) for ticker, year, quarter in keys}
+        
+        start_date, end_date = self._batch_date_range(keys)
+        
+        self._count_fetch('batch_requests')
+        found = {}
+        tickers = sorted({ticker for ticker, _, _ in keys})
+        for item in self.get_batch_transcripts(tickers, start_date=start_date, end_date=end_date):
+            try:
+                item_key = (str(item.get('symbol') or item.get('ticker')).upper(), int(item['year']), int(item['quarter']))
+            except (KeyError, TypeError, ValueError):
+                continue
+            key = wanted.get(item_key)
+            if key is None or key in found:
+                continue
+            transcript = self._standardize_transcript(*key, item)
+            if transcript['content']:
+                found[key] = transcript
+        
+        self._count_fetch('batch_hits', len(found))
+        results = []
+        for key in keys:
+            if key in found:
+                results.append((key, found[key]))
+            else:
+                # Missing from a failed or partial batch
+                self._count_fetch('fallbacks')
+                results.extend(self._fetch_single(key, exchange))
+        return results
+    
     def get_available_transcripts(self, ticker: str) -> List[Dict[str, Any]]:
         """Get list of available transcripts for a ticker"""
         endpoint = f"transcripts/{ticker}"
@@ -187,13 +409,14 @@ class EarningsCallClient:
     def get_recent_transcripts(
         self, 
         days_back: int = 30,
-        exchange: str = 'nasdaq'
+        exchange: str = 'nasdaq',
+        since: Optional[datetime] = None
     ) -> List[Dict[str, Any]]:
-        """Get transcripts released in the last N days"""
+        """Get transcripts released in the last N days, or at or after ``since`` if given"""
         endpoint = "events"
         # Calculate date range
         end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=days_back)
+        start_date = since.date() if since is not None else end_date - timedelta(days=days_back)
         
         params = {
             'exchange': exchange.lower(),
@@ -207,6 +430,11 @@ class EarningsCallClient:
                 # Filter for events that have transcripts
                 transcripts = []
                 for event in result:
+                    if since is not None:
+                        # The API filters by day; drop what's before the exact watermark
+                        event_at = self.event_time(event)
+                        if event_at is not None and event_at < since:
+                            continue
                     if event.get('hasTranscript', False):
                         transcripts.append({
                             'ticker': event.get('symbol', ''),
@@ -221,6 +449,17 @@ class EarningsCallClient:
             logger.error(f"Failed to fetch recent transcripts: {e}")
             return []
     
+    @staticmethod
+    def event_time(event: Dict[str, Any]) -> Optional[datetime]:
+        """An event's date as a naive UTC datetime, None if missing or unparseable"""
+        try:
+            event_at = datetime.fromisoformat(event['date'].replace('Z', '+00:00'))
+        except (KeyError, ValueError, TypeError, AttributeError):
+            return None
+        if event_at.tzinfo is not None:
+            event_at = event_at.astimezone(timezone.utc).replace(tzinfo=None)
+        return event_at
+    
     def get_companies_list(
         self,
         sector: Optional[str] = None,
@@ -8,7 +8,7 @@ from typing import List, Dict, Any, Optional
 import pandas as pd
 import xlsxwriter
 
-from app.models import Company, Transcript, SentimentAnalysis, TrendAnalysis, db
+from app.models import Company, CompanyLatest, Transcript, SentimentAnalysis, TrendAnalysis, db
 
 logger = logging.getLogger(__name__)
 
@@ -19,18 +19,12 @@ class ExportService:
     def export_companies_data(self, format: str = 'csv', filters: Dict[str, Any] = None) -> bytes:
         """Export companies data with sentiment analysis"""
         try:
-            # Build query
+            # Build query: one row per company with its latest state
             query = db.session.query(
                 Company,
-                TrendAnalysis,
-                SentimentAnalysis,
-                Transcript
+                CompanyLatest
             ).join(
-                TrendAnalysis, TrendAnalysis.company_id == Company.id, isouter=True
-            ).join(
-                Transcript, Transcript.company_id == Company.id, isouter=True
-            ).join(
-                SentimentAnalysis, SentimentAnalysis.transcript_id == Transcript.id, isouter=True
+                CompanyLatest, CompanyLatest.company_id == Company.id, isouter=True
             )
             
             # Apply filters
@@ -38,7 +32,7 @@ class ExportService:
                 if filters.get('sector'):
                     query = query.filter(Company.sector == filters['sector'])
                 if filters.get('trend'):
-                    query = query.filter(TrendAnalysis.trend_category == filters['trend'])
+                    query = query.filter(CompanyLatest.trend_category == filters['trend'])
                 if filters.get('min_market_cap'):
                     query = query.filter(Company.market_cap >= filters['min_market_cap'])
             
@@ -46,19 +40,19 @@ class ExportService:
             
             # Prepare data
             data_rows = []
-            for company, trend, sentiment, transcript in results:
+            for company, latest in results:
                 row = {
                     'ticker': company.ticker,
                     'company_name': company.name,
                     'sector': company.sector,
                     'industry': company.industry,
                     'market_cap': company.market_cap,
-                    'latest_trend': trend.trend_category if trend else None,
-                    'sentiment_change': float(trend.sentiment_change) if trend and trend.sentiment_change else None,
-                    'confidence_change': float(trend.confidence_change) if trend and trend.confidence_change else None,
-                    'latest_sentiment': float(sentiment.overall_sentiment) if sentiment else None,
-                    'latest_confidence': float(sentiment.management_confidence_score) if sentiment else None,
-                    'last_earnings_date': transcript.call_date.isoformat() if transcript and transcript.call_date else None,
+                    'latest_trend': latest.trend_category if latest else None,
+                    'sentiment_change': float(latest.sentiment_change) if latest and latest.sentiment_change else None,
+                    'confidence_change': float(latest.confidence_change) if latest and latest.confidence_change else None,
+                    'latest_sentiment': float(latest.overall_sentiment) if latest and latest.overall_sentiment is not None else None,
+                    'latest_confidence': float(latest.management_confidence_score) if latest and latest.management_confidence_score is not None else None,
+                    'last_earnings_date': latest.call_date.isoformat() if latest and latest.call_date else None,
                     'data_export_date': datetime.utcnow().isoformat()
                 }
                 data_rows.append(row)
@@ -1,14 +1,18 @@
 """Financial Modeling Prep API Client"""
-import time
 import logging
-from datetime import datetime, date
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 from urllib.parse import urljoin
 import requests
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
 from config.config import Config
+from app.services import response_cache
+from app.services.rate_limiter import get_rate_limiter
+from app.services.usage_buffer import get_usage_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,18 @@ class FMPRateLimitError(FMPError):
 class FMPClient:
     """Client for Financial Modeling Prep API"""
     
+    # Response cache class per endpoint; a trailing slash matches the first path segment
+    CACHE_CLASSES = {
+        'earning_call_transcript/': response_cache.TRANSCRIPT,
+        'earning_call_transcript': response_cache.SYMBOLS,
+        'batch_earning_call_transcript/': response_cache.SYMBOLS,
+        'earning-call-transcript-symbols-list': response_cache.SYMBOLS,
+        'profile/': response_cache.SYMBOLS,
+        'key-metrics/': response_cache.SYMBOLS,
+        'income-statement/': response_cache.SYMBOLS,
+        'stock-screener': response_cache.SYMBOLS
+    }
+    
     def __init__(self, api_key: Optional[str] = None, config: Optional[Config] = None):
         """Initialize FMP client"""
         self.config = config or Config()
@@ -33,21 +49,35 @@ class FMPClient:
         self.base_url = self.config.FMP_BASE_URL
         self.rate_limit_delay = self.config.FMP_RATE_LIMIT_DELAY
         self.timeout = self.config.FMP_TIMEOUT
+        self.max_concurrency = max(1, self.config.FMP_MAX_CONCURRENCY)
+        self.response_cache = response_cache.get_response_cache(self.config)
+        self.usage_buffer = get_usage_buffer(self.config)
+        
+        # One bucket for the whole process, so parallel requests and clients share the limit
+        self.rate_limiter = get_rate_limiter(
+            self.base_url,
+            1.0 / self.rate_limit_delay,
+            self.config.FMP_BURST
+        )
         
-        # Configure session with retry logic
+        # Configure session with retry logic, pooled for concurrent requests
         self.session = requests.Session()
         retry_strategy = Retry(
             total=3,
             backoff_factor=1,
             status_forcelist=[429, 500, 502, 503, 504],
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=self.max_concurrency,
+            pool_maxsize=self.max_concurrency
+        )
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
         
         # Track API usage
-        self._last_request_time = 0
         self._request_count = 0
+        self._count_lock = threading.Lock()
     
     def _make_request(
         self, 
@@ -56,6 +86,21 @@ class FMPClient:
         version: str = 'v3'
     ) -> Any:
         """Make API request with rate limiting and error handling"""
+        # Serve from the response cache when the entry is still fresh
+        cache_class = cache_key = entry = None
+        headers = {}
+        if self.response_cache is not None:
+            cache_class = self.response_cache.classify(endpoint, self.CACHE_CLASSES)
+        if cache_class is not None:
+            cache_key = self.response_cache.key(self.base_url, 'GET', f'{version}/{endpoint}', params)
+            entry, usable = self.response_cache.lookup(cache_key)
+            if usable:
+                logger.debug(f"Cached response for {endpoint}")
+                return entry['body']
+            if self.response_cache.offline:
+                raise FMPError(f"No cached response for {endpoint} (offline)")
+            headers = self.response_cache.revalidation_headers(entry)
+        
         # Enforce rate limiting
         self._enforce_rate_limit()
         
@@ -71,16 +116,20 @@ class FMPClient:
             response = self.session.get(
                 url, 
                 params=params, 
+                headers=headers,
                 timeout=self.timeout
             )
             
-            # Track successful request
-            self._track_api_usage(endpoint, True)
-            
             # Check for rate limit
             if response.status_code == 429:
                 raise FMPRateLimitError("Rate limit exceeded")
             
+            # Cached entry is still current
+            if response.status_code == 304 and entry is not None:
+                self.response_cache.refresh(cache_key, entry, response.headers)
+                self._track_api_usage(endpoint, True)
+                return entry['body']
+            
             # Check for other errors
             response.raise_for_status()
             
@@ -91,6 +140,11 @@ class FMPClient:
             if isinstance(data, dict) and 'Error Message' in data:
                 raise FMPError(f"API Error: {data['Error Message']}")
             
+            if cache_key is not None:
+                self.response_cache.store(cache_key, cache_class, data, response.headers)
+            
+            # Track successful request
+            self._track_api_usage(endpoint, True)
             return data
             
         except requests.exceptions.Timeout:
@@ -109,25 +163,22 @@ class FMPClient:
             raise
     
     def _enforce_rate_limit(self):
-        """Enforce rate limiting between requests"""
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
+        """Wait for a token from the shared rate limiter"""
+        waited = self.rate_limiter.acquire()
+        if waited:
+            logger.debug(f"Rate limiting: waited {waited:.2f} seconds")
         
-        if time_since_last_request < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_request
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
-        
-        self._last_request_time = time.time()
-        self._request_count += 1
+        with self._count_lock:
+            self._request_count += 1
     
     def _track_api_usage(self, endpoint: str, success: bool):
         """Track API usage for monitoring"""
-        # This will be implemented to save to database
         logger.info(
             f"API call to {endpoint}: {'success' if success else 'failed'} "
             f"(Total calls: {self._request_count})"
         )
+        # Counted in memory and written to api_usage in batches, per endpoint family
+        self.usage_buffer.record(f"fmp:{endpoint.partition('/')[0]}", success)
     
     # Earnings Transcript Methods
     
@@ -275,42 +326,91 @@ class FMPClient:
     
     def get_recent_transcripts(
         self, 
-        days_back: int = 7
+        days_back: int = 7,
+        limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """Get transcripts released in the last N days"""
-        # This would need to be implemented by checking each company
-        # FMP doesn't have a direct endpoint for recent transcripts across all companies
-        transcripts = []
+        return list(self.iter_recent_transcripts(days_back=days_back, limit=limit))
+    
+    def iter_recent_transcripts(
+        self,
+        days_back: int = 7,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield transcripts released in the last N days as they arrive
+        
+        FMP doesn't have a direct endpoint for recent transcripts across all
+        companies, so each symbol's transcript list is checked. Listings and
+        the transcripts they turn up are fetched concurrently, up to
+        max_concurrency at a time under the shared rate limit, with only a
+        few listings started ahead of the consumer. Once ``limit``
+        transcripts have been yielded the remaining requests are dropped.
+        """
+        # Released within days_back whole days, as (now - date).days <= days_back
+        cutoff = datetime.now() - timedelta(days=days_back + 1)
         
         # Get all symbols with transcripts
-        symbols = self.get_transcript_symbols()
+        symbols = iter([
+            symbol for symbol, count in self.get_transcript_symbols()[:100]  # Limit to avoid too many API calls
+            if count > 0
+        ])
+        window = self.max_concurrency * 2
+        yielded = 0
         
-        for symbol, count in symbols[:100]:  # Limit to avoid too many API calls
-            if count > 0:
-                # Get available transcripts for this symbol
-                available = self.get_available_transcripts(symbol)
-                
-                # Filter by date
-                for transcript_meta in available:
-                    # Parse date if available
-                    if 'date' in transcript_meta:
-                        try:
-                            transcript_date = datetime.fromisoformat(
-                                transcript_meta['date'].replace('Z', '+00:00')
-                            )
-                            if (datetime.now() - transcript_date).days <= days_back:
-                                # Fetch full transcript
-                                full_transcript = self.get_transcript(
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {}
+            
+            def submit_listing() -> bool:
+                for symbol in symbols:
+                    futures[executor.submit(self.get_available_transcripts, symbol)] = ('listing', symbol)
+                    return True
+                return False
+            
+            while len(futures) < window and submit_listing():
+                pass
+            
+            try:
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        kind, symbol = futures.pop(future)
+                        
+                        if kind == 'transcript':
+                            full_transcript = future.result()
+                            if full_transcript:
+                                yield full_transcript
+                                yielded += 1
+                                if limit and yielded >= limit:
+                                    return
+                            continue
+                        
+                        # A listing: fetch the transcripts inside the date window
+                        for transcript_meta in future.result():
+                            if self._released_since(transcript_meta, cutoff):
+                                futures[executor.submit(
+                                    self.get_transcript,
                                     symbol,
                                     transcript_meta.get('year'),
                                     transcript_meta.get('quarter')
-                                )
-                                if full_transcript:
-                                    transcripts.append(full_transcript)
-                        except (ValueError, TypeError):
-                            continue
-        
-        return transcripts
+                                )] = ('transcript', symbol)
+                        
+                        while sum(1 for kind, _ in futures.values() if kind == 'listing') < window and submit_listing():
+                            pass
+            finally:
+                # Early cutoff or consumer gone: drop whatever hasn't started
+                for future in futures:
+                    future.cancel()
+    
+    @staticmethod
+    def _released_since(transcript_meta: Dict[str, Any], cutoff: datetime) -> bool:
+        """Whether a listed transcript's date is after the cutoff"""
+        if not isinstance(transcript_meta, dict) or 'date' not in transcript_meta:
+            return False
+        try:
+            transcript_date = datetime.fromisoformat(transcript_meta['date'].replace('Z', '+00:00'))
+        except (ValueError, TypeError, AttributeError):
+            return False
+        return transcript_date.replace(tzinfo=None) > cutoff
     
     def test_connection(self) -> bool:
         """Test API connection and credentials"""
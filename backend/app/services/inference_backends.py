@@ -0,0 +1,128 @@
+"""Pluggable FinBERT Inference Backends"""
+import logging
+import os
+from typing import List
+
+import numpy as np
+import torch
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('torch', 'torch_int8', 'onnx')
+
+
+class TorchBackend:
+    """PyTorch inference, fp32 or dynamically quantized to int8"""
+
+    def __init__(self, model, name: str = 'torch'):
+        self.name = name
+        self.device = torch.device('cuda' if torch.cuda.is_available() and name == 'torch' else 'cpu')
+        self.model = model.to(self.device)
+        self.model.eval()
+
+        id2label = model.config.id2label
+        self.labels: List[str] = [id2label[i].lower() for i in range(len(id2label))]
+
+    def predict(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Class probabilities for a padded batch"""
+        with torch.no_grad():
+            outputs = self.model(
+                input_ids=torch.from_numpy(input_ids).to(self.device),
+                attention_mask=torch.from_numpy(attention_mask).to(self.device)
+            )
+            return torch.softmax(outputs.logits, dim=-1).cpu().numpy()
+
+
+class OnnxBackend:
+    """ONNX Runtime inference on CPU from an exported FinBERT graph"""
+
+    name = 'onnx'
+
+    def __init__(self, model, onnx_path: str, num_threads: int = 0):
+        if ort is None:
+            raise ImportError("onnxruntime is not installed")
+
+        id2label = model.config.id2label
+        self.labels: List[str] = [id2label[i].lower() for i in range(len(id2label))]
+
+        if not os.path.exists(onnx_path):
+            export_onnx(model, onnx_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(onnx_path, options, providers=['CPUExecutionProvider'])
+
+    def predict(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Class probabilities for a padded batch"""
+        logits = self.session.run(
+            ['logits'],
+            {'input_ids': input_ids, 'attention_mask': attention_mask}
+        )[0]
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Wraps a HuggingFace classifier so the exported graph returns plain logits"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+
+def export_onnx(model, onnx_path: str):
+    """Export a sequence classification model to ONNX with dynamic batch and length axes"""
+    logger.info(f"Exporting FinBERT to ONNX at {onnx_path}")
+    os.makedirs(os.path.dirname(os.path.abspath(onnx_path)), exist_ok=True)
+
+    wrapped = _LogitsOnly(model.to('cpu').eval()).eval()
+    dummy = torch.ones((1, 8), dtype=torch.int64)
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapped,
+            (dummy, dummy),
+            onnx_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'}
+            },
+            opset_version=14
+        )
+
+
+def load_backend(name: str, model, onnx_path: str = '', num_threads: int = 0):
+    """Build the configured backend, falling back to fp32 PyTorch if it is unavailable"""
+    name = (name or 'torch').lower()
+    if name not in BACKENDS:
+        logger.warning(f"Unknown FinBERT backend '{name}', using torch")
+        name = 'torch'
+
+    if num_threads and name != 'onnx':
+        torch.set_num_threads(num_threads)
+
+    try:
+        if name == 'torch_int8':
+            quantized = torch.quantization.quantize_dynamic(
+                model.to('cpu').eval(), {torch.nn.Linear}, dtype=torch.qint8
+            )
+            return TorchBackend(quantized, name='torch_int8')
+        if name == 'onnx':
+            return OnnxBackend(model, onnx_path, num_threads=num_threads)
+    except Exception as e:
+        logger.error(f"Failed to initialize FinBERT backend '{name}', using torch: {str(e)}")
+
+    return TorchBackend(model)
@@ -0,0 +1,107 @@
+"""Batched FinBERT Inference Engine"""
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChunkScore:
+    """FinBERT prediction for a single chunk"""
+    label: str
+    score: float
+
+
+class BatchInferenceEngine:
+    """Runs FinBERT over many chunks using length-sorted, padded batches
+
+    The forward pass is delegated to an inference backend (see
+    inference_backends) exposing ``labels`` and ``predict(input_ids, attention_mask)``.
+    """
+
+    def __init__(self, tokenizer, backend, max_batch_size: int = 32,
+                 max_batch_tokens: int = 8192, max_length: int = 512):
+        self.tokenizer = tokenizer
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_length = max_length
+        self.pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else 0
+        self.labels = backend.labels
+
+    def score(self, texts: Sequence[str]) -> List[Optional[ChunkScore]]:
+        """Score texts, returning one result per input (None if its batch failed)"""
+        return self.score_encoded(self.encode(texts))
+
+    def encode(self, texts: Sequence[str]) -> List[List[int]]:
+        """Tokenize texts into input IDs (special tokens included)"""
+        if not texts:
+            return []
+        return self.tokenizer(
+            list(texts),
+            truncation=True,
+            max_length=self.max_length
+        )['input_ids']
+
+    def score_encoded(self, sequences: Sequence[List[int]]) -> List[Optional[ChunkScore]]:
+        """Score already-tokenized sequences (special tokens included)"""
+        results: List[Optional[ChunkScore]] = [None] * len(sequences)
+
+        for batch in self.plan_batches([len(seq) for seq in sequences]):
+            try:
+                batch_scores = self.run_batch([sequences[i] for i in batch])
+                for index, chunk_score in zip(batch, batch_scores):
+                    results[index] = chunk_score
+            except Exception as e:
+                logger.warning(f"Error scoring batch of {len(batch)} chunks: {str(e)}")
+                continue
+
+        return results
+
+    def plan_batches(self, lengths: Sequence[int],
+                     max_batch_tokens: Optional[int] = None) -> List[List[int]]:
+        """Group sequence indices into batches of similar length
+
+        Sequences are sorted by token length so each batch pads to a length
+        close to its members, and a batch is closed once its padded size
+        would exceed ``max_batch_tokens`` or it holds ``max_batch_size`` items.
+        """
+        max_batch_tokens = max_batch_tokens or self.max_batch_tokens
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+
+        batches = []
+        current: List[int] = []
+
+        for index in order:
+            # Sorted ascending, so this sequence sets the padded length
+            padded_size = (len(current) + 1) * lengths[index]
+            if current and (len(current) >= self.max_batch_size or padded_size > max_batch_tokens):
+                batches.append(current)
+                current = []
+            current.append(index)
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    def run_batch(self, sequences: List[List[int]]) -> List[ChunkScore]:
+        """Pad sequences and run a single forward pass"""
+        max_len = max(len(seq) for seq in sequences)
+        input_ids = np.full((len(sequences), max_len), self.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(sequences), max_len), dtype=np.int64)
+
+        for row, seq in enumerate(sequences):
+            input_ids[row, :len(seq)] = seq
+            attention_mask[row, :len(seq)] = 1
+
+        probabilities = self.backend.predict(input_ids, attention_mask)
+
+        best = probabilities.argmax(axis=-1)
+        return [
+            ChunkScore(label=self.labels[label_id], score=float(probabilities[row, label_id]))
+            for row, label_id in enumerate(best)
+        ]
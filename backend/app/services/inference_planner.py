@@ -0,0 +1,115 @@
+"""Span-level FinBERT Inference Planner"""
+import logging
+from bisect import bisect_left
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .inference_engine import ChunkScore
+from .text_chunker import TextChunk, TokenChunker
+
+logger = logging.getLogger(__name__)
+
+Span = Tuple[int, int]
+
+
+class InferencePlan:
+    """Maps overlapping segments of one text onto disjoint units scored once
+
+    Segments (the full text, sections, CEO/CFO excerpts, guidance sentences)
+    are character spans of the same text and overlap heavily. The text is cut
+    at every segment boundary into disjoint units; each unit is chunked and
+    scored once, and a segment's chunk scores are the scores of the units it
+    covers.
+    """
+
+    def __init__(self, text: str, segment_spans: Dict[str, List[Span]]):
+        self.text = text
+        self.segment_spans = segment_spans
+        self.units = self._cut_units(segment_spans)
+        self._unit_starts = [start for start, _ in self.units]
+
+    def _cut_units(self, segment_spans: Dict[str, List[Span]]) -> List[Span]:
+        """Split the covered parts of the text at every segment boundary"""
+        boundaries = set()
+        covered = []
+        for spans in segment_spans.values():
+            for start, end in spans:
+                if start < end:
+                    boundaries.update((start, end))
+                    covered.append((start, end))
+
+        if not covered:
+            return []
+
+        # Merge covered ranges so gaps between segments are not scored
+        covered.sort()
+        merged = [list(covered[0])]
+        for start, end in covered[1:]:
+            if start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        points = sorted(boundaries)
+        units = []
+        range_index = 0
+        for start, end in zip(points, points[1:]):
+            while merged[range_index][1] <= start:
+                range_index += 1
+            if merged[range_index][0] <= start:
+                units.append((start, end))
+
+        return units
+
+    def chunk_units(self, chunker: TokenChunker) -> Dict[Span, List[TextChunk]]:
+        """Split every unit into token windows with one tokenizer call"""
+        chunked = chunker.chunk_many([self.text[start:end] for start, end in self.units])
+        return dict(zip(self.units, chunked))
+
+    def segment_scores(self, unit_scores: Dict[Hashable, List[ChunkScore]]) -> Dict[str, List[ChunkScore]]:
+        """Gather each segment's chunk scores from the per-unit results"""
+        results = {}
+        for segment, spans in self.segment_spans.items():
+            scores = []
+            for start, end in spans:
+                for unit in self._units_within(start, end):
+                    scores.extend(unit_scores.get(unit, []))
+            results[segment] = scores
+        return results
+
+    def _units_within(self, start: int, end: int) -> List[Span]:
+        """Units inside [start, end), which by construction tile the span"""
+        units = []
+        index = bisect_left(self._unit_starts, start)
+        while index < len(self.units) and self.units[index][1] <= end:
+            units.append(self.units[index])
+            index += 1
+        return units
+
+    @property
+    def planned_chars(self) -> int:
+        """Characters sent to the model under this plan"""
+        return sum(end - start for start, end in self.units)
+
+    @property
+    def naive_chars(self) -> int:
+        """Characters sent to the model if every segment were scored separately"""
+        return sum(end - start for spans in self.segment_spans.values() for start, end in spans)
+
+
+def locate_spans(text: str, fragments: Sequence[str]) -> List[Optional[Span]]:
+    """Find each fragment in text, scanning forward from the previous hit first"""
+    spans = []
+    cursor = 0
+    for fragment in fragments:
+        if not fragment:
+            spans.append(None)
+            continue
+        position = text.find(fragment, cursor)
+        if position == -1:
+            position = text.find(fragment)
+        if position == -1:
+            spans.append(None)
+            continue
+        spans.append((position, position + len(fragment)))
+        cursor = position + len(fragment)
+    return spans
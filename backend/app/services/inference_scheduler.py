@@ -0,0 +1,180 @@
+"""Cross-Transcript Inference Scheduler"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from .inference_engine import BatchInferenceEngine, ChunkScore
+from .score_cache import ScoreCache
+from .text_chunker import TextChunk
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SchedulerStats:
+    """Throughput statistics for a scheduler run"""
+    transcripts: int = 0
+    chunks: int = 0
+    batches: int = 0
+    failed_chunks: int = 0
+    cached_chunks: int = 0
+    real_tokens: int = 0
+    padded_tokens: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        """Scored chunks per second of wall-clock time"""
+        if self.elapsed_seconds > 0:
+            return self.chunks / self.elapsed_seconds
+        return 0.0
+
+    @property
+    def padding_waste(self) -> float:
+        """Fraction of the padded token budget spent on padding"""
+        if self.padded_tokens > 0:
+            return 1.0 - self.real_tokens / self.padded_tokens
+        return 0.0
+
+    def add(self, other: 'SchedulerStats'):
+        """Accumulate another run's counters (elapsed time is left to the caller)"""
+        self.transcripts += other.transcripts
+        self.chunks += other.chunks
+        self.batches += other.batches
+        self.failed_chunks += other.failed_chunks
+        self.cached_chunks += other.cached_chunks
+        self.real_tokens += other.real_tokens
+        self.padded_tokens += other.padded_tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary"""
+        return {
+            'transcripts': self.transcripts,
+            'chunks': self.chunks,
+            'batches': self.batches,
+            'failed_chunks': self.failed_chunks,
+            'cached_chunks': self.cached_chunks,
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'chunks_per_second': round(self.chunks_per_second, 2),
+            'padding_waste': round(self.padding_waste, 4)
+        }
+
+
+class InferenceScheduler:
+    """Global FinBERT work queue shared by many transcripts
+
+    Chunks from every submitted transcript go into one queue, are packed into
+    batches of similar token length regardless of which company they belong
+    to, and their scores are streamed back into per-transcript accumulators.
+    A transcript is yielded as soon as its last chunk has been scored.
+    Chunks found in the score cache never enter the queue.
+    """
+
+    def __init__(self, engine: BatchInferenceEngine, max_batch_tokens: Optional[int] = None,
+                 cache: Optional[ScoreCache] = None):
+        self.engine = engine
+        self.max_batch_tokens = max_batch_tokens or engine.max_batch_tokens
+        self.cache = cache
+        self.stats = SchedulerStats()
+
+        # Work queue: one entry per chunk
+        self._owners: List[Tuple[Hashable, Hashable]] = []
+        self._sequences: List[List[int]] = []
+        self._chunk_texts: List[str] = []
+        self._positions: List[int] = []  # Submission order of each queued chunk
+        self._submitted = 0
+
+        # Per-transcript accumulators
+        self._results: Dict[Hashable, Dict[Hashable, List[Tuple[int, ChunkScore]]]] = {}
+        self._pending: Dict[Hashable, int] = {}
+
+    def submit(self, transcript_key: Hashable, segments: Dict[Hashable, List[TextChunk]]):
+        """Queue every chunk of a transcript's segments (or planned units)"""
+        self._results[transcript_key] = {segment: [] for segment in segments}
+        self._pending[transcript_key] = 0
+
+        queued = [(segment, chunk) for segment, chunks in segments.items() for chunk in chunks]
+        if self.cache is not None:
+            cached = self.cache.lookup([chunk.text for _, chunk in queued])
+        else:
+            cached = [None] * len(queued)
+
+        for (segment, chunk), chunk_score in zip(queued, cached):
+            position = self._submitted
+            self._submitted += 1
+            if chunk_score is not None:
+                self._results[transcript_key][segment].append((position, chunk_score))
+                self.stats.cached_chunks += 1
+                continue
+            self._positions.append(position)
+            self._owners.append((transcript_key, segment))
+            self._sequences.append(chunk.input_ids)
+            self._chunk_texts.append(chunk.text)
+            self._pending[transcript_key] += 1
+
+        self.stats.transcripts += 1
+
+    def run(self) -> Iterator[Tuple[Hashable, Dict[Hashable, List[ChunkScore]]]]:
+        """Score the queue, yielding (transcript_key, segment_scores) as transcripts complete"""
+        start_time = time.time()
+
+        # Transcripts without any uncached chunks are complete before inference starts
+        for transcript_key, pending in list(self._pending.items()):
+            if pending == 0:
+                yield transcript_key, self._complete(transcript_key)
+
+        sequences = self._sequences
+        lengths = [len(seq) for seq in sequences]
+        batches = self.engine.plan_batches(lengths, max_batch_tokens=self.max_batch_tokens)
+
+        for batch in batches:
+            batch_lengths = [lengths[i] for i in batch]
+            self.stats.batches += 1
+            self.stats.chunks += len(batch)
+            self.stats.real_tokens += sum(batch_lengths)
+            self.stats.padded_tokens += max(batch_lengths) * len(batch)
+
+            try:
+                batch_scores = self.engine.run_batch([sequences[i] for i in batch])
+            except Exception as e:
+                logger.warning(f"Error scoring batch of {len(batch)} chunks: {str(e)}")
+                self.stats.failed_chunks += len(batch)
+                batch_scores = [None] * len(batch)
+
+            if self.cache is not None:
+                self.cache.store([self._chunk_texts[i] for i in batch], batch_scores)
+
+            completed = []
+            for index, chunk_score in zip(batch, batch_scores):
+                transcript_key, segment = self._owners[index]
+                if chunk_score is not None:
+                    self._results[transcript_key][segment].append((self._positions[index], chunk_score))
+                self._pending[transcript_key] -= 1
+                if self._pending[transcript_key] == 0:
+                    completed.append(transcript_key)
+
+            for transcript_key in completed:
+                yield transcript_key, self._complete(transcript_key)
+
+        self.stats.elapsed_seconds = time.time() - start_time
+        self._owners = []
+        self._sequences = []
+        self._chunk_texts = []
+        self._positions = []
+
+        logger.info(
+            f"Inference scheduler scored {self.stats.chunks} chunks from "
+            f"{self.stats.transcripts} transcripts in {self.stats.batches} batches "
+            f"({self.stats.cached_chunks} served from cache, "
+            f"{self.stats.chunks_per_second:.1f} chunks/sec, "
+            f"{self.stats.padding_waste:.1%} padding waste)"
+        )
+
+    def _complete(self, transcript_key: Hashable) -> Dict[Hashable, List[ChunkScore]]:
+        """Release a finished transcript's accumulator, chunks back in submission order"""
+        del self._pending[transcript_key]
+        return {
+            segment: [chunk_score for _, chunk_score in sorted(scored, key=lambda item: item[0])]
+            for segment, scored in self._results.pop(transcript_key).items()
+        }
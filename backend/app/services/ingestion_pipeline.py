@@ -0,0 +1,370 @@
+"""Streaming Transcript Ingestion Pipeline"""
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.models import Transcript, SentimentAnalysis
+from app.services.batch_writer import BatchWriter
+from app.services.inference_scheduler import SchedulerStats
+from app.services.transcript_processor import TranscriptProcessor
+
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+# Set in each cleaning worker process
+_processor = None
+
+
+def _init_clean_worker():
+    """Per-worker setup"""
+    global _processor
+    _processor = TranscriptProcessor()
+
+
+def _clean_task(transcript_data: Dict[str, Any]):
+    """Clean and extract one transcript in a worker process"""
+    return _processor.process_transcript(transcript_data)
+
+
+def _clean_pool_context():
+    """Start method for the cleaning pool
+
+    Never fork: by the time a run starts, other threads (the usage buffer
+    flusher, the model preloader) may be running and holding locks that a
+    forked child would inherit locked. Forkserver children come from a clean
+    single-threaded server process; spawn is the fallback where it's missing.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+@dataclass
+class PipelineStats:
+    """Counts and timings for one pipeline run"""
+    fetched: int = 0
+    fetch_failed: int = 0
+    processed: int = 0
+    process_failed: int = 0
+    analyzed: int = 0
+    analysis_failed: int = 0
+    persisted: int = 0
+    persist_failed: int = 0
+    commits: int = 0
+    max_queue_depth: Dict[str, int] = field(default_factory=dict)
+    sentiment: SchedulerStats = field(default_factory=SchedulerStats)
+    elapsed_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'fetched': self.fetched,
+            'fetch_failed': self.fetch_failed,
+            'processed': self.processed,
+            'process_failed': self.process_failed,
+            'analyzed': self.analyzed,
+            'analysis_failed': self.analysis_failed,
+            'persisted': self.persisted,
+            'persist_failed': self.persist_failed,
+            'commits': self.commits,
+            'max_queue_depth': dict(self.max_queue_depth),
+            'sentiment': self.sentiment.to_dict(),
+            'elapsed_seconds': round(self.elapsed_seconds, 2),
+            'transcripts_per_second': round(self.persisted / self.elapsed_seconds, 3) if self.elapsed_seconds else 0.0
+        }
+
+
+class IngestionPipeline:
+    """Fetches, cleans, scores and stores transcripts as a stream
+
+    Four stages run concurrently, connected by bounded queues:
+
+    - fetch: the Earnings Call client downloads transcripts under its shared
+      rate limit with a few requests in flight
+    - clean: a pool of worker processes runs the regex cleaning and extraction
+    - score: FinBERT analyzes whatever processed transcripts are waiting, in
+      batches of up to ``score_batch``
+    - persist: the calling thread (which owns the database session) writes
+      transcripts and their analyses through a BatchWriter, committing every
+      ``commit_every``; a transcript that fails to save is dropped alone
+
+    A full queue blocks the stage feeding it, so only a bounded number of
+    transcripts is held in memory however many a run fetches.
+    """
+
+    def __init__(self, earnings_client, sentiment_analyzer, config):
+        self.earnings_client = earnings_client
+        self.sentiment_analyzer = sentiment_analyzer
+        self.queue_size = max(1, config.INGEST_QUEUE_SIZE)
+        self.clean_workers = config.INGEST_CLEAN_WORKERS
+        self.score_batch = max(1, config.INGEST_SCORE_BATCH)
+        self.commit_every = max(1, config.INGEST_COMMIT_EVERY)
+
+        self.stats = PipelineStats()
+        self.failures: Dict[Tuple[str, int, int], str] = {}
+        self._on_commit = None
+        self._on_committed = None
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+
+    def run(
+        self,
+        pending: Dict[Tuple[str, int, int], int],
+        on_commit: Optional[Callable[[List[Tuple[str, int, int]]], None]] = None,
+        on_committed: Optional[Callable[[List[Tuple[str, int, int]]], None]] = None
+    ) -> PipelineStats:
+        """Ingest the given (ticker, year, quarter) -> company_id transcripts
+
+        on_commit, if given, is called with the keys of each chunk of stored
+        transcripts just before that chunk is committed, so anything it adds
+        to the session is committed with them; the chunk may still fail to
+        commit, so on_commit must not change anything outside the session.
+        on_committed, if given, is called with the same keys once the chunk
+        has committed. Keys that could not be fetched, processed or stored
+        end up in ``failures`` with the reason.
+        """
+        self.stats = PipelineStats()
+        self.failures = {}
+        self._on_commit = on_commit
+        self._on_committed = on_committed
+        self._stop.clear()
+        start_time = time.time()
+
+        if not pending:
+            return self.stats
+
+        fetched = queue.Queue(self.queue_size)
+        processed = queue.Queue(self.queue_size)
+        scored = queue.Queue(self.queue_size)
+
+        # Fork the sentiment workers first: the cleaning pool starts handler
+        # threads in this process, and forking after that could hand the
+        # workers locks those threads hold
+        self.sentiment_analyzer.start_workers()
+        clean_pool = None
+        if self.clean_workers > 0:
+            clean_pool = _clean_pool_context().Pool(
+                self.clean_workers,
+                initializer=_init_clean_worker
+            )
+
+        threads = [
+            threading.Thread(target=self._fetch_stage, args=(pending, fetched), name='ingest-fetch', daemon=True),
+            threading.Thread(target=self._clean_stage, args=(clean_pool, fetched, processed), name='ingest-clean', daemon=True),
+            threading.Thread(target=self._score_stage, args=(processed, scored), name='ingest-score', daemon=True)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._persist_stage(scored)
+        finally:
+            # Unblock the upstream stages if persisting stopped early
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            if clean_pool is not None:
+                clean_pool.close()
+                clean_pool.join()
+
+        self.stats.elapsed_seconds = time.time() - start_time
+        logger.info(f"Ingestion pipeline finished: {self.stats.to_dict()}")
+        return self.stats
+
+    def _put(self, target: queue.Queue, item, name: str) -> bool:
+        """Blocking put that gives up once the pipeline is stopping"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.5)
+            except queue.Full:
+                continue
+            with self._stats_lock:
+                depth = self.stats.max_queue_depth
+                depth[name] = max(depth.get(name, 0), target.qsize())
+            return True
+        return False
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            setattr(self.stats, name, getattr(self.stats, name) + amount)
+
+    def _fail(self, key: Tuple[str, int, int], reason: str):
+        with self._stats_lock:
+            self.failures[key] = reason
+
+    def _fetch_stage(self, pending: Dict[Tuple[str, int, int], int], fetched: queue.Queue):
+        """Download transcripts and hand them to the cleaning stage"""
+        try:
+            for (ticker, year, quarter), transcript_data in self.earnings_client.get_transcripts(pending):
+                if self._stop.is_set():
+                    break
+                if not transcript_data:
+                    self._count('fetch_failed')
+                    self._fail((ticker, year, quarter), 'fetch failed')
+                    continue
+
+                transcript_data['company_id'] = pending[(ticker, year, quarter)]
+                transcript_data['company_ticker'] = ticker
+                transcript_data['ingest_key'] = (ticker, year, quarter)
+                self._count('fetched')
+                logger.info(f"New transcript: {ticker} {year}Q{quarter}")
+                if not self._put(fetched, transcript_data, 'fetched'):
+                    break
+        except Exception as e:
+            logger.error(f"Transcript fetch stage failed: {str(e)}")
+        finally:
+            self._put(fetched, _DONE, 'fetched')
+
+    def _clean_stage(self, clean_pool, fetched: queue.Queue, processed: queue.Queue):
+        """Clean and extract transcripts, in worker processes if configured"""
+        processor = TranscriptProcessor() if clean_pool is None else None
+        # Bounds the transcripts inside the worker pool at any one time
+        limit = max(1, self.clean_workers) * 2
+        in_flight = 0
+        # Pool callbacks run on the pool's result thread and must never block,
+        # so they only drop outcomes here; this thread passes them on
+        finished: queue.Queue = queue.Queue()
+
+        def finish(transcript_data, processed_data=None, error=None):
+            if error is not None:
+                self._count('process_failed')
+                self._fail(transcript_data['ingest_key'], f'processing failed: {error}')
+                logger.error(f"Error processing transcript {transcript_data.get('company_ticker')}: {str(error)}")
+                return
+            self._count('processed')
+            self._put(processed, (transcript_data, processed_data), 'processed')
+
+        def forward(wait: bool):
+            """Pass on finished transcripts; with wait, until at least one has finished"""
+            nonlocal in_flight
+            while in_flight:
+                try:
+                    outcome = finished.get(timeout=0.5) if wait else finished.get_nowait()
+                except queue.Empty:
+                    if wait and not self._stop.is_set():
+                        continue
+                    return
+                in_flight -= 1
+                wait = False
+                finish(*outcome)
+
+        try:
+            while not self._stop.is_set():
+                forward(wait=in_flight >= limit)
+                if in_flight >= limit:
+                    continue
+                try:
+                    transcript_data = fetched.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if transcript_data is _DONE:
+                    break
+
+                if clean_pool is None:
+                    try:
+                        finish(transcript_data, processor.process_transcript(transcript_data))
+                    except Exception as e:
+                        finish(transcript_data, error=e)
+                    continue
+
+                in_flight += 1
+                clean_pool.apply_async(
+                    _clean_task,
+                    (transcript_data,),
+                    callback=lambda result, data=transcript_data: finished.put((data, result, None)),
+                    error_callback=lambda error, data=transcript_data: finished.put((data, None, error))
+                )
+
+            # Wait for work still inside the pool
+            while in_flight and not self._stop.is_set():
+                forward(wait=True)
+        except Exception as e:
+            logger.error(f"Transcript cleaning stage failed: {str(e)}")
+        finally:
+            self._put(processed, _DONE, 'processed')
+
+    def _score_stage(self, processed: queue.Queue, scored: queue.Queue):
+        """Run FinBERT over whatever processed transcripts are waiting, in batches"""
+        done = False
+        try:
+            while not done and not self._stop.is_set():
+                try:
+                    item = processed.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+
+                batch = [item]
+                while len(batch) < self.score_batch:
+                    try:
+                        item = processed.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _DONE:
+                        done = True
+                        break
+                    batch.append(item)
+
+                results = self.sentiment_analyzer.analyze_transcripts([processed_data for _, processed_data in batch])
+                for index, analysis in results:
+                    if analysis is None:
+                        self._count('analysis_failed')
+                    else:
+                        self._count('analyzed')
+                    transcript_data, processed_data = batch[index]
+                    if not self._put(scored, (transcript_data, processed_data, analysis), 'scored'):
+                        break
+                with self._stats_lock:
+                    self.stats.sentiment.add(self.sentiment_analyzer.last_scheduler_stats)
+        except Exception as e:
+            logger.error(f"Sentiment scoring stage failed: {str(e)}")
+        finally:
+            self._put(scored, _DONE, 'scored')
+
+    def _persist_stage(self, scored: queue.Queue):
+        """Write transcripts and analyses on the calling thread, committing in chunks"""
+        writer = BatchWriter(
+            chunk_size=self.commit_every,
+            before_commit=self._on_commit,
+            after_commit=self._on_committed
+        )
+
+        while True:
+            item = scored.get()
+            if item is _DONE:
+                break
+            transcript_data = item[0]
+            writer.add(*self._records(*item), key=transcript_data['ingest_key'], company_id=transcript_data['company_id'])
+        writer.flush()
+
+        self.stats.persisted += writer.stats['written']
+        self.stats.persist_failed += writer.stats['failed']
+        self.stats.commits += writer.stats['commits']
+        for key, reason in writer.failures.items():
+            self._fail(key, f'saving failed: {reason}')
+
+    def _records(self, transcript_data: Dict[str, Any], processed_data: Any,
+                 analysis: Optional[Dict[str, Any]]) -> List[Any]:
+        """Transcript record and, if it was scored, its sentiment analysis"""
+        transcript = Transcript()
+        transcript.company_id = transcript_data['company_id']
+        transcript.call_date = processed_data.date
+        transcript.fiscal_year = processed_data.year
+        transcript.fiscal_quarter = processed_data.quarter
+        transcript.raw_text = transcript_data.get('content', '')
+        transcript.cleaned_text = processed_data.cleaned_text
+        transcript.word_count = processed_data.word_count
+        if analysis is None:
+            return [transcript]
+
+        sentiment = SentimentAnalysis.create_from_analysis(None, analysis)
+        sentiment.transcript = transcript  # Gets the transcript's ID when both are inserted
+        logger.info(f"Analyzed transcript for {transcript_data.get('company_ticker')}: "
+                    f"sentiment={analysis['overall_sentiment']:.2f}, "
+                    f"confidence={analysis['management_confidence_score']:.2f}")
+        return [transcript, sentiment]
@@ -0,0 +1,162 @@
+"""Process-wide FinBERT Model Registry"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadedModel:
+    """A loaded tokenizer and inference backend"""
+    model_id: str
+    tokenizer: Any
+    backend: Any
+    revision: str
+    load_seconds: float
+    rss_delta_mb: Optional[float]
+
+
+def _rss_mb() -> Optional[float]:
+    """Resident memory of this process in MB, if psutil is available"""
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024
+    except Exception:
+        return None
+
+
+class ModelRegistry:
+    """Loads FinBERT once per process, on first use or in a background thread
+
+    transformers and torch are only imported when a model is actually
+    requested, so processes that never score text (web workers, CLI tools)
+    don't pay for them at startup. Concurrent callers for the same model
+    wait for a single load. A failed load is retried by the first caller
+    after FINBERT_LOAD_RETRY_SECONDS, so a transient error (network, disk)
+    doesn't disable scoring for the life of the process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._models: Dict[Tuple[str, str], LoadedModel] = {}
+        self._errors: Dict[Tuple[str, str], str] = {}
+        self._failed_at: Dict[Tuple[str, str], float] = {}
+        self._loading: Dict[Tuple[str, str], bool] = {}
+
+    def _key(self, config) -> Tuple[str, str]:
+        return (config.FINBERT_MODEL, config.FINBERT_BACKEND)
+
+    def get(self, config) -> Optional[LoadedModel]:
+        """Return the configured model, loading it if needed (None if loading failed recently)"""
+        key = self._key(config)
+
+        loaded = self._models.get(key)
+        if loaded is not None or self._backing_off(key, config):
+            return loaded
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            if key in self._models or self._backing_off(key, config):
+                return self._models.get(key)
+
+            self._loading[key] = True
+            try:
+                self._models[key] = self._load(config)
+                self._errors.pop(key, None)
+                self._failed_at.pop(key, None)
+            except Exception as e:
+                logger.error(f"Failed to initialize FinBERT, retrying after {config.FINBERT_LOAD_RETRY_SECONDS}s: {str(e)}")
+                self._errors[key] = str(e)
+                self._failed_at[key] = time.monotonic()
+            finally:
+                self._loading[key] = False
+
+        return self._models.get(key)
+
+    def _backing_off(self, key: Tuple[str, str], config) -> bool:
+        """Whether the last load of key failed too recently to try again"""
+        failed_at = self._failed_at.get(key)
+        return failed_at is not None and time.monotonic() - failed_at < config.FINBERT_LOAD_RETRY_SECONDS
+
+    def preload(self, config) -> threading.Thread:
+        """Start loading the configured model in a background thread"""
+        thread = threading.Thread(target=self.get, args=(config,), name='finbert-preload', daemon=True)
+        thread.start()
+        return thread
+
+    def is_loaded(self, config) -> bool:
+        """Whether the configured model is already in memory"""
+        return self._key(config) in self._models
+
+    def status(self) -> Dict[str, Any]:
+        """Load state, time and memory per model, for health endpoints"""
+        status = {}
+        for key in set(self._models) | set(self._errors) | set(self._loading):
+            model_id, backend = key
+            entry = {'model': model_id, 'backend': backend}
+            if key in self._models:
+                loaded = self._models[key]
+                entry.update({
+                    'state': 'loaded',
+                    'load_seconds': round(loaded.load_seconds, 2),
+                    'rss_delta_mb': round(loaded.rss_delta_mb, 1) if loaded.rss_delta_mb is not None else None
+                })
+            elif self._loading.get(key):
+                entry['state'] = 'loading'
+            elif key in self._errors:
+                entry.update({'state': 'failed', 'error': self._errors[key]})
+            else:
+                entry['state'] = 'not_loaded'
+            status[f'{model_id}:{backend}'] = entry
+        return status
+
+    def _load(self, config) -> LoadedModel:
+        """Import the ML stack and load tokenizer and backend"""
+        rss_before = _rss_mb()
+        start_time = time.time()
+
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        from .inference_backends import load_backend
+
+        tokenizer = AutoTokenizer.from_pretrained(config.FINBERT_MODEL)
+        model = AutoModelForSequenceClassification.from_pretrained(config.FINBERT_MODEL)
+        revision = getattr(model.config, '_commit_hash', None) or 'main'
+        backend = load_backend(
+            config.FINBERT_BACKEND,
+            model,
+            onnx_path=config.FINBERT_ONNX_PATH,
+            num_threads=config.FINBERT_NUM_THREADS
+        )
+
+        load_seconds = time.time() - start_time
+        rss_after = _rss_mb()
+        rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+
+        logger.info(
+            f"FinBERT initialized successfully ({backend.name} backend) in {load_seconds:.1f}s"
+            + (f", +{rss_delta:.0f} MB resident" if rss_delta is not None else "")
+        )
+
+        return LoadedModel(
+            model_id=config.FINBERT_MODEL,
+            tokenizer=tokenizer,
+            backend=backend,
+            revision=revision,
+            load_seconds=load_seconds,
+            rss_delta_mb=rss_delta
+        )
+
+
+# Singleton instance (created eagerly so threads never race to build two)
+_model_registry = ModelRegistry()
+
+def get_model_registry() -> ModelRegistry:
+    """Get singleton model registry instance"""
+    return _model_registry
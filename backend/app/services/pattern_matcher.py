@@ -0,0 +1,187 @@
+"""Multi-pattern Text Matcher"""
+import logging
+import re
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple, Union
+
+try:
+    import re._parser as _sre_parse
+    from re._constants import ASSERT, ASSERT_NOT, AT, BRANCH, IN, LITERAL, SUBPATTERN
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+    from sre_constants import ASSERT, ASSERT_NOT, AT, BRANCH, IN, LITERAL, SUBPATTERN
+
+logger = logging.getLogger(__name__)
+
+# Cap on the number of alternative prefixes extracted from one pattern
+MAX_PREFIXES = 64
+
+
+def literal_prefixes(pattern: str, flags: int = 0) -> Optional[Tuple[Set[str], bool]]:
+    """Literal strings one of which every match of the pattern must start with
+
+    Returns (prefixes, ignore_case), or None if the pattern does not start
+    with a short set of literals (e.g. it starts with a character range).
+    Leading zero-width assertions are skipped; they are re-checked when the
+    pattern is matched at a candidate position.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except Exception:
+        return None
+
+    ignore_case = bool((flags | parsed.state.flags) & re.IGNORECASE)
+    prefixes = _sequence_prefixes(list(parsed), skip_assertions=True)
+    if not prefixes or '' in prefixes:
+        return None
+
+    if ignore_case:
+        prefixes = {prefix.lower() for prefix in prefixes}
+    return prefixes, ignore_case
+
+
+def _sequence_prefixes(items: list, skip_assertions: bool = False) -> Optional[Set[str]]:
+    """Prefixes of a parsed op sequence (None if it can start with a non-literal)"""
+    results = {''}
+
+    for op, av in items:
+        if op is LITERAL:
+            results = {prefix + chr(av) for prefix in results}
+            continue
+
+        if op in (AT, ASSERT, ASSERT_NOT) and skip_assertions and results == {''}:
+            continue
+
+        if op is IN and all(member_op is LITERAL for member_op, _ in av):
+            chars = [chr(member_av) for _, member_av in av]
+            results = {prefix + char for prefix in results for char in chars}
+            if len(results) > MAX_PREFIXES:
+                return None
+            continue
+
+        # Branches and groups end the literal run; take their own prefixes and stop
+        if op is BRANCH:
+            alternatives = [_sequence_prefixes(list(alt)) for alt in av[1]]
+        elif op is SUBPATTERN:
+            alternatives = [_sequence_prefixes(list(av[-1]))]
+        else:
+            alternatives = [None]
+
+        if any(alt is None or '' in alt for alt in alternatives):
+            break
+        combined = {prefix + tail for prefix in results for alt in alternatives for tail in alt}
+        if len(combined) > MAX_PREFIXES:
+            break
+        return combined
+
+    return None if results == {''} else results
+
+
+class TextIndex:
+    """Occurrence lists of literal strings in one text, shared by every pattern scanned over it"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self._lower: Optional[str] = None
+        self._occurrences: Dict[Tuple[str, bool], List[int]] = {}
+
+        # Case-insensitive prefix search relies on lower() keeping offsets and on
+        # IGNORECASE agreeing with lower(), both of which hold for ASCII text
+        self.supports_ignore_case = text.isascii()
+
+    def occurrences(self, literal: str, ignore_case: bool) -> List[int]:
+        """Every start offset of literal in the text (overlapping occurrences included)"""
+        key = (literal, ignore_case)
+        found = self._occurrences.get(key)
+        if found is None:
+            if ignore_case:
+                if self._lower is None:
+                    self._lower = self.text.lower()
+                haystack = self._lower
+            else:
+                haystack = self.text
+
+            found = []
+            position = haystack.find(literal)
+            while position != -1:
+                found.append(position)
+                position = haystack.find(literal, position + 1)
+            self._occurrences[key] = found
+        return found
+
+
+class PatternMatcher:
+    """Finds the matches of many regexes in a text using a shared literal-prefix index
+
+    Each pattern is compiled once. Patterns that start with case-insensitive
+    literals or an alternation of literals are only tried at offsets where one
+    of those literals occurs, found with str.find and shared across all
+    patterns scanned over the same TextIndex; others use a regular scan. Results are identical to running
+    ``pattern.finditer(text)`` for every pattern.
+    """
+
+    def __init__(self, patterns: Dict[Hashable, Union[str, re.Pattern]], flags: int = 0):
+        self.patterns: Dict[Hashable, re.Pattern] = {}
+        self.prefixes: Dict[Hashable, Optional[Tuple[Set[str], bool]]] = {}
+
+        for name, pattern in patterns.items():
+            # Already compiled patterns (from the registry) keep their own flags
+            compiled = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+            self.patterns[name] = compiled
+            prefixes = literal_prefixes(compiled.pattern, compiled.flags)
+
+            # sre already searches for a single case-sensitive literal prefix itself
+            if prefixes is not None and not prefixes[1] and len(prefixes[0]) == 1:
+                prefixes = None
+            self.prefixes[name] = prefixes
+
+    def scan(self, text: str, index: Optional[TextIndex] = None) -> Dict[Hashable, List[re.Match]]:
+        """Non-overlapping matches of every pattern, as finditer would return them"""
+        if index is None or index.text is not text:
+            index = TextIndex(text)
+        return {name: self._matches(name, index) for name in self.patterns}
+
+    def _matches(self, name: Hashable, index: TextIndex) -> List[re.Match]:
+        """finditer-equivalent matches of one pattern, tried only at prefix offsets"""
+        compiled = self.patterns[name]
+        prefixes = self.prefixes[name]
+        text = index.text
+
+        if prefixes is None or (prefixes[1] and not index.supports_ignore_case):
+            return list(compiled.finditer(text))
+
+        literals, ignore_case = prefixes
+        if len(literals) == 1:
+            candidates = index.occurrences(next(iter(literals)), ignore_case)
+        else:
+            candidates = sorted(
+                position
+                for literal in literals
+                for position in index.occurrences(literal, ignore_case)
+            )
+
+        matches = []
+        resume = 0
+        previous = -1
+        for position in candidates:
+            if position < resume or position == previous:
+                continue
+            previous = position
+            match = compiled.match(text, position)
+            if match:
+                matches.append(match)
+                # Like finditer, continue after the match (one past an empty one)
+                resume = match.end() if match.end() > position else position + 1
+        return matches
+
+
+def findall_values(matches: Sequence[re.Match]) -> list:
+    """What re.findall would return for the same matches"""
+    if not matches:
+        return []
+    groups = matches[0].re.groups
+    if groups == 0:
+        return [match.group(0) for match in matches]
+    if groups == 1:
+        return [match.group(1) or '' for match in matches]
+    return [tuple(group or '' for group in match.groups()) for match in matches]
+
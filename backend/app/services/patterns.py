@@ -0,0 +1,208 @@
+"""Precompiled Regex Pattern Registry
+
+Every pattern used to parse transcript text is compiled here once, at import,
+with its flags spelled out. Patterns of the form "keyword ... something" use
+bounded gaps instead of ``.*?``: an unbounded lazy gap rescans the rest of
+the text from every keyword occurrence when the second part is missing,
+which is quadratic (or worse, with two gaps) on long text. A bounded gap
+keeps the work per occurrence constant, so scanning is linear in the text.
+"""
+import re
+from typing import Dict, List
+
+_registry: Dict[str, re.Pattern] = {}
+
+# Gap limits, matched to how long a useful match can be downstream
+GUIDANCE_GAP = 500  # Guidance statements over 500 characters are dropped
+QUOTE_GAP = 300  # Quotes are kept only if shorter than 300 characters
+METRIC_GAP = 200  # Metric snippets are short phrases
+SENTENCE_CHARS = 1000  # Longest sentence followed by the speaker-remark patterns
+NOTE_CHARS = 500  # Longest parenthetical note stripped from raw transcripts
+
+
+def register(name: str, pattern: str, flags: int = 0) -> re.Pattern:
+    """Compile a pattern once under a unique name"""
+    if name in _registry:
+        raise ValueError(f"Pattern already registered: {name}")
+    compiled = re.compile(pattern, flags)
+    _registry[name] = compiled
+    return compiled
+
+
+def get_pattern(name: str) -> re.Pattern:
+    """Get a registered pattern by name"""
+    return _registry[name]
+
+
+def all_patterns() -> Dict[str, re.Pattern]:
+    """Every registered pattern by name"""
+    return dict(_registry)
+
+
+def gap(max_chars: int) -> str:
+    """Lazy gap of at most max_chars characters"""
+    return f'.{{0,{max_chars}}}?'
+
+
+def _register_list(prefix: str, patterns: List[str], flags: int = 0) -> List[re.Pattern]:
+    return [register(f'{prefix}.{i}', pattern, flags) for i, pattern in enumerate(patterns)]
+
+
+# Transcript cleaning (TranscriptProcessor.clean_text)
+HTML_TAG = register('clean.html_tag', r'<[^>]+>')
+WHITESPACE = register('clean.whitespace', r'\s+')
+DOUBLE_DASH = register('clean.double_dash', r'\s*--\s*')
+DOUBLE_QUOTES = register('clean.double_quotes', '[\u201c\u201d\u201e"]')
+SINGLE_QUOTES = register('clean.single_quotes', '[\u2018\u2019\u201a]')
+SPECIAL_CHARS = register('clean.special_chars', r'[^\w\s\.\,\;\:\!\?\-\$\%\(\)\'\"\/]')
+REPEATED_PERIODS = register('clean.repeated_periods', r'\.{2,}')
+DOTTED_ACRONYM = register('clean.dotted_acronym', r'\b([A-Z]\.){2,}')
+
+# Raw transcript cleaning (RealDataCollector._clean_transcript_text)
+TIMESTAMP = register('collector.timestamp', r'\[\d+:\d+:\d+\]')
+PARENTHETICAL = register('collector.parenthetical', rf'\([^)]{{0,{NOTE_CHARS}}}\)')
+SPEAKER_LABEL = register('collector.speaker_label', r'^[A-Z\s]+:', re.MULTILINE)
+
+# Transcript sections
+QA_MARKERS = _register_list('sections.qa', [
+    r'question[\s-]and[\s-]answer',
+    r'q\s*&\s*a\s+session',
+    r'we\'?ll\s+now\s+(?:take|open|begin)\s+questions?',
+    r'now\s+open\s+(?:the\s+)?(?:floor|line)?\s*(?:for|to)\s+questions?',
+    r'turn\s+(?:it\s+)?over\s+(?:to|for)\s+questions?',
+    r'operator\s+instructions'
+], re.IGNORECASE)
+CEO_REMARKS = register(
+    'sections.ceo',
+    rf'(?:CEO|Chief\s+Executive\s+Officer)[\s\:]+([^.]{{1,{SENTENCE_CHARS}}}\.(?:[^.]{{1,{SENTENCE_CHARS}}}\.){{0,10}})',
+    re.IGNORECASE
+)
+CFO_REMARKS = register(
+    'sections.cfo',
+    rf'(?:CFO|Chief\s+Financial\s+Officer)[\s\:]+([^.]{{1,{SENTENCE_CHARS}}}\.(?:[^.]{{1,{SENTENCE_CHARS}}}\.){{0,10}})',
+    re.IGNORECASE
+)
+
+# Confidence indicators (matched against lowercased text)
+CONFIDENCE_PATTERNS = {
+    'positive': _register_list('confidence.positive', [
+        r'strong\s+momentum',
+        r'ahead\s+of\s+schedule',
+        r'exceed(?:ing|ed)?\s+expectations',
+        r'confident\s+in\s+our\s+ability',
+        r'on\s+track\s+to',
+        r'well[\s-]positioned',
+        r'significant\s+progress',
+        r'pleased\s+with',
+        r'outperform(?:ing|ed)?',
+        r'accelerat(?:ing|ed)\s+growth',
+        r'strong\s+pipeline',
+        r'robust\s+demand',
+        r'positive\s+momentum',
+        r'breakthrough',
+        r'milestone\s+achievement'
+    ]),
+    'negative': _register_list('confidence.negative', [
+        r'challenging\s+environment',
+        r'below\s+expectations',
+        r'uncertain(?:ty)?',
+        r'delay(?:ed|s)?',
+        r'setback',
+        r'concerns?\s+about',
+        r'difficult\s+quarter',
+        r'headwinds?',
+        r'disappointing',
+        r'slower\s+than\s+expected',
+        r'competitive\s+pressure',
+        r'supply\s+chain\s+issues',
+        r'regulatory\s+challenges',
+        r'clinical\s+trial\s+failure',
+        r'discontinued?\s+(?:study|program)'
+    ]),
+    'neutral': _register_list('confidence.neutral', [
+        r'in\s+line\s+with',
+        r'as\s+expected',
+        r'maintain(?:ing|ed)?',
+        r'continues?\s+to',
+        r'steady',
+        r'consistent\s+with',
+        r'on\s+plan',
+        r'unchanged'
+    ])
+}
+
+# Product/drug name patterns for biotech
+PRODUCT_PATTERNS = _register_list('products', [
+    # Drug codes (e.g., ABC-123, XYZ-4567)
+    r'(?<![A-Z0-9])([A-Z]{2,4}[-\s]?\d{3,4}[A-Z]?)(?![A-Z0-9])',
+    # Clinical programs
+    r'our\s+([A-Z][\w-]+)\s+(?:product|drug|therapy|treatment|candidate|program)',
+    # Phase mentions
+    r'Phase\s+(?:I{1,3}|[1-3][ab]?)\s+(?:trial|study|data|results)\s+(?:of|for)\s+([A-Z][\w-]+)',
+    # Brand names in quotes
+    r'["\']([A-Z][\w-]+)["\']?\s+(?:product|drug|therapy)',
+    # FDA submissions
+    r'(?:NDA|BLA|IND|510\(k\))\s+for\s+([A-Z][\w-]+)'
+], re.IGNORECASE)
+
+# Forward-looking guidance statements
+GUIDANCE_PATTERNS = _register_list('guidance', [
+    rf'(?:expect|anticipate|project|forecast|guide){gap(GUIDANCE_GAP)}(?:\$[\d,]+\s*(?:million|billion))',
+    rf'(?:revenue|earnings)\s+(?:guidance|outlook){gap(GUIDANCE_GAP)}(?:\d+%|\$[\d,]+)',
+    rf'(?:full[\s-]year|annual|FY\s*\d{{4}}){gap(GUIDANCE_GAP)}(?:expect|anticipate){gap(GUIDANCE_GAP)}(?:\d+%|\$[\d,]+)',
+    r'reaffirm(?:ing|ed)?\s+(?:our\s+)?(?:\d{4}\s+)?guidance',
+    r'rais(?:ing|ed)\s+(?:our\s+)?(?:\d{4}\s+)?guidance',
+    r'lower(?:ing|ed)?\s+(?:our\s+)?(?:\d{4}\s+)?guidance'
+], re.IGNORECASE)
+
+# Key financial and operational metrics
+METRIC_PATTERNS = {
+    'revenue_mentions': register(
+        'metrics.revenue',
+        rf'revenue{gap(METRIC_GAP)}(?:\$[\d,]+\s*(?:million|billion)|[\d\.]+%)',
+        re.IGNORECASE
+    ),
+    'clinical_updates': register(
+        'metrics.clinical',
+        rf'(?:Phase\s+(?:I{{1,3}}|[1-3][ab]?)|clinical\s+trial|study){gap(METRIC_GAP)}(?:complet|enroll|result|data|success|fail)',
+        re.IGNORECASE
+    ),
+    'percentage_changes': register(
+        'metrics.percentage',
+        rf'(?:increase|decrease|growth|decline|up|down){gap(METRIC_GAP)}([\d\.]+)%',
+        re.IGNORECASE
+    )
+}
+DOLLAR_AMOUNT = register('metrics.dollar', r'\$[\d,]+(?:\.\d+)?\s*(?:million|billion|thousand)?')
+
+# Key quotes (RealDataCollector._extract_key_quotes)
+QUOTE_PATTERNS = _register_list('quotes', [
+    rf'(we (?:expect|anticipate|believe|are confident|project){gap(QUOTE_GAP)}[.!])',
+    rf'(our guidance{gap(QUOTE_GAP)}[.!])',
+    rf'(revenue{gap(QUOTE_GAP)}(?:increased|decreased|grew|declined){gap(QUOTE_GAP)}[.!])',
+    rf'(clinical trial{gap(QUOTE_GAP)}(?:results|data|outcomes){gap(QUOTE_GAP)}[.!])',
+    rf'(fda{gap(QUOTE_GAP)}(?:approval|clearance|submission){gap(QUOTE_GAP)}[.!])',
+    rf'(pipeline{gap(QUOTE_GAP)}(?:advancing|progress|development){gap(QUOTE_GAP)}[.!])'
+], re.IGNORECASE | re.DOTALL)
+
+# Guidance items (RealDataCollector._extract_guidance)
+GUIDANCE_ITEM_PATTERNS = _register_list('guidance_items', [
+    rf'(?:revenue|sales|earnings){gap(QUOTE_GAP)}(?:expect|guidance|target|project){gap(QUOTE_GAP)}(\$[\d.,]+\s*(?:million|billion|M|B))',
+    rf'(?:expect|guidance|target|project){gap(QUOTE_GAP)}(?:revenue|sales|earnings){gap(QUOTE_GAP)}(\$[\d.,]+\s*(?:million|billion|M|B))',
+    rf'(?:patient enrollment|trial completion|data readout){gap(QUOTE_GAP)}(Q[1-4]|quarter|month){gap(QUOTE_GAP)}(\d{{4}})',
+    rf'(?:fda|regulatory){gap(QUOTE_GAP)}(?:filing|submission|approval){gap(QUOTE_GAP)}(Q[1-4]|quarter|month){gap(QUOTE_GAP)}(\d{{4}})'
+], re.IGNORECASE)
+GUIDANCE_MONEY = register('guidance_items.money', r'\$[\d.,]+\s*(?:million|billion|M|B)', re.IGNORECASE)
+GUIDANCE_NUMBER = register('guidance_items.number', r'\d+(?:,\d+)*(?:\.\d+)?')
+GUIDANCE_TIMEFRAME = register(
+    'guidance_items.timeframe',
+    r'(Q[1-4]\s*\d{4}|quarter\s*\d+|month\s*\d+|\d{4})',
+    re.IGNORECASE
+)
+
+# Product mentions (RealDataCollector._extract_product_mentions)
+PRODUCT_NAME_PATTERNS = _register_list('product_names', [
+    r'\b[A-Z]{2,}-\d+\b',  # Drug codes like AB-123
+    r'\b[a-z]+mab\b',      # Monoclonal antibodies
+    r'\b[A-Z][a-z]+\d+\b', # Product names like Drug123
+])
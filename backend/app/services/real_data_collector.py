@@ -4,7 +4,6 @@ Real Data Collector for Q1 2025 Earnings
 Fetches actual earnings call transcripts and performs comprehensive analysis
 """
 import logging
-import re
 from datetime import datetime, date, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 import asyncio
@@ -13,8 +12,10 @@ import requests
 from dataclasses import dataclass
 
 from app.models import db, Company, Transcript, SentimentAnalysis, TrendAnalysis, Alert
+from app.services.batch_writer import BatchWriter
 from app.services.earnings_call_client import EarningsCallClient, EarningsCallError
 from app.services.fmp_client import FMPClient, FMPError
+from app.services import patterns
 from app.services.sentiment_analyzer import SentimentAnalyzer
 from config.config import get_config
 
@@ -83,29 +84,51 @@ class RealDataCollector:
             transcripts = await self._fetch_q1_2025_transcripts()
             results['transcripts_fetched'] = len(transcripts)
             
-            # Step 3: Process each transcript with enhanced analysis
-            for transcript_data in transcripts:
+            # Step 3: Process each transcript with enhanced analysis. Sentiment runs
+            # in the worker pool when configured, each transcript scored together with
+            # its quotes; as each result streams back the transcript, its sentiment and
+            # its alerts are queued on the batch writer
+            transcripts = self._filter_new_transcripts(transcripts)
+            cleaned_contents = [self._clean_transcript_text(t['content']) for t in transcripts]
+            groups = [[content, *self._find_quote_texts(content)] for content in cleaned_contents]
+            writer = BatchWriter(chunk_size=self.config.WRITE_BATCH_SIZE)
+            processed_transcripts = {}
+            
+            for index, group_results in self.sentiment_analyzer.analyze_text_groups(groups):
+                transcript_data = transcripts[index]
                 try:
-                    processed = await self._process_transcript_with_enhancement(transcript_data)
+                    processed = await self._process_transcript_with_enhancement(
+                        transcript_data,
+                        cleaned_content=cleaned_contents[index],
+                        sentiment_result=group_results[0],
+                        quote_sentiments=group_results[1:],
+                        writer=writer
+                    )
                     if processed:
-                        results['transcripts_analyzed'] += 1
-                        results['companies_processed'] += 1
-                        
-                        # Generate trend analysis
-                        trend = await self._generate_trend_analysis(processed['company_id'])
-                        if trend:
-                            results['trends_generated'] += 1
-                        
-                        # Check for alerts
-                        alerts = await self._check_for_alerts(processed)
-                        results['alerts_created'] += len(alerts)
+                        processed_transcripts[processed['key']] = processed
                 
                 except Exception as e:
                     error_msg = f"Error processing transcript for {transcript_data.get('symbol', 'unknown')}: {str(e)}"
                     logger.error(error_msg)
                     results['errors'].append(error_msg)
             
-            # Step 4: Generate summary statistics
+            writer.flush()
+            for key, reason in writer.failures.items():
+                results['errors'].append(f"Error saving transcript {key[0]} {key[1]}Q{key[2]}: {reason}")
+            stored = [processed for key, processed in processed_transcripts.items() if key not in writer.failures]
+            results['transcripts_analyzed'] = len(stored)
+            results['companies_processed'] = len(stored)
+            results['alerts_created'] = sum(len(processed['alerts']) for processed in stored)
+            
+            # Step 4: Generate trend analyses once the new transcripts are stored
+            trend_keys = []
+            for company_id in dict.fromkeys(processed['company_id'] for processed in stored):
+                if await self._generate_trend_analysis(company_id, writer=writer):
+                    trend_keys.append(('trend', company_id))
+            writer.flush()
+            results['trends_generated'] = sum(1 for key in trend_keys if key not in writer.failures)
+            
+            # Step 5: Generate summary statistics
             results['summary'] = await self._generate_collection_summary()
             
             logger.info(f"Q1 2025 data collection completed: {results}")
@@ -163,69 +186,93 @@ class RealDataCollector:
             (2024, 4),  # Q4 2024 reports (for comparison)
         ]
         
+        companies = {}
         for ticker in self.target_biotech_companies:
             company = Company.find_by_ticker(ticker)
-            if not company:
-                continue
+            if company:
+                companies[ticker] = company
+        keys = [(ticker, year, quarter) for ticker in companies for year, quarter in target_quarters]
+        
+        # Earnings Call API first, in batches; the client fetches what a batch lacks one by one
+        fetched = dict(self.earnings_client.get_transcripts(keys))
+        logger.info(f"Earnings Call fetch requests: {self.earnings_client.get_fetch_stats()}")
+        
+        for ticker, year, quarter in keys:
+            try:
+                transcript = fetched.get((ticker, year, quarter))
                 
-            for year, quarter in target_quarters:
-                try:
-                    # Try Earnings Call API first
-                    transcript = self.earnings_client.get_transcript(ticker, year, quarter)
+                if not transcript:
+                    # Try FMP API as backup
+                    transcript = self.fmp_client.get_transcript(ticker, year, quarter)
+                
+                if transcript:
+                    # Standardize format
+                    standardized = {
+                        'company_id': companies[ticker].id,
+                        'symbol': ticker,
+                        'year': year,
+                        'quarter': quarter,
+                        'content': transcript.get('content', '') or transcript.get('transcript', ''),
+                        'date': transcript.get('date'),
+                        'participants': transcript.get('participants', []),
+                        'source': 'earnings_call' if 'content' in transcript else 'fmp'
+                    }
                     
-                    if not transcript:
-                        # Try FMP API as backup
-                        transcript = self.fmp_client.get_transcript(ticker, year, quarter)
+                    if standardized['content']:
+                        transcripts.append(standardized)
+                        logger.info(f"Fetched transcript: {ticker} {year}Q{quarter}")
                     
-                    if transcript:
-                        # Standardize format
-                        standardized = {
-                            'company_id': company.id,
-                            'symbol': ticker,
-                            'year': year,
-                            'quarter': quarter,
-                            'content': transcript.get('content', '') or transcript.get('transcript', ''),
-                            'date': transcript.get('date'),
-                            'participants': transcript.get('participants', []),
-                            'source': 'earnings_call' if 'content' in transcript else 'fmp'
-                        }
-                        
-                        if standardized['content']:
-                            transcripts.append(standardized)
-                            logger.info(f"Fetched transcript: {ticker} {year}Q{quarter}")
-                        
-                except Exception as e:
-                    logger.error(f"Error fetching transcript {ticker} {year}Q{quarter}: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error fetching transcript {ticker} {year}Q{quarter}: {str(e)}")
         
         logger.info(f"Fetched {len(transcripts)} transcripts")
         return transcripts
     
-    async def _process_transcript_with_enhancement(self, transcript_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Process transcript with enhanced sentiment analysis and quote extraction"""
+    def _filter_new_transcripts(self, transcripts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop transcripts that are already stored, checking them all in one query"""
+        missing = Transcript.find_missing((t['symbol'], t['year'], t['quarter']) for t in transcripts)
+        
+        new_transcripts = []
+        for transcript_data in transcripts:
+            if (transcript_data['symbol'], transcript_data['year'], transcript_data['quarter']) in missing:
+                new_transcripts.append(transcript_data)
+            else:
+                logger.info(f"Transcript already exists: {transcript_data['symbol']} {transcript_data['year']}Q{transcript_data['quarter']}")
+        return new_transcripts
+    
+    async def _process_transcript_with_enhancement(
+        self,
+        transcript_data: Dict[str, Any],
+        cleaned_content: Optional[str] = None,
+        sentiment_result: Optional[Dict[str, Any]] = None,
+        quote_sentiments: Optional[List[Optional[Dict[str, Any]]]] = None,
+        writer: Optional[BatchWriter] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Process transcript with enhanced sentiment analysis and quote extraction
+        
+        cleaned_content, sentiment_result and quote_sentiments may be
+        precomputed (e.g. by the sentiment worker pool); anything missing is
+        computed here. With a
+        writer, the transcript, its sentiment and its alerts are queued on it
+        under the returned key; otherwise they are written now.
+        """
         try:
             company_id = transcript_data['company_id']
             content = transcript_data['content']
             
-            # Check if transcript already exists
-            existing = Transcript.query.filter_by(
-                company_id=company_id,
-                fiscal_year=transcript_data['year'],
-                fiscal_quarter=transcript_data['quarter']
-            ).first()
-            
-            if existing:
-                logger.info(f"Transcript already exists: {transcript_data['symbol']} {transcript_data['year']}Q{transcript_data['quarter']}")
-                return None
-            
             # Clean and process the transcript
-            cleaned_content = self._clean_transcript_text(content)
+            if cleaned_content is None:
+                if not self._filter_new_transcripts([transcript_data]):
+                    return None
+                cleaned_content = self._clean_transcript_text(content)
             
             # Extract quotes and guidance
-            quotes = self._extract_key_quotes(cleaned_content)
+            quotes = self._extract_key_quotes(cleaned_content, quote_sentiments)
             guidance = self._extract_guidance(cleaned_content)
             
             # Perform enhanced sentiment analysis
-            sentiment_result = self.sentiment_analyzer.analyze_text(cleaned_content)
+            if sentiment_result is None:
+                sentiment_result = self.sentiment_analyzer.analyze_text(cleaned_content)
             
             # Create transcript record
             transcript = Transcript(
@@ -238,12 +285,9 @@ class RealDataCollector:
                 word_count=len(cleaned_content.split())
             )
             
-            db.session.add(transcript)
-            db.session.flush()  # Get the ID
-            
             # Create enhanced sentiment analysis
             sentiment = SentimentAnalysis(
-                transcript_id=transcript.id,
+                transcript=transcript,
                 overall_sentiment=sentiment_result.get('overall_sentiment', 0),
                 management_confidence_score=sentiment_result.get('confidence', 0),
                 guidance_sentiment=sentiment_result.get('guidance_sentiment', 0),
@@ -256,18 +300,28 @@ class RealDataCollector:
                 extracted_guidance=[guidance_item.__dict__ for guidance_item in guidance]
             )
             
-            db.session.add(sentiment)
-            db.session.commit()
-            
-            logger.info(f"Processed transcript: {transcript_data['symbol']} {transcript_data['year']}Q{transcript_data['quarter']}")
-            
-            return {
-                'transcript_id': transcript.id,
+            processed = {
+                'key': (transcript_data['symbol'], transcript_data['year'], transcript_data['quarter']),
+                'transcript': transcript,
                 'company_id': company_id,
                 'sentiment_analysis': sentiment,
                 'quotes': quotes,
                 'guidance': guidance
             }
+            processed['alerts'] = await self._check_for_alerts(processed)
+            
+            # Transcript, sentiment and alerts are written or dropped together
+            if writer is not None:
+                writer.add(transcript, sentiment, *processed['alerts'], key=processed['key'])
+            else:
+                with BatchWriter() as writer:
+                    writer.add(transcript, sentiment, *processed['alerts'], key=processed['key'])
+                if writer.failures:
+                    return None
+            
+            logger.info(f"Processed transcript: {transcript_data['symbol']} {transcript_data['year']}Q{transcript_data['quarter']}")
+            
+            return processed
             
         except Exception as e:
             logger.error(f"Error processing transcript: {str(e)}")
@@ -280,64 +334,62 @@ class RealDataCollector:
             return ""
         
         # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = patterns.WHITESPACE.sub(' ', text)
         
         # Remove timestamps and formatting artifacts
-        text = re.sub(r'\[\d+:\d+:\d+\]', '', text)
-        text = re.sub(r'\(.*?\)', '', text)  # Remove parenthetical notes
+        text = patterns.TIMESTAMP.sub('', text)
+        text = patterns.PARENTHETICAL.sub('', text)  # Remove parenthetical notes
         
         # Clean up speaker indicators
-        text = re.sub(r'^[A-Z\s]+:', '', text, flags=re.MULTILINE)
+        text = patterns.SPEAKER_LABEL.sub('', text)
         
         return text.strip()
     
-    def _extract_key_quotes(self, text: str) -> List[QuoteExtraction]:
-        """Extract key quotes from the transcript"""
-        quotes = []
-        
-        # Patterns for important statements
-        important_patterns = [
-            r'(we (?:expect|anticipate|believe|are confident|project).*?[.!])',
-            r'(our guidance.*?[.!])',
-            r'(revenue.*?(?:increased|decreased|grew|declined).*?[.!])',
-            r'(clinical trial.*?(?:results|data|outcomes).*?[.!])',
-            r'(fda.*?(?:approval|clearance|submission).*?[.!])',
-            r'(pipeline.*?(?:advancing|progress|development).*?[.!])'
-        ]
-        
-        for pattern in important_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE | re.DOTALL)
+    def _find_quote_texts(self, text: str) -> List[str]:
+        """Candidate key quotes in the transcript, at most 10"""
+        quote_texts = []
+        for pattern in patterns.QUOTE_PATTERNS:
+            matches = pattern.finditer(text)
             for match in matches:
                 quote_text = match.group(1).strip()
                 if len(quote_text) > 20 and len(quote_text) < 300:  # Reasonable quote length
-                    # Analyze sentiment of the quote
-                    quote_sentiment = self.sentiment_analyzer.analyze_text(quote_text)
-                    
-                    quote = QuoteExtraction(
-                        text=quote_text,
-                        speaker="Management",  # Could be enhanced to detect specific speakers
-                        context=self._determine_quote_context(quote_text),
-                        sentiment_score=quote_sentiment.get('overall_sentiment', 0),
-                        topic=self._categorize_quote_topic(quote_text)
-                    )
-                    quotes.append(quote)
+                    quote_texts.append(quote_text)
+        
+        return quote_texts[:10]  # Limit to top 10 quotes
+    
+    def _extract_key_quotes(self, text: str,
+                            quote_sentiments: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[QuoteExtraction]:
+        """Extract key quotes from the transcript
         
-        return quotes[:10]  # Limit to top 10 quotes
+        quote_sentiments, if given, are the scores of _find_quote_texts(text)
+        in order; otherwise the quotes are scored here.
+        """
+        quotes = []
+        quote_texts = self._find_quote_texts(text)
+        
+        if quote_sentiments is None:
+            quote_sentiments = [self.sentiment_analyzer.analyze_text_or_none(quote_text) for quote_text in quote_texts]
+        
+        for index, quote_text in enumerate(quote_texts):
+            quote_sentiment = (quote_sentiments[index] if index < len(quote_sentiments) else None) or {}
+            quote = QuoteExtraction(
+                text=quote_text,
+                speaker="Management",  # Could be enhanced to detect specific speakers
+                context=self._determine_quote_context(quote_text),
+                sentiment_score=quote_sentiment.get('overall_sentiment', 0),
+                topic=self._categorize_quote_topic(quote_text)
+            )
+            quotes.append(quote)
+        
+        return quotes
     
     def _extract_guidance(self, text: str) -> List[GuidanceExtraction]:
         """Extract financial and operational guidance"""
         guidance = []
         
         # Patterns for guidance statements
-        guidance_patterns = [
-            r'(?:revenue|sales|earnings).*?(?:expect|guidance|target|project).*?(\$[\d.,]+\s*(?:million|billion|M|B))',
-            r'(?:expect|guidance|target|project).*?(?:revenue|sales|earnings).*?(\$[\d.,]+\s*(?:million|billion|M|B))',
-            r'(?:patient enrollment|trial completion|data readout).*?(Q[1-4]|quarter|month).*?(\d{4})',
-            r'(?:fda|regulatory).*?(?:filing|submission|approval).*?(Q[1-4]|quarter|month).*?(\d{4})'
-        ]
-        
-        for pattern in guidance_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
+        for pattern in patterns.GUIDANCE_ITEM_PATTERNS:
+            matches = pattern.finditer(text)
             for match in matches:
                 guidance_text = match.group(0)
                 
@@ -354,15 +406,9 @@ class RealDataCollector:
     def _extract_product_mentions(self, text: str) -> List[str]:
         """Extract product/drug mentions"""
         # Common biotech product naming patterns
-        product_patterns = [
-            r'\b[A-Z]{2,}-\d+\b',  # Drug codes like AB-123
-            r'\b[a-z]+mab\b',      # Monoclonal antibodies
-            r'\b[A-Z][a-z]+\d+\b', # Product names like Drug123
-        ]
-        
         products = set()
-        for pattern in product_patterns:
-            matches = re.finditer(pattern, text)
+        for pattern in patterns.PRODUCT_NAME_PATTERNS:
+            matches = pattern.finditer(text)
             for match in matches:
                 products.add(match.group(0))
         
@@ -419,12 +465,12 @@ class RealDataCollector:
     def _extract_guidance_value(self, text: str) -> str:
         """Extract the numerical value from guidance"""
         # Look for monetary values
-        money_match = re.search(r'\$[\d.,]+\s*(?:million|billion|M|B)', text, re.IGNORECASE)
+        money_match = patterns.GUIDANCE_MONEY.search(text)
         if money_match:
             return money_match.group(0)
         
         # Look for other numerical values
-        number_match = re.search(r'\d+(?:,\d+)*(?:\.\d+)?', text)
+        number_match = patterns.GUIDANCE_NUMBER.search(text)
         if number_match:
             return number_match.group(0)
         
@@ -432,7 +478,7 @@ class RealDataCollector:
     
     def _extract_guidance_timeframe(self, text: str) -> str:
         """Extract the timeframe for guidance"""
-        timeframe_match = re.search(r'(Q[1-4]\s*\d{4}|quarter\s*\d+|month\s*\d+|\d{4})', text, re.IGNORECASE)
+        timeframe_match = patterns.GUIDANCE_TIMEFRAME.search(text)
         if timeframe_match:
             return timeframe_match.group(0)
         return 'Not specified'
@@ -450,8 +496,13 @@ class RealDataCollector:
         else:
             return 'medium'
     
-    async def _generate_trend_analysis(self, company_id: int) -> Optional[TrendAnalysis]:
-        """Generate trend analysis comparing with historical data"""
+    async def _generate_trend_analysis(self, company_id: int,
+                                       writer: Optional[BatchWriter] = None) -> Optional[TrendAnalysis]:
+        """Generate trend analysis comparing with historical data
+        
+        With a writer the trend is queued on it under ('trend', company_id);
+        otherwise it is written now.
+        """
         try:
             # Get the company's transcripts ordered by date
             transcripts = Transcript.query.filter_by(company_id=company_id)\
@@ -492,8 +543,13 @@ class RealDataCollector:
                 notable_quotes=getattr(latest.sentiment_analysis, 'key_quotes', [])[:3]
             )
             
-            db.session.add(trend)
-            db.session.commit()
+            if writer is not None:
+                writer.add(trend, key=('trend', company_id))
+            else:
+                with BatchWriter() as writer:
+                    writer.add(trend, key=('trend', company_id))
+                if writer.failures:
+                    return None
             
             return trend
             
@@ -502,7 +558,7 @@ class RealDataCollector:
             return None
     
     async def _check_for_alerts(self, processed_data: Dict[str, Any]) -> List[Alert]:
-        """Check for conditions that warrant alerts"""
+        """Check for conditions that warrant alerts; the caller writes them with the transcript"""
         alerts = []
         
         try:
@@ -522,11 +578,10 @@ class RealDataCollector:
                     data={
                         'sentiment_score': sentiment.overall_sentiment,
                         'confidence_score': sentiment.management_confidence_score,
-                        'key_quotes': processed_data.get('quotes', [])[:2]
+                        'key_quotes': [quote.__dict__ for quote in processed_data.get('quotes', [])[:2]]
                     }
                 )
                 
-                db.session.add(alert)
                 alerts.append(alert)
             
             # Check for guidance-related alerts
@@ -543,11 +598,8 @@ class RealDataCollector:
                     }
                 )
                 
-                db.session.add(alert)
                 alerts.append(alert)
             
-            db.session.commit()
-            
         except Exception as e:
             logger.error(f"Error checking for alerts: {str(e)}")
         
@@ -0,0 +1,169 @@
+"""Persistent Upstream API Response Cache"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .disk_cache import DiskLRUCache
+
+logger = logging.getLogger(__name__)
+
+# Endpoint classes; each client maps its endpoints onto these
+TRANSCRIPT = 'transcript'  # A published transcript, never changes
+SYMBOLS = 'symbols'  # Symbol lists, company profiles, per-ticker transcript listings
+EVENTS = 'events'  # Recent calls, searches and other fast-moving listings
+
+
+class ResponseCache:
+    """Cache of decoded API responses keyed by endpoint and normalized params
+
+    Each endpoint class has its own time to live (None never expires).
+    Stale entries are kept so the client can revalidate them with the
+    entry's ETag / Last-Modified and keep the body on a 304. Empty bodies
+    never count as immutable, since a transcript that isn't published yet
+    comes back empty. In offline mode every cached entry is served however
+    old it is and misses fail instead of reaching the network, so dev and
+    test runs can replay a recorded cache.
+    """
+
+    def __init__(
+        self,
+        cache: DiskLRUCache,
+        ttls: Mapping[str, Optional[float]],
+        empty_ttl: float,
+        offline: bool = False
+    ):
+        self.cache = cache
+        self.ttls = dict(ttls)
+        self.empty_ttl = empty_ttl
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def classify(endpoint: str, classes: Mapping[str, str]) -> Optional[str]:
+        """Endpoint class for an endpoint, matching exactly or on its first path segment"""
+        if endpoint in classes:
+            return classes[endpoint]
+        head, sep, _ = endpoint.partition('/')
+        return classes.get(head + '/') if sep else None
+
+    @staticmethod
+    def key(
+        base_url: str,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Cache key for a request; the API key and param order don't matter"""
+        params = {name: value for name, value in (params or {}).items() if name != 'apikey' and value is not None}
+        payload = json.dumps(
+            [base_url.rstrip('/'), method.upper(), endpoint.strip('/'), params, data],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def lookup(self, key: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """(entry, usable without asking the server), entry None if not cached"""
+        try:
+            entry = self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"API response cache lookup failed: {str(e)}")
+            entry = None
+
+        if entry is None:
+            self._count('misses')
+            return None, False
+
+        usable = self.offline or entry['expires_at'] is None or entry['expires_at'] > time.time()
+        if usable:
+            self._count('hits')
+        return entry, usable
+
+    @staticmethod
+    def revalidation_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Conditional request headers for a stale entry"""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, key: str, endpoint_class: str, body: Any, headers: Optional[Mapping[str, str]] = None):
+        """Cache a fresh response body"""
+        ttl = self.ttls.get(endpoint_class, self.empty_ttl)
+        if not body:
+            ttl = self.empty_ttl if ttl is None else min(ttl, self.empty_ttl)
+
+        headers = headers or {}
+        entry = {
+            'body': body,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'stored_at': time.time(),
+            'expires_at': None if ttl is None else time.time() + ttl,
+            'endpoint_class': endpoint_class
+        }
+        try:
+            self.cache.set(key, entry)
+        except Exception as e:
+            logger.warning(f"API response cache write failed: {str(e)}")
+
+    def refresh(self, key: str, entry: Dict[str, Any], headers: Optional[Mapping[str, str]] = None):
+        """Keep a stale entry's body after the server answered 304 Not Modified"""
+        self._count('revalidated')
+        self.store(key, entry.get('endpoint_class', EVENTS), entry['body'], {
+            'ETag': (headers or {}).get('ETag') or entry.get('etag'),
+            'Last-Modified': (headers or {}).get('Last-Modified') or entry.get('last_modified')
+        })
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Hit, miss and revalidation counts"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'revalidated': self.revalidated}
+
+
+# Process-wide caches, one per database file, shared by every client instance
+_response_caches: Dict[str, ResponseCache] = {}
+_response_caches_lock = threading.Lock()
+
+def get_response_cache(config) -> Optional[ResponseCache]:
+    """Get the shared API response cache, or None if disabled or unavailable"""
+    path = config.API_CACHE_PATH
+    if not path:
+        return None
+
+    with _response_caches_lock:
+        response_cache = _response_caches.get(path)
+        if response_cache is None:
+            try:
+                response_cache = ResponseCache(
+                    DiskLRUCache(
+                        path,
+                        max_entries=config.API_CACHE_MAX_ENTRIES,
+                        max_bytes=config.API_CACHE_MAX_MB * 1024 * 1024
+                    ),
+                    ttls={
+                        TRANSCRIPT: None,
+                        SYMBOLS: config.API_CACHE_SYMBOLS_TTL,
+                        EVENTS: config.API_CACHE_EVENTS_TTL
+                    },
+                    empty_ttl=config.API_CACHE_EVENTS_TTL,
+                    offline=config.API_CACHE_OFFLINE
+                )
+            except Exception as e:
+                logger.error(f"Failed to open API response cache: {str(e)}")
+                return None
+            _response_caches[path] = response_cache
+        return response_cache
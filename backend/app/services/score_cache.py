@@ -0,0 +1,62 @@
+"""Persistent FinBERT Chunk Score Cache"""
+import hashlib
+import logging
+from typing import List, Optional, Sequence
+
+from .disk_cache import DiskLRUCache
+from .inference_engine import ChunkScore
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreCache:
+    """Content-addressed cache of FinBERT scores per chunk
+
+    Keys are sha256(model id + revision + normalized chunk text), so a score
+    is reused whenever the same text is scored by the same model, regardless
+    of which transcript or segment it came from.
+    """
+
+    def __init__(self, cache: DiskLRUCache, model_id: str, revision: Optional[str] = None):
+        self.cache = cache
+        self.model_id = model_id
+        self.revision = revision or 'main'
+        self._prefix = f'{self.model_id}\x00{self.revision}\x00'
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        """Cache key for a chunk of text"""
+        normalized = ' '.join(text.split())
+        return hashlib.sha256((self._prefix + normalized).encode('utf-8')).hexdigest()
+
+    def lookup(self, texts: Sequence[str]) -> List[Optional[ChunkScore]]:
+        """Cached score per text, None where not cached"""
+        keys = [self.key(text) for text in texts]
+        try:
+            found = self.cache.get_many(keys)
+        except Exception as e:
+            logger.warning(f"FinBERT score cache lookup failed: {str(e)}")
+            found = {}
+
+        results = []
+        for key in keys:
+            value = found.get(key)
+            results.append(ChunkScore(label=value['label'], score=value['score']) if value else None)
+
+        hit_count = sum(1 for result in results if result is not None)
+        self.hits += hit_count
+        self.misses += len(results) - hit_count
+        return results
+
+    def store(self, texts: Sequence[str], scores: Sequence[Optional[ChunkScore]]):
+        """Cache the scores of freshly scored texts"""
+        items = [
+            (self.key(text), {'label': chunk_score.label, 'score': chunk_score.score})
+            for text, chunk_score in zip(texts, scores)
+            if chunk_score is not None
+        ]
+        try:
+            self.cache.set_many(items)
+        except Exception as e:
+            logger.warning(f"FinBERT score cache write failed: {str(e)}")
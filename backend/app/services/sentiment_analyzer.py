@@ -1,13 +1,20 @@
 """Sentiment Analysis Service"""
 import logging
+import threading
 import numpy as np
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
 import openai
 
 from config.config import Config
+from .disk_cache import DiskLRUCache
+from .inference_engine import BatchInferenceEngine, ChunkScore
+from .inference_planner import InferencePlan, locate_spans
+from .inference_scheduler import InferenceScheduler, SchedulerStats
+from .model_registry import get_model_registry
+from .score_cache import ScoreCache
+from .sentiment_pool import SentimentWorkerPool
+from .text_chunker import TextChunk, TokenChunker
 from .transcript_processor import ProcessedTranscript
 
 logger = logging.getLogger(__name__)
@@ -19,20 +26,22 @@ class SentimentAnalyzer:
     def __init__(self, config: Optional[Config] = None):
         self.config = config or Config()
         
-        # Initialize FinBERT
-        try:
-            self.tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
-            self.model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert")
-            self.finbert = pipeline(
-                "sentiment-analysis",
-                model=self.model,
-                tokenizer=self.tokenizer,
-                device=0 if torch.cuda.is_available() else -1
-            )
-            logger.info("FinBERT initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize FinBERT: {str(e)}")
-            self.finbert = None
+        # FinBERT is loaded on first use through the process-wide model registry
+        self._model_lock = threading.Lock()
+        self._model_ready = False
+        self._finbert = None
+        self.tokenizer = None
+        self.backend = None
+        self.model_revision = None
+        self.chunker = None
+        self.score_cache = None
+        
+        # Multi-process analysis (started lazily on the first multi-item run)
+        self.workers = self.config.SENTIMENT_WORKERS
+        self.pool = None
+        
+        # Throughput of the most recent multi-transcript run
+        self.last_scheduler_stats = SchedulerStats()
         
         # Initialize OpenAI if API key is available
         self.use_gpt = False
@@ -68,116 +77,355 @@ class SentimentAnalyzer:
             'revenue projection', 'cash runway', 'burn rate', 'operating expenses'
         ]
     
-    def analyze_transcript(self, processed_transcript: ProcessedTranscript) -> Dict[str, Any]:
-        """Perform comprehensive sentiment analysis on processed transcript"""
-        try:
-            # Analyze overall sentiment
-            overall_sentiment = self._analyze_text_sentiment(processed_transcript.cleaned_text)
-            
-            # Add biotech-specific sentiment adjustment
-            biotech_adjustment = self._calculate_biotech_sentiment_adjustment(
-                processed_transcript.cleaned_text
-            )
-            
-            # Adjust overall sentiment based on biotech-specific terms
-            adjusted_sentiment = overall_sentiment['score'] + biotech_adjustment
-            adjusted_sentiment = max(-1.0, min(1.0, adjusted_sentiment))  # Clamp to [-1, 1]
-            
-            # Analyze by section
-            section_sentiments = {}
-            for section_name, section_text in processed_transcript.sections.items():
-                if section_text and section_name != 'full':
-                    section_sentiments[section_name] = self._analyze_text_sentiment(section_text)
-            
-            # Use confidence indicators from processing
-            confidence_score = processed_transcript.confidence_indicators['score']
-            
-            # Analyze guidance sentiment with biotech context
-            guidance_sentiment = self._analyze_guidance_sentiment(
-                processed_transcript.guidance_statements
-            )
+    @property
+    def finbert(self) -> Optional[BatchInferenceEngine]:
+        """Batched FinBERT engine, loading the model on first access (None if unavailable)"""
+        if not self._model_ready:
+            self._load_model()
+        return self._finbert
+    
+    def _load_model(self):
+        """Attach the shared model and build the engine, chunker and score cache"""
+        with self._model_lock:
+            if self._model_ready:
+                return
             
-            # Extract guidance changes
-            guidance_changes = self._extract_guidance_changes(
-                processed_transcript.guidance_statements
+            loaded = get_model_registry().get(self.config)
+            if loaded is None:
+                # Not ready; ask again next time, the registry retries after a backoff
+                return
+            try:
+                self.tokenizer = loaded.tokenizer
+                self.backend = loaded.backend
+                self.model_revision = loaded.revision
+                self._finbert = BatchInferenceEngine(
+                    self.tokenizer,
+                    self.backend,
+                    max_batch_size=self.config.FINBERT_MAX_BATCH_SIZE,
+                    max_batch_tokens=self.config.FINBERT_MAX_BATCH_TOKENS
+                )
+                self.chunker = TokenChunker(
+                    self.tokenizer,
+                    max_tokens=self.config.FINBERT_CHUNK_TOKENS,
+                    overlap=self.config.FINBERT_CHUNK_OVERLAP
+                )
+                # Persistent per-chunk score cache
+                self.score_cache = self._open_score_cache()
+            except Exception as e:
+                # Not marked ready, so the next access tries again
+                logger.error(f"Failed to initialize FinBERT: {str(e)}")
+                self._finbert = None
+                self.chunker = None
+                self.score_cache = None
+            else:
+                self._model_ready = True
+    
+    def _open_score_cache(self) -> Optional[ScoreCache]:
+        """Open the persistent FinBERT score cache, if configured"""
+        if not self._finbert or not self.config.FINBERT_CACHE_PATH:
+            return None
+        try:
+            return ScoreCache(
+                DiskLRUCache(self.config.FINBERT_CACHE_PATH, max_entries=self.config.FINBERT_CACHE_MAX_ENTRIES),
+                model_id=self.config.FINBERT_MODEL,
+                # Quantized backends score slightly differently, so they get their own entries
+                revision=f'{self.model_revision}:{self.backend.name}'
             )
-            
-            # Extract key topics
-            key_topics = self._extract_key_topics(processed_transcript)
-            
-            # Extract biotech-specific insights
-            biotech_insights = self._extract_biotech_insights(processed_transcript)
-            
-            # Compile analysis results
-            analysis = {
-                'overall_sentiment': adjusted_sentiment,
-                'sentiment_label': self._score_to_label(adjusted_sentiment),
-                'raw_sentiment': overall_sentiment['score'],
-                'biotech_adjustment': biotech_adjustment,
-                'sentiment_by_section': section_sentiments,
-                'management_confidence_score': confidence_score,
-                'guidance_sentiment': guidance_sentiment,
-                'guidance_changes': guidance_changes,
-                'confidence_indicators': processed_transcript.confidence_indicators,
-                'product_mentions': processed_transcript.product_mentions,
-                'key_topics': key_topics,
-                'biotech_insights': biotech_insights,
-                'key_metrics': processed_transcript.key_metrics,
-                'analysis_metadata': {
-                    'word_count': processed_transcript.word_count,
-                    'analyzed_at': datetime.utcnow().isoformat()
-                }
-            }
-            
-            # Optional GPT enhancement for edge cases
-            if self.use_gpt and self._should_use_gpt_enhancement(analysis):
-                gpt_insights = self._get_gpt_insights(
-                    processed_transcript.cleaned_text[:4000],  # Limit text length
-                    analysis
+        except Exception as e:
+            logger.error(f"Failed to open FinBERT score cache: {str(e)}")
+            return None
+    
+    def _get_pool(self) -> Optional[SentimentWorkerPool]:
+        """Start the worker pool on first use, if more than one worker is configured"""
+        if self.pool is None and self.workers > 1 and self.finbert:
+            try:
+                self.pool = SentimentWorkerPool(
+                    self,
+                    self.workers,
+                    task_size=self.config.SENTIMENT_TASK_SIZE,
+                    threads_per_worker=self.config.FINBERT_NUM_THREADS
                 )
-                if gpt_insights:
-                    analysis['gpt_enhanced'] = True
-                    analysis['gpt_insights'] = gpt_insights
-            
-            return analysis
+            except Exception as e:
+                logger.error(f"Failed to start sentiment worker pool, analyzing in-process: {str(e)}")
+                self.workers = 1
+        return self.pool
+    
+    def start_workers(self) -> Optional[SentimentWorkerPool]:
+        """Start the worker pool now; call it before starting threads or other pools"""
+        return self._get_pool()
+    
+    def close(self):
+        """Stop the worker pool, if one was started"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+    
+    def analyze_transcript(self, processed_transcript: ProcessedTranscript) -> Dict[str, Any]:
+        """Perform comprehensive sentiment analysis on processed transcript"""
+        try:
+            # Score the full text, every section and every guidance statement
+            # in one batched FinBERT pass, each distinct span only once
+            segment_sentiments = self._score_plan(self._plan_segments(processed_transcript))
+            return self._build_analysis(processed_transcript, segment_sentiments)
             
         except Exception as e:
             logger.error(f"Error in sentiment analysis: {str(e)}")
             raise
     
-    def _analyze_text_sentiment(self, text: str) -> Dict[str, Any]:
-        """Analyze sentiment of text using FinBERT"""
-        if not text or not self.finbert:
-            return {'score': 0.0, 'label': 'neutral', 'confidence': 0.0}
+    def analyze_transcripts(
+        self,
+        processed_transcripts: List[ProcessedTranscript]
+    ) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """Analyze many transcripts through one shared FinBERT work queue
+        
+        Chunks from all transcripts are packed into common batches. Yields
+        (index, analysis) as each transcript's last chunk is scored; analysis
+        is None if building it failed.
+        """
+        self.last_scheduler_stats = SchedulerStats()
+        
+        pool = self._get_pool() if len(processed_transcripts) > 1 else None
+        if pool is not None:
+            yield from pool.analyze_transcripts(processed_transcripts)
+            self.last_scheduler_stats = pool.last_stats
+            return
+        
+        if not self.finbert:
+            for index, processed_transcript in enumerate(processed_transcripts):
+                plan = self._plan_segments(processed_transcript)
+                yield index, self._safe_build_analysis(processed_transcript, self._score_plan(plan))
+            return
+        
+        scheduler = self._new_scheduler()
+        self.last_scheduler_stats = scheduler.stats
+        plans = {}
+        
+        for index, processed_transcript in enumerate(processed_transcripts):
+            try:
+                plans[index] = self._plan_segments(processed_transcript)
+                scheduler.submit(index, plans[index].chunk_units(self.chunker))
+            except Exception as e:
+                logger.error(f"Error preparing transcript {processed_transcript.symbol} for analysis: {str(e)}")
+                yield index, None
+        
+        for index, unit_scores in scheduler.run():
+            chunk_scores = plans.pop(index).segment_scores(unit_scores)
+            segment_sentiments = {
+                key: self._aggregate_chunk_scores(results)
+                for key, results in chunk_scores.items()
+            }
+            yield index, self._safe_build_analysis(processed_transcripts[index], segment_sentiments)
+    
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        """Score a standalone text (a whole transcript or a single quote)"""
+        sentiment = self._analyze_text_sentiment(text)
+        return {
+            'overall_sentiment': sentiment['score'],
+            'sentiment_label': sentiment['label'],
+            'confidence': sentiment['confidence']
+        }
+    
+    def analyze_texts(self, texts: List[str]) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """Score many standalone texts, yielding (index, result) as each finishes"""
+        pool = self._get_pool() if len(texts) > 1 else None
+        if pool is not None:
+            yield from pool.analyze_texts(texts)
+            return
+        
+        for index, text in enumerate(texts):
+            yield index, self.analyze_text_or_none(text, index)
+    
+    def analyze_text_groups(self, groups: List[List[str]]) -> Iterator[Tuple[int, List[Optional[Dict[str, Any]]]]]:
+        """Score groups of standalone texts, yielding (index, results) as each whole group finishes
+        
+        A group's texts are scored in the same worker task, so a transcript
+        and its quotes come back together instead of the quotes queueing
+        behind every other transcript.
+        """
+        pool = self._get_pool() if len(groups) > 1 else None
+        if pool is not None:
+            yield from pool.analyze_text_groups(groups)
+            return
+        
+        for index, texts in enumerate(groups):
+            yield index, [self.analyze_text_or_none(text, index) for text in texts]
+    
+    def analyze_text_or_none(self, text: str, index: int = 0) -> Optional[Dict[str, Any]]:
+        """analyze_text, logging instead of raising on failure"""
+        try:
+            return self.analyze_text(text)
+        except Exception as e:
+            logger.error(f"Error analyzing text {index}: {str(e)}")
+            return None
+    
+    def _safe_build_analysis(
+        self,
+        processed_transcript: ProcessedTranscript,
+        segment_sentiments: Dict[str, Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Build an analysis, logging instead of raising on failure"""
+        try:
+            return self._build_analysis(processed_transcript, segment_sentiments)
+        except Exception as e:
+            logger.error(f"Error in sentiment analysis for {processed_transcript.symbol}: {str(e)}")
+            return None
+    
+    def _build_analysis(
+        self,
+        processed_transcript: ProcessedTranscript,
+        segment_sentiments: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Compile the analysis from per-segment sentiments and processing results"""
+        # Analyze overall sentiment
+        overall_sentiment = segment_sentiments['overall']
+        
+        # Add biotech-specific sentiment adjustment
+        biotech_adjustment = self._calculate_biotech_sentiment_adjustment(
+            processed_transcript.cleaned_text
+        )
         
-        # Split text into chunks (FinBERT has token limits)
-        chunks = self._split_text_into_chunks(text, max_length=500)
+        # Adjust overall sentiment based on biotech-specific terms
+        adjusted_sentiment = overall_sentiment['score'] + biotech_adjustment
+        adjusted_sentiment = max(-1.0, min(1.0, adjusted_sentiment))  # Clamp to [-1, 1]
         
-        sentiments = []
-        confidences = []
+        # Analyze by section
+        section_sentiments = {
+            key.split(':', 1)[1]: sentiment
+            for key, sentiment in segment_sentiments.items()
+            if key.startswith('section:')
+        }
         
-        for chunk in chunks:
-            try:
-                results = self.finbert(chunk)
-                if results:
-                    result = results[0]
-                    
-                    # Convert to numeric score
-                    score = result['score']
-                    if result['label'] == 'negative':
-                        score = -score
-                    elif result['label'] == 'neutral':
-                        score = 0
-                    
-                    sentiments.append(score)
-                    confidences.append(result['score'])
-            except Exception as e:
-                logger.warning(f"Error analyzing chunk: {str(e)}")
+        # Use confidence indicators from processing
+        confidence_score = processed_transcript.confidence_indicators['score']
+        
+        # Analyze guidance sentiment with biotech context
+        guidance_sentiment = self._mean_score([
+            sentiment for key, sentiment in segment_sentiments.items()
+            if key.startswith('guidance:')
+        ])
+        
+        # Extract guidance changes
+        guidance_changes = self._extract_guidance_changes(
+            processed_transcript.guidance_statements
+        )
+        
+        # Extract key topics
+        key_topics = self._extract_key_topics(processed_transcript)
+        
+        # Extract biotech-specific insights
+        biotech_insights = self._extract_biotech_insights(processed_transcript)
+        
+        # Compile analysis results
+        analysis = {
+            'overall_sentiment': adjusted_sentiment,
+            'sentiment_label': self._score_to_label(adjusted_sentiment),
+            'raw_sentiment': overall_sentiment['score'],
+            'biotech_adjustment': biotech_adjustment,
+            'sentiment_by_section': section_sentiments,
+            'management_confidence_score': confidence_score,
+            'guidance_sentiment': guidance_sentiment,
+            'guidance_changes': guidance_changes,
+            'confidence_indicators': processed_transcript.confidence_indicators,
+            'product_mentions': processed_transcript.product_mentions,
+            'key_topics': key_topics,
+            'biotech_insights': biotech_insights,
+            'key_metrics': processed_transcript.key_metrics,
+            'analysis_metadata': {
+                'word_count': processed_transcript.word_count,
+                'analyzed_at': datetime.utcnow().isoformat()
+            }
+        }
+        
+        # Optional GPT enhancement for edge cases
+        if self.use_gpt and self._should_use_gpt_enhancement(analysis):
+            gpt_insights = self._get_gpt_insights(
+                processed_transcript.cleaned_text[:4000],  # Limit text length
+                analysis
+            )
+            if gpt_insights:
+                analysis['gpt_enhanced'] = True
+                analysis['gpt_insights'] = gpt_insights
+        
+        return analysis
+    
+    def _plan_segments(self, processed_transcript: ProcessedTranscript) -> InferencePlan:
+        """Map every text that gets its own sentiment score onto spans of the cleaned text"""
+        text = processed_transcript.cleaned_text
+        segment_spans = {'overall': [(0, len(text))]}
+        
+        section_spans = processed_transcript.section_spans
+        for section_name, section_text in processed_transcript.sections.items():
+            if not section_text or section_name == 'full':
                 continue
+            spans = section_spans.get(section_name)
+            if spans is None:
+                spans = [span for span in locate_spans(text, [section_text]) if span]
+            segment_spans[f'section:{section_name}'] = spans
+        
+        guidance_spans = processed_transcript.guidance_spans
+        if len(guidance_spans) != len(processed_transcript.guidance_statements):
+            guidance_spans = locate_spans(text, processed_transcript.guidance_statements)
+        for i, span in enumerate(guidance_spans):
+            segment_spans[f'guidance:{i}'] = [span] if span else []
+        
+        return InferencePlan(text, segment_spans)
+    
+    def _new_scheduler(self) -> InferenceScheduler:
+        """Create a FinBERT work queue backed by the score cache"""
+        return InferenceScheduler(
+            self.finbert,
+            max_batch_tokens=self.config.FINBERT_MAX_BATCH_TOKENS,
+            cache=self.score_cache
+        )
+    
+    def _score_plan(self, plan: InferencePlan) -> Dict[str, Dict[str, Any]]:
+        """Score each unit of a plan once and aggregate per segment"""
+        if not self.finbert:
+            return {key: self._aggregate_chunk_scores([]) for key in plan.segment_spans}
+        
+        scheduler = self._new_scheduler()
+        scheduler.submit(0, plan.chunk_units(self.chunker))
+        chunk_scores = plan.segment_scores(dict(scheduler.run())[0])
+        return {key: self._aggregate_chunk_scores(results) for key, results in chunk_scores.items()}
+    
+    def _chunk_segments(self, segments: Dict[str, str]) -> Dict[str, List[TextChunk]]:
+        """Split every segment into token windows with one tokenizer call"""
+        keys = [key for key, text in segments.items() if text]
+        chunked = self.chunker.chunk_many([segments[key] for key in keys])
         
-        if not sentiments:
+        chunks = {key: [] for key in segments}
+        chunks.update(zip(keys, chunked))
+        return chunks
+    
+    def _score_segments(self, segments: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Score all chunks of all segments in one batched pass and aggregate per segment"""
+        if not self.finbert:
+            return {key: self._aggregate_chunk_scores([]) for key in segments}
+        
+        scheduler = self._new_scheduler()
+        scheduler.submit(0, self._chunk_segments(segments))
+        chunk_scores = dict(scheduler.run())[0]
+        return {key: self._aggregate_chunk_scores(results) for key, results in chunk_scores.items()}
+    
+    def _aggregate_chunk_scores(self, results: List[ChunkScore]) -> Dict[str, Any]:
+        """Combine chunk predictions into a confidence-weighted sentiment"""
+        if not results:
             return {'score': 0.0, 'label': 'neutral', 'confidence': 0.0}
         
+        sentiments = []
+        confidences = []
+        
+        for result in results:
+            # Convert to numeric score
+            score = result.score
+            if result.label == 'negative':
+                score = -score
+            elif result.label == 'neutral':
+                score = 0
+            
+            sentiments.append(score)
+            confidences.append(result.score)
+        
         # Calculate weighted average based on confidence
         weights = np.array(confidences)
         scores = np.array(sentiments)
@@ -190,17 +438,18 @@ class SentimentAnalyzer:
             'confidence': float(avg_confidence)
         }
     
-    def _analyze_guidance_sentiment(self, guidance_statements: List[str]) -> float:
-        """Analyze sentiment of guidance statements"""
-        if not guidance_statements:
+    def _mean_score(self, sentiments: List[Dict[str, Any]]) -> float:
+        """Average the scores of several analyzed texts"""
+        if not sentiments:
             return 0.0
+        return float(np.mean([s['score'] for s in sentiments]))
+    
+    def _analyze_text_sentiment(self, text: str) -> Dict[str, Any]:
+        """Analyze sentiment of text using FinBERT"""
+        if not text or not self.finbert:
+            return {'score': 0.0, 'label': 'neutral', 'confidence': 0.0}
         
-        sentiments = []
-        for statement in guidance_statements:
-            result = self._analyze_text_sentiment(statement)
-            sentiments.append(result['score'])
-        
-        return float(np.mean(sentiments)) if sentiments else 0.0
+        return self._score_segments({'text': text})['text']
     
     def _extract_key_topics(self, processed_transcript: ProcessedTranscript) -> Dict[str, Any]:
         """Extract key topics from the transcript"""
@@ -343,30 +592,6 @@ class SentimentAnalyzer:
             logger.error(f"GPT enhancement failed: {str(e)}")
             return None
     
-    def _split_text_into_chunks(self, text: str, max_length: int = 500) -> List[str]:
-        """Split text into chunks for processing"""
-        words = text.split()
-        chunks = []
-        current_chunk = []
-        
-        for word in words:
-            current_chunk.append(word)
-            if len(' '.join(current_chunk)) > max_length:
-                if len(current_chunk) > 1:
-                    # Remove last word and create chunk
-                    current_chunk.pop()
-                    chunks.append(' '.join(current_chunk))
-                    current_chunk = [word]
-                else:
-                    # Single word exceeds max length
-                    chunks.append(word[:max_length])
-                    current_chunk = []
-        
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
-        
-        return chunks
-    
     def _score_to_label(self, score: float) -> str:
         """Convert numeric score to label"""
         if score > 0.1:
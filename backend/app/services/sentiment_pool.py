@@ -0,0 +1,144 @@
+"""Multi-process Sentiment Worker Pool"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .inference_scheduler import SchedulerStats
+
+logger = logging.getLogger(__name__)
+
+# Set in the parent before forking; workers inherit the loaded model copy-on-write
+_analyzer = None
+
+
+def _init_worker(num_threads: int):
+    """Per-worker setup after fork"""
+    import torch
+
+    # Each worker gets its share of the cores instead of all of them
+    torch.set_num_threads(num_threads)
+
+    # Workers must not fan out again, and SQLite connections can't cross a fork
+    _analyzer.workers = 1
+    _analyzer.pool = None
+    _analyzer.score_cache = _analyzer._open_score_cache()
+
+
+def _analyze_transcripts_task(task) -> Tuple[List[Tuple[int, Optional[Dict[str, Any]]]], SchedulerStats]:
+    """Analyze a group of transcripts through the worker's own inference queue"""
+    indices, processed_transcripts = task
+    results = [
+        (indices[position], analysis)
+        for position, analysis in _analyzer.analyze_transcripts(processed_transcripts)
+    ]
+    return results, _analyzer.last_scheduler_stats
+
+
+def _analyze_texts_task(task) -> Tuple[List[Tuple[int, Optional[Dict[str, Any]]]], None]:
+    """Analyze a group of plain texts"""
+    indices, texts = task
+    return [(index, _analyzer.analyze_text_or_none(text, index)) for index, text in zip(indices, texts)], None
+
+
+def _analyze_text_groups_task(task) -> Tuple[List[Tuple[int, List[Optional[Dict[str, Any]]]]], None]:
+    """Analyze groups of plain texts, each group's texts together"""
+    indices, groups = task
+    return [
+        (index, [_analyzer.analyze_text_or_none(text, index) for text in texts])
+        for index, texts in zip(indices, groups)
+    ], None
+
+
+class SentimentWorkerPool:
+    """Runs sentiment analysis in N forked worker processes
+
+    The parent loads FinBERT once and the workers are forked from it, so the
+    model weights are shared copy-on-write rather than loaded N times. Each
+    worker limits torch to its share of the cores. Work is sent in small
+    groups, largest first, and results stream back to the parent as they
+    finish so the caller can write them to the database.
+
+    The pool must be created before the parent runs any inference itself;
+    forking a process whose torch thread pool is already active can hang.
+    Likewise it should be created before the parent starts other threads
+    (or pools, which start handler threads); a warning names any that are
+    already running.
+    """
+
+    def __init__(self, analyzer, workers: int, task_size: int = 4, threads_per_worker: int = 0):
+        global _analyzer
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("Sentiment worker pool requires the fork start method")
+
+        self.workers = workers
+        self.task_size = max(1, task_size)
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        self.last_stats = SchedulerStats()
+
+        others = [thread.name for thread in threading.enumerate() if thread is not threading.current_thread()]
+        if others:
+            logger.warning(
+                f"Forking sentiment workers while other threads are running ({', '.join(others)}); "
+                f"a lock held by one of them would stay locked in the workers"
+            )
+
+        _analyzer = analyzer
+        context = multiprocessing.get_context('fork')
+        self._pool = context.Pool(
+            workers,
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker,)
+        )
+
+        logger.info(f"Started sentiment worker pool: {workers} workers x {self.threads_per_worker} threads")
+
+    def analyze_transcripts(self, processed_transcripts: Sequence) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """Yield (index, analysis) for each transcript as workers finish"""
+        stats = SchedulerStats()
+        sizes = [len(pt.cleaned_text or '') for pt in processed_transcripts]
+        yield from self._run(_analyze_transcripts_task, list(processed_transcripts), sizes, stats)
+        self.last_stats = stats
+
+    def analyze_texts(self, texts: Sequence[str]) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """Yield (index, result) for each text as workers finish"""
+        return self._run(_analyze_texts_task, list(texts), [len(text or '') for text in texts])
+
+    def analyze_text_groups(self, groups: Sequence[List[str]]) -> Iterator[Tuple[int, List[Optional[Dict[str, Any]]]]]:
+        """Yield (index, results) for each group of texts as workers finish"""
+        sizes = [sum(len(text or '') for text in texts) for texts in groups]
+        return self._run(_analyze_text_groups_task, list(groups), sizes)
+
+    def _run(self, task_fn: Callable, items: List, sizes: List[int],
+             stats: Optional[SchedulerStats] = None) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """Distribute items in groups, largest first, and stream results back"""
+        start_time = time.time()
+
+        # Largest-first keeps one long transcript from finishing last on its own
+        order = sorted(range(len(items)), key=lambda i: sizes[i], reverse=True)
+        tasks = []
+        for i in range(0, len(order), self.task_size):
+            indices = order[i:i + self.task_size]
+            tasks.append((indices, [items[index] for index in indices]))
+
+        for results, worker_stats in self._pool.imap_unordered(task_fn, tasks):
+            if stats is not None and worker_stats is not None:
+                stats.add(worker_stats)
+            for index, result in results:
+                yield index, result
+
+        elapsed = time.time() - start_time
+        if stats is not None:
+            stats.elapsed_seconds = elapsed
+        logger.info(
+            f"Sentiment worker pool finished {len(items)} items in "
+            f"{elapsed:.1f}s across {self.workers} workers"
+        )
+
+    def close(self):
+        """Stop the worker processes"""
+        self._pool.close()
+        self._pool.join()
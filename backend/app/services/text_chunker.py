@@ -0,0 +1,105 @@
+"""Token-aware Text Chunker"""
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TextChunk:
+    """A window of a text that fits in one FinBERT forward pass"""
+    text: str
+    start: int  # Character offset in the source text
+    end: int
+    input_ids: List[int]  # Includes [CLS]/[SEP]
+
+
+class TokenChunker:
+    """Splits texts into token windows using a single pass over tokenizer offsets
+
+    Each text is tokenized once. Windows are cut directly from the token
+    stream, so no window exceeds ``max_tokens`` (special tokens included),
+    and the window's token IDs are kept for inference so chunks are never
+    tokenized a second time.
+    """
+
+    def __init__(self, tokenizer, max_tokens: int = 512, overlap: int = 0):
+        self.tokenizer = tokenizer
+        self.window = max_tokens - tokenizer.num_special_tokens_to_add(pair=False)
+
+        if self.window <= 0:
+            raise ValueError(f"max_tokens={max_tokens} leaves no room for text tokens")
+        if not 0 <= overlap < self.window:
+            raise ValueError(f"overlap must be between 0 and {self.window - 1}")
+
+        self.overlap = overlap
+
+    def chunk(self, text: str) -> List[TextChunk]:
+        """Split one text into token windows"""
+        return self.chunk_many([text])[0]
+
+    def chunk_many(self, texts: Sequence[str]) -> List[List[TextChunk]]:
+        """Split several texts into token windows with one tokenizer call"""
+        if not texts:
+            return []
+
+        encodings = self.tokenizer(
+            list(texts),
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            verbose=False
+        )
+
+        return [
+            self._windows(
+                text,
+                encodings['input_ids'][i],
+                encodings['offset_mapping'][i],
+                self._word_ids(encodings, i)
+            )
+            for i, text in enumerate(texts)
+        ]
+
+    def _word_ids(self, encodings, index: int) -> Optional[List[Optional[int]]]:
+        """Word index per token, if the tokenizer provides it"""
+        try:
+            return encodings.word_ids(index)
+        except (AttributeError, ValueError):
+            return None
+
+    def _windows(self, text: str, ids: List[int], offsets: List[tuple],
+                 word_ids: Optional[List[Optional[int]]]) -> List[TextChunk]:
+        """Cut the token stream of one text into windows"""
+        chunks = []
+        total = len(ids)
+        start = 0
+
+        while start < total:
+            end = min(start + self.window, total)
+
+            # Don't split a word across windows unless the word alone fills one
+            if end < total and word_ids is not None:
+                snapped = end
+                while snapped > start + 1 and word_ids[snapped] is not None \
+                        and word_ids[snapped] == word_ids[snapped - 1]:
+                    snapped -= 1
+                if snapped > start + 1:
+                    end = snapped
+
+            char_start = offsets[start][0]
+            char_end = offsets[end - 1][1]
+            chunks.append(TextChunk(
+                text=text[char_start:char_end],
+                start=char_start,
+                end=char_end,
+                input_ids=self.tokenizer.build_inputs_with_special_tokens(ids[start:end])
+            ))
+
+            if end >= total:
+                break
+
+            # Step forward, keeping ``overlap`` tokens of context but always advancing
+            start = max(end - self.overlap, start + 1)
+
+        return chunks
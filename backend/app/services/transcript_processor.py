@@ -1,9 +1,11 @@
 """Transcript processing service"""
-import re
 import logging
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from . import patterns
+from .pattern_matcher import PatternMatcher, TextIndex, findall_values
 
 logger = logging.getLogger(__name__)
 
@@ -22,83 +24,31 @@ class ProcessedTranscript:
     product_mentions: List[Dict[str, Any]]
     guidance_statements: List[str]
     key_metrics: Dict[str, Any]
+    section_spans: Dict[str, List[Tuple[int, int]]] = field(default_factory=dict)  # Offsets into cleaned_text
+    guidance_spans: List[Tuple[int, int]] = field(default_factory=list)
 
 
 class TranscriptProcessor:
     """Service for processing earnings call transcripts"""
     
     def __init__(self):
-        # Confidence indicator patterns
-        self.confidence_patterns = {
-            'positive': [
-                r'strong\s+momentum',
-                r'ahead\s+of\s+schedule',
-                r'exceed(?:ing|ed)?\s+expectations',
-                r'confident\s+in\s+our\s+ability',
-                r'on\s+track\s+to',
-                r'well[\s-]positioned',
-                r'significant\s+progress',
-                r'pleased\s+with',
-                r'outperform(?:ing|ed)?',
-                r'accelerat(?:ing|ed)\s+growth',
-                r'strong\s+pipeline',
-                r'robust\s+demand',
-                r'positive\s+momentum',
-                r'breakthrough',
-                r'milestone\s+achievement'
-            ],
-            'negative': [
-                r'challenging\s+environment',
-                r'below\s+expectations',
-                r'uncertain(?:ty)?',
-                r'delay(?:ed|s)?',
-                r'setback',
-                r'concerns?\s+about',
-                r'difficult\s+quarter',
-                r'headwinds?',
-                r'disappointing',
-                r'slower\s+than\s+expected',
-                r'competitive\s+pressure',
-                r'supply\s+chain\s+issues',
-                r'regulatory\s+challenges',
-                r'clinical\s+trial\s+failure',
-                r'discontinued?\s+(?:study|program)'
-            ],
-            'neutral': [
-                r'in\s+line\s+with',
-                r'as\s+expected',
-                r'maintain(?:ing|ed)?',
-                r'continues?\s+to',
-                r'steady',
-                r'consistent\s+with',
-                r'on\s+plan',
-                r'unchanged'
-            ]
-        }
-        
-        # Product/drug name patterns for biotech
-        self.product_patterns = [
-            # Drug codes (e.g., ABC-123, XYZ-4567)
-            r'(?<![A-Z0-9])([A-Z]{2,4}[-\s]?\d{3,4}[A-Z]?)(?![A-Z0-9])',
-            # Clinical programs
-            r'our\s+([A-Z][\w-]+)\s+(?:product|drug|therapy|treatment|candidate|program)',
-            # Phase mentions
-            r'Phase\s+(?:I{1,3}|[1-3][ab]?)\s+(?:trial|study|data|results)\s+(?:of|for)\s+([A-Z][\w-]+)',
-            # Brand names in quotes
-            r'["\']([A-Z][\w-]+)["\']?\s+(?:product|drug|therapy)',
-            # FDA submissions
-            r'(?:NDA|BLA|IND|510\(k\))\s+for\s+([A-Z][\w-]+)'
-        ]
+        # Compiled patterns from the shared registry
+        self.confidence_patterns = patterns.CONFIDENCE_PATTERNS
+        self.product_patterns = patterns.PRODUCT_PATTERNS
+        self.guidance_patterns = patterns.GUIDANCE_PATTERNS
+        self.metric_patterns = patterns.METRIC_PATTERNS
+        self.dollar_pattern = patterns.DOLLAR_AMOUNT
         
-        # Guidance patterns
-        self.guidance_patterns = [
-            r'(?:expect|anticipate|project|forecast|guide).*?(?:\$[\d,]+\s*(?:million|billion))',
-            r'(?:revenue|earnings)\s+(?:guidance|outlook).*?(?:\d+%|\$[\d,]+)',
-            r'(?:full[\s-]year|annual|FY\s*\d{4}).*?(?:expect|anticipate).*?(?:\d+%|\$[\d,]+)',
-            r'reaffirm(?:ing|ed)?\s+(?:our\s+)?(?:\d{4}\s+)?guidance',
-            r'rais(?:ing|ed)\s+(?:our\s+)?(?:\d{4}\s+)?guidance',
-            r'lower(?:ing|ed)?\s+(?:our\s+)?(?:\d{4}\s+)?guidance'
-        ]
+        # Each matcher scans a text for all of its patterns together
+        self._confidence_matcher = PatternMatcher({
+            (kind, i): pattern
+            for kind, kind_patterns in self.confidence_patterns.items()
+            for i, pattern in enumerate(kind_patterns)
+        })
+        self._product_matcher = PatternMatcher(dict(enumerate(self.product_patterns)))
+        self._guidance_matcher = PatternMatcher(dict(enumerate(self.guidance_patterns)))
+        self._metric_matcher = PatternMatcher(self.metric_patterns)
+        self._dollar_matcher = PatternMatcher({'dollar_amounts': self.dollar_pattern})
     
     def process_transcript(self, transcript_data: Dict[str, Any]) -> ProcessedTranscript:
         """Process raw transcript into structured data"""
@@ -108,14 +58,17 @@ class TranscriptProcessor:
             # Clean the text
             cleaned_text = self.clean_text(content)
             
-            # Split into sections
-            sections = self.split_into_sections(cleaned_text)
+            # Split into sections, keeping their offsets in the cleaned text
+            section_spans = self.locate_sections(cleaned_text)
+            sections = self._sections_from_spans(cleaned_text, section_spans)
             
-            # Extract various components
+            # Extract various components, sharing one literal index of the text
+            index = TextIndex(cleaned_text)
             confidence_indicators = self.extract_confidence_indicators(cleaned_text)
-            product_mentions = self.extract_product_mentions(cleaned_text)
-            guidance_statements = self.extract_guidance(cleaned_text)
-            key_metrics = self.extract_key_metrics(cleaned_text)
+            product_mentions = self.extract_product_mentions(cleaned_text, index)
+            guidance_spans = self.locate_guidance(cleaned_text, index)
+            guidance_statements = [cleaned_text[start:end] for start, end in guidance_spans]
+            key_metrics = self.extract_key_metrics(cleaned_text, index)
             
             # Parse date
             date_str = transcript_data.get('date', '')
@@ -135,7 +88,9 @@ class TranscriptProcessor:
                 confidence_indicators=confidence_indicators,
                 product_mentions=product_mentions,
                 guidance_statements=guidance_statements,
-                key_metrics=key_metrics
+                key_metrics=key_metrics,
+                section_spans=section_spans,
+                guidance_spans=guidance_spans
             )
             
         except Exception as e:
@@ -148,73 +103,81 @@ class TranscriptProcessor:
             return ''
         
         # Remove HTML tags if any
-        text = re.sub(r'<[^>]+>', ' ', text)
+        text = patterns.HTML_TAG.sub(' ', text)
         
         # Fix spacing issues
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\s*--\s*', ' ', text)
+        text = patterns.WHITESPACE.sub(' ', text)
+        text = patterns.DOUBLE_DASH.sub(' ', text)
         
         # Normalize quotes and apostrophes
-        text = re.sub(r'["""]', '"', text)
-        text = re.sub(r'['']', "'", text)
+        text = patterns.DOUBLE_QUOTES.sub('"', text)
+        text = patterns.SINGLE_QUOTES.sub("'", text)
         
         # Remove special characters but keep sentence structure
-        text = re.sub(r'[^\w\s\.\,\;\:\!\?\-\$\%\(\)\'\"\/]', ' ', text)
+        text = patterns.SPECIAL_CHARS.sub(' ', text)
         
         # Fix multiple periods
-        text = re.sub(r'\.{2,}', '.', text)
+        text = patterns.REPEATED_PERIODS.sub('.', text)
         
         # Normalize case for acronyms
-        text = re.sub(r'\b([A-Z]\.){2,}', lambda m: m.group(0).replace('.', ''), text)
+        text = patterns.DOTTED_ACRONYM.sub(lambda m: m.group(0).replace('.', ''), text)
         
         return text.strip()
     
     def split_into_sections(self, text: str) -> Dict[str, str]:
         """Split transcript into prepared remarks and Q&A sections"""
-        sections = {
-            'full': text,
-            'prepared_remarks': '',
-            'qa_section': '',
-            'ceo_remarks': '',
-            'cfo_remarks': ''
+        return self._sections_from_spans(text, self.locate_sections(text))
+    
+    def locate_sections(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """Find the character spans of each transcript section"""
+        spans = {
+            'full': [(0, len(text))],
+            'prepared_remarks': [],
+            'qa_section': [],
+            'ceo_remarks': [],
+            'cfo_remarks': []
         }
         
         # Find Q&A section
-        qa_markers = [
-            r'question[\s-]and[\s-]answer',
-            r'q\s*&\s*a\s+session',
-            r'we\'?ll\s+now\s+(?:take|open|begin)\s+questions?',
-            r'now\s+open\s+(?:the\s+)?(?:floor|line)?\s*(?:for|to)\s+questions?',
-            r'turn\s+(?:it\s+)?over\s+(?:to|for)\s+questions?',
-            r'operator\s+instructions'
-        ]
-        
         qa_start = None
-        for marker in qa_markers:
-            match = re.search(marker, text, re.IGNORECASE)
+        for marker in patterns.QA_MARKERS:
+            match = marker.search(text)
             if match:
                 qa_start = match.start()
                 break
         
         if qa_start:
-            sections['prepared_remarks'] = text[:qa_start].strip()
-            sections['qa_section'] = text[qa_start:].strip()
+            spans['prepared_remarks'] = [self._strip_span(text, 0, qa_start)]
+            spans['qa_section'] = [self._strip_span(text, qa_start, len(text))]
         else:
-            sections['prepared_remarks'] = text
+            spans['prepared_remarks'] = [(0, len(text))]
         
         # Extract CEO remarks
-        ceo_pattern = r'(?:CEO|Chief\s+Executive\s+Officer)[\s\:]+([^.]+\.(?:[^.]+\.){0,10})'
-        ceo_matches = re.findall(ceo_pattern, text, re.IGNORECASE)
-        if ceo_matches:
-            sections['ceo_remarks'] = ' '.join(ceo_matches[:3])  # First 3 segments
+        spans['ceo_remarks'] = [
+            match.span(1) for match in patterns.CEO_REMARKS.finditer(text)
+        ][:3]  # First 3 segments
         
         # Extract CFO remarks
-        cfo_pattern = r'(?:CFO|Chief\s+Financial\s+Officer)[\s\:]+([^.]+\.(?:[^.]+\.){0,10})'
-        cfo_matches = re.findall(cfo_pattern, text, re.IGNORECASE)
-        if cfo_matches:
-            sections['cfo_remarks'] = ' '.join(cfo_matches[:3])
+        spans['cfo_remarks'] = [
+            match.span(1) for match in patterns.CFO_REMARKS.finditer(text)
+        ][:3]
         
-        return sections
+        return spans
+    
+    def _sections_from_spans(self, text: str, spans: Dict[str, List[Tuple[int, int]]]) -> Dict[str, str]:
+        """Build section texts from their spans"""
+        return {
+            name: ' '.join(text[start:end] for start, end in section_spans)
+            for name, section_spans in spans.items()
+        }
+    
+    def _strip_span(self, text: str, start: int, end: int) -> Tuple[int, int]:
+        """Narrow a span the way str.strip() narrows its text"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
     
     def extract_confidence_indicators(self, text: str) -> Dict[str, Any]:
         """Extract and score confidence indicators"""
@@ -230,10 +193,11 @@ class TranscriptProcessor:
         }
         
         text_lower = text.lower()
+        found = self._confidence_matcher.scan(text_lower)
         
         # Extract positive indicators with context
-        for pattern in self.confidence_patterns['positive']:
-            matches = list(re.finditer(pattern, text_lower))
+        for i in range(len(self.confidence_patterns['positive'])):
+            matches = found['positive', i]
             indicators['positive_count'] += len(matches)
             
             for match in matches[:5]:  # Limit to first 5 of each type
@@ -251,8 +215,8 @@ class TranscriptProcessor:
                 })
         
         # Extract negative indicators with context
-        for pattern in self.confidence_patterns['negative']:
-            matches = list(re.finditer(pattern, text_lower))
+        for i in range(len(self.confidence_patterns['negative'])):
+            matches = found['negative', i]
             indicators['negative_count'] += len(matches)
             
             for match in matches[:5]:
@@ -269,9 +233,8 @@ class TranscriptProcessor:
                 })
         
         # Count neutral indicators
-        for pattern in self.confidence_patterns['neutral']:
-            matches = re.findall(pattern, text_lower)
-            indicators['neutral_count'] += len(matches)
+        for i in range(len(self.confidence_patterns['neutral'])):
+            indicators['neutral_count'] += len(found['neutral', i])
         
         # Calculate confidence score (-1 to 1)
         total = indicators['positive_count'] + indicators['negative_count'] + indicators['neutral_count']
@@ -282,14 +245,13 @@ class TranscriptProcessor:
         
         return indicators
     
-    def extract_product_mentions(self, text: str) -> List[Dict[str, Any]]:
+    def extract_product_mentions(self, text: str, index: Optional[TextIndex] = None) -> List[Dict[str, Any]]:
         """Extract product/drug mentions for biotech companies"""
         products = {}
+        found = self._product_matcher.scan(text, index)
         
-        for pattern in self.product_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            
-            for match in matches:
+        for i in range(len(self.product_patterns)):
+            for match in found[i]:
                 product_name = match.group(1) if match.lastindex else match.group(0)
                 product_name = product_name.strip()
                 
@@ -325,27 +287,33 @@ class TranscriptProcessor:
     
     def extract_guidance(self, text: str) -> List[str]:
         """Extract forward-looking guidance statements"""
+        return [text[start:end] for start, end in self.locate_guidance(text)]
+    
+    def locate_guidance(self, text: str, index: Optional[TextIndex] = None) -> List[Tuple[int, int]]:
+        """Find the character spans of forward-looking guidance statements"""
         guidance = []
+        spans = []
+        found = self._guidance_matcher.scan(text, index)
         
-        for pattern in self.guidance_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            
-            for match in matches:
+        for i in range(len(self.guidance_patterns)):
+            for match in found[i]:
                 # Get the full sentence
                 start = text.rfind('.', 0, match.start()) + 1
                 end = text.find('.', match.end())
                 if end == -1:
                     end = len(text)
                 
-                statement = text[start:end].strip()
+                start, end = self._strip_span(text, start, end)
+                statement = text[start:end]
                 
                 # Avoid duplicates
                 if statement and statement not in guidance and len(statement) < 500:
                     guidance.append(statement)
+                    spans.append((start, end))
         
-        return guidance[:10]  # Return top 10 guidance statements
+        return spans[:10]  # Return top 10 guidance statements
     
-    def extract_key_metrics(self, text: str) -> Dict[str, Any]:
+    def extract_key_metrics(self, text: str, index: Optional[TextIndex] = None) -> Dict[str, Any]:
         """Extract key financial and operational metrics"""
         metrics = {
             'revenue_mentions': [],
@@ -355,24 +323,22 @@ class TranscriptProcessor:
             'dollar_amounts': []
         }
         
+        if index is None or index.text is not text:
+            index = TextIndex(text)
+        found = self._metric_matcher.scan(text, index)
+        found.update(self._dollar_matcher.scan(text, index))
+        
         # Revenue mentions
-        revenue_pattern = r'revenue.*?(?:\$[\d,]+\s*(?:million|billion)|[\d\.]+%)'
-        revenue_matches = re.findall(revenue_pattern, text, re.IGNORECASE)
-        metrics['revenue_mentions'] = revenue_matches[:5]
+        metrics['revenue_mentions'] = findall_values(found['revenue_mentions'][:5])
         
         # Clinical trial updates
-        clinical_pattern = r'(?:Phase\s+(?:I{1,3}|[1-3][ab]?)|clinical\s+trial|study).*?(?:complet|enroll|result|data|success|fail)'
-        clinical_matches = re.findall(clinical_pattern, text, re.IGNORECASE)
-        metrics['clinical_updates'] = [match[:200] for match in clinical_matches[:5]]
+        clinical_matches = findall_values(found['clinical_updates'][:5])
+        metrics['clinical_updates'] = [match[:200] for match in clinical_matches]
         
         # Percentage changes
-        percent_pattern = r'(?:increase|decrease|growth|decline|up|down).*?([\d\.]+)%'
-        percent_matches = re.findall(percent_pattern, text, re.IGNORECASE)
-        metrics['percentage_changes'] = percent_matches[:10]
+        metrics['percentage_changes'] = findall_values(found['percentage_changes'][:10])
         
         # Dollar amounts
-        dollar_pattern = r'\$[\d,]+(?:\.\d+)?\s*(?:million|billion|thousand)?'
-        dollar_matches = re.findall(dollar_pattern, text)
-        metrics['dollar_amounts'] = dollar_matches[:10]
+        metrics['dollar_amounts'] = findall_values(found['dollar_amounts'][:10])
         
         return metrics 
\ No newline at end of file
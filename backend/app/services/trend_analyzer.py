@@ -1,11 +1,14 @@
 """Trend Analysis Service"""
 import logging
 import numpy as np
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Iterable, Tuple, Optional, Any
 from datetime import datetime, date, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from sqlalchemy import func
 
 from app.models import db, Company, Transcript, SentimentAnalysis, TrendAnalysis, Alert
+from app.services.batch_writer import BatchWriter
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +25,7 @@ class TrendResult:
     notable_changes: List[Dict[str, Any]]
     comparison_window: int
     analysis_date: date
+    alerts: List[Alert] = field(default_factory=list)  # Written with the trend by save_trend_analysis
 
 
 class TrendAnalyzer:
@@ -70,7 +74,7 @@ class TrendAnalyzer:
             notable_changes = self._extract_notable_changes(latest, historical)
             
             # Check for alerts
-            self._check_for_alerts(company_id, latest, historical, sentiment_trend, confidence_trend)
+            alerts = self._check_for_alerts(company_id, latest, historical, sentiment_trend, confidence_trend)
             
             return TrendResult(
                 company_id=company_id,
@@ -81,26 +85,97 @@ class TrendAnalyzer:
                 latest_confidence=latest['management_confidence_score'],
                 notable_changes=notable_changes,
                 comparison_window=lookback_quarters,
-                analysis_date=date.today()
+                analysis_date=date.today(),
+                alerts=alerts
             )
             
         except Exception as e:
             logger.error(f"Error analyzing trend for company {company_id}: {str(e)}")
             raise
     
+    def analyze_company_trends(self, company_ids: Iterable[int],
+                               lookback_quarters: Optional[int] = None) -> Dict[int, TrendResult]:
+        """analyze_company_trend for many companies at once
+        
+        Loads every company's last quarters with one windowed query into
+        padded (companies x quarters) matrices, newest quarter first, and
+        computes the statistics and categories of all companies with the
+        same history length in one pass of the kernels the per-company path
+        uses, so results are identical.
+        """
+        if lookback_quarters is None:
+            lookback_quarters = self.lookback_quarters
+        
+        company_ids = list(dict.fromkeys(company_ids))
+        depth = lookback_quarters + 1
+        histories = self._fetch_historical_analyses_bulk(company_ids, depth)
+        
+        lengths = np.array([len(histories.get(company_id, [])) for company_id in company_ids], dtype=int)
+        sentiment = np.full((len(company_ids), depth), np.nan)
+        confidence = np.full((len(company_ids), depth), np.nan)
+        for row, company_id in enumerate(company_ids):
+            for column, analysis in enumerate(histories.get(company_id, [])):
+                sentiment[row, column] = analysis['overall_sentiment']
+                confidence[row, column] = analysis['management_confidence_score']
+        
+        results = {}
+        for company_id, length in zip(company_ids, lengths):
+            if length < 2:
+                logger.warning(f"Insufficient data for trend analysis: company_id={company_id}")
+                results[company_id] = self._create_insufficient_data_result(company_id)
+        
+        for length in np.unique(lengths[lengths >= 2]):
+            rows = np.flatnonzero(lengths == length)
+            sentiment_values = sentiment[rows, :length]
+            confidence_values = confidence[rows, :length]
+            sentiment_stats = self._trend_statistics(sentiment_values)
+            confidence_stats = self._trend_statistics(confidence_values)
+            categories = self._categorize_trends(
+                sentiment_stats,
+                confidence_stats,
+                sentiment_values[:, 0],
+                confidence_values[:, 0]
+            )
+            
+            for index, row in enumerate(rows):
+                company_id = company_ids[row]
+                latest = histories[company_id][0]
+                historical = histories[company_id][1:]
+                sentiment_trend = self._trend_dict(sentiment_stats, index, sentiment_values[index])
+                confidence_trend = self._trend_dict(confidence_stats, index, confidence_values[index])
+                
+                alerts = self._check_for_alerts(company_id, latest, historical, sentiment_trend, confidence_trend)
+                
+                results[company_id] = TrendResult(
+                    company_id=company_id,
+                    trend_category=categories[index],
+                    sentiment_trend=sentiment_trend,
+                    confidence_trend=confidence_trend,
+                    latest_sentiment=latest['overall_sentiment'],
+                    latest_confidence=latest['management_confidence_score'],
+                    notable_changes=self._extract_notable_changes(latest, historical),
+                    comparison_window=lookback_quarters,
+                    analysis_date=date.today(),
+                    alerts=alerts
+                )
+        
+        return {company_id: results[company_id] for company_id in company_ids}
+    
+    _HISTORY_COLUMNS = (
+        Transcript.fiscal_year,
+        Transcript.fiscal_quarter,
+        Transcript.call_date,
+        SentimentAnalysis.overall_sentiment,
+        SentimentAnalysis.management_confidence_score,
+        SentimentAnalysis.guidance_sentiment,
+        SentimentAnalysis.confidence_indicators,
+        SentimentAnalysis.product_mentions
+    )
+    
     def _fetch_historical_analyses(self, company_id: int, limit: int) -> List[Dict[str, Any]]:
         """Fetch historical sentiment analyses"""
         results = (
-            db.session.query(
-                Transcript.fiscal_year,
-                Transcript.fiscal_quarter,
-                Transcript.call_date,
-                SentimentAnalysis.overall_sentiment,
-                SentimentAnalysis.management_confidence_score,
-                SentimentAnalysis.guidance_sentiment,
-                SentimentAnalysis.confidence_indicators,
-                SentimentAnalysis.product_mentions
-            )
+            db.session.query(*self._HISTORY_COLUMNS)
             .join(SentimentAnalysis, Transcript.id == SentimentAnalysis.transcript_id)
             .filter(Transcript.company_id == company_id)
             .order_by(Transcript.fiscal_year.desc(), Transcript.fiscal_quarter.desc())
@@ -108,19 +183,50 @@ class TrendAnalyzer:
             .all()
         )
         
-        return [
-            {
-                'fiscal_year': r[0],
-                'fiscal_quarter': r[1],
-                'call_date': r[2],
-                'overall_sentiment': r[3] or 0.0,
-                'management_confidence_score': r[4] or 0.0,
-                'guidance_sentiment': r[5] or 0.0,
-                'confidence_indicators': r[6] or {},
-                'product_mentions': r[7] or []
-            }
-            for r in results
-        ]
+        return [self._analysis_dict(r) for r in results]
+    
+    def _fetch_historical_analyses_bulk(self, company_ids: List[int], limit: int,
+                                        chunk_size: int = 500) -> Dict[int, List[Dict[str, Any]]]:
+        """_fetch_historical_analyses for many companies, one windowed query per chunk"""
+        histories = {}
+        for start in range(0, len(company_ids), chunk_size):
+            ranked = (
+                db.session.query(
+                    Transcript.company_id,
+                    *self._HISTORY_COLUMNS,
+                    func.row_number().over(
+                        partition_by=Transcript.company_id,
+                        order_by=(Transcript.fiscal_year.desc(), Transcript.fiscal_quarter.desc())
+                    ).label('position')
+                )
+                .join(SentimentAnalysis, Transcript.id == SentimentAnalysis.transcript_id)
+                .filter(Transcript.company_id.in_(company_ids[start:start + chunk_size]))
+                .subquery()
+            )
+            results = (
+                db.session.query(ranked)
+                .filter(ranked.c.position <= limit)
+                .order_by(ranked.c.company_id, ranked.c.position)
+                .all()
+            )
+            for r in results:
+                histories.setdefault(r[0], []).append(self._analysis_dict(r[1:]))
+        
+        return histories
+    
+    @staticmethod
+    def _analysis_dict(r) -> Dict[str, Any]:
+        """Row of _HISTORY_COLUMNS as an analysis dict"""
+        return {
+            'fiscal_year': r[0],
+            'fiscal_quarter': r[1],
+            'call_date': r[2],
+            'overall_sentiment': r[3] or 0.0,
+            'management_confidence_score': r[4] or 0.0,
+            'guidance_sentiment': r[5] or 0.0,
+            'confidence_indicators': r[6] or {},
+            'product_mentions': r[7] or []
+        }
     
     def _calculate_trend(self, values: List[float]) -> Dict[str, Any]:
         """Calculate trend statistics"""
@@ -135,42 +241,68 @@ class TrendAnalyzer:
                 'trend_strength': 0.0
             }
         
-        # Simple linear regression
-        x = np.arange(len(values))
-        y = np.array(values)
-        
-        # Flip x because values are in reverse chronological order
-        x = x[::-1]
+        matrix = np.array([values], dtype=float)
+        return self._trend_dict(self._trend_statistics(matrix), 0, matrix[0])
+    
+    @staticmethod
+    def _row_sums(matrix: np.ndarray) -> np.ndarray:
+        """Sum each row left to right, so a row's sum doesn't depend on the rows beside it"""
+        total = matrix[:, 0].copy()
+        for column in range(1, matrix.shape[1]):
+            total += matrix[:, column]
+        return total
+    
+    @classmethod
+    def _trend_statistics(cls, values: np.ndarray) -> Dict[str, np.ndarray]:
+        """Trend statistics for each row of a (companies x quarters) matrix, newest quarter first"""
+        count = values.shape[1]
         
-        # Calculate slope using polyfit
-        coefficients = np.polyfit(x, y, 1)
-        slope = float(coefficients[0])
+        # Least-squares slope in closed form; x is flipped because values
+        # are in reverse chronological order
+        x = np.arange(count, dtype=float)[::-1]
+        x_centered = x - x.mean()
+        mean = cls._row_sums(values) / count
+        deviations = values - mean[:, None]
+        slope = cls._row_sums(deviations * x_centered) / float(np.dot(x_centered, x_centered))
         
-        # Calculate change magnitude
-        change = float(values[0] - np.mean(values[1:]))
+        # Change of the latest quarter against the average of the others
+        average_historical = cls._row_sums(values[:, 1:]) / (count - 1)
+        change = values[:, 0] - average_historical
         
-        # Calculate standard deviation
-        std_dev = float(np.std(values))
+        # Population standard deviation
+        std_dev = np.sqrt(cls._row_sums(deviations * deviations) / count)
         
-        # Calculate trend strength (normalized slope)
-        trend_strength = abs(slope) / (std_dev + 0.01)  # Add small value to avoid division by zero
+        # Trend strength (normalized slope); small value avoids division by zero
+        trend_strength = np.abs(slope) / (std_dev + 0.01)
         
-        # Determine direction
-        if slope > 0.05 and change > 0.1:
+        return {
+            'slope': slope,
+            'change': change,
+            'average_historical': average_historical,
+            'std_dev': std_dev,
+            'trend_strength': trend_strength,
+            'improving': (slope > 0.05) & (change > 0.1),
+            'declining': (slope < -0.05) & (change < -0.1)
+        }
+    
+    @staticmethod
+    def _trend_dict(stats: Dict[str, np.ndarray], index: int, values: np.ndarray) -> Dict[str, Any]:
+        """One row of _trend_statistics as a trend dict"""
+        if stats['improving'][index]:
             direction = 'improving'
-        elif slope < -0.05 and change < -0.1:
+        elif stats['declining'][index]:
             direction = 'declining'
         else:
             direction = 'stable'
         
         return {
             'direction': direction,
-            'slope': slope,
-            'change': change,
+            'slope': float(stats['slope'][index]),
+            'change': float(stats['change'][index]),
             'latest': float(values[0]),
-            'average_historical': float(np.mean(values[1:])),
-            'std_dev': std_dev,
-            'trend_strength': float(trend_strength),
+            'average_historical': float(stats['average_historical'][index]),
+            'std_dev': float(stats['std_dev'][index]),
+            'trend_strength': float(stats['trend_strength'][index]),
             'values': [float(v) for v in values]  # Include actual values for visualization
         }
     
@@ -179,53 +311,53 @@ class TrendAnalyzer:
                         latest: Dict[str, Any],
                         historical: List[Dict[str, Any]]) -> str:
         """Categorize overall trend"""
+        def as_stats(trend):
+            return {
+                'improving': np.array([trend['direction'] == 'improving']),
+                'declining': np.array([trend['direction'] == 'declining']),
+                'change': np.array([trend['change']], dtype=float)
+            }
+        
+        return self._categorize_trends(
+            as_stats(sentiment_trend),
+            as_stats(confidence_trend),
+            np.array([latest['overall_sentiment']], dtype=float),
+            np.array([latest['management_confidence_score']], dtype=float)
+        )[0]
+    
+    @staticmethod
+    def _categorize_trends(sentiment: Dict[str, np.ndarray],
+                           confidence: Dict[str, np.ndarray],
+                           latest_sentiment: np.ndarray,
+                           latest_confidence: np.ndarray) -> List[str]:
+        """Categorize the overall trend of each row"""
         # Weighted scoring
         sentiment_weight = 0.6
         confidence_weight = 0.4
         
-        # Calculate direction scores
-        direction_scores = {
-            'improving': 0,
-            'stable': 0,
-            'declining': 0
-        }
-        
-        # Add sentiment trend score
-        if sentiment_trend['direction'] == 'improving':
-            direction_scores['improving'] += sentiment_weight
-        elif sentiment_trend['direction'] == 'declining':
-            direction_scores['declining'] += sentiment_weight
-        else:
-            direction_scores['stable'] += sentiment_weight
+        # Direction scores, one column per category; ties go to the first
+        categories = ('improving', 'stable', 'declining')
+        scores = np.zeros((len(latest_sentiment), 3))
         
-        # Add confidence trend score
-        if confidence_trend['direction'] == 'improving':
-            direction_scores['improving'] += confidence_weight
-        elif confidence_trend['direction'] == 'declining':
-            direction_scores['declining'] += confidence_weight
-        else:
-            direction_scores['stable'] += confidence_weight
+        # Add sentiment and confidence trend scores
+        for trend, weight in ((sentiment, sentiment_weight), (confidence, confidence_weight)):
+            scores[:, 0] += np.where(trend['improving'], weight, 0.0)
+            scores[:, 2] += np.where(trend['declining'], weight, 0.0)
+            scores[:, 1] += np.where(~trend['improving'] & ~trend['declining'], weight, 0.0)
         
         # Check absolute levels
-        if latest['overall_sentiment'] < -0.3 and latest['management_confidence_score'] < -0.3:
-            direction_scores['declining'] += 0.5
-        elif latest['overall_sentiment'] > 0.3 and latest['management_confidence_score'] > 0.3:
-            direction_scores['improving'] += 0.5
+        low = (latest_sentiment < -0.3) & (latest_confidence < -0.3)
+        high = ~low & (latest_sentiment > 0.3) & (latest_confidence > 0.3)
+        scores[:, 2] += np.where(low, 0.5, 0.0)
+        scores[:, 0] += np.where(high, 0.5, 0.0)
         
         # Check magnitude of changes
-        if abs(sentiment_trend['change']) > 0.3 or abs(confidence_trend['change']) > 0.3:
-            if sentiment_trend['change'] > 0:
-                direction_scores['improving'] += 0.3
-            else:
-                direction_scores['declining'] += 0.3
+        large = (np.abs(sentiment['change']) > 0.3) | (np.abs(confidence['change']) > 0.3)
+        scores[:, 0] += np.where(large & (sentiment['change'] > 0), 0.3, 0.0)
+        scores[:, 2] += np.where(large & ~(sentiment['change'] > 0), 0.3, 0.0)
         
         # Determine final category
-        max_score = max(direction_scores.values())
-        for category, score in direction_scores.items():
-            if score == max_score:
-                return category
-        
-        return 'stable'
+        return [categories[column] for column in np.argmax(scores, axis=1)]
     
     def _extract_notable_changes(self, latest: Dict[str, Any], 
                                historical: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -314,8 +446,10 @@ class TrendAnalyzer:
     def _check_for_alerts(self, company_id: int, latest: Dict[str, Any],
                          historical: List[Dict[str, Any]], 
                          sentiment_trend: Dict[str, Any],
-                         confidence_trend: Dict[str, Any]):
-        """Check if alerts should be created"""
+                         confidence_trend: Dict[str, Any]) -> List[Alert]:
+        """Alerts warranted by the trends; they are saved with the trend analysis"""
+        alerts = []
+        
         # Check for significant sentiment change
         if abs(sentiment_trend['change']) > self.significance_threshold:
             previous_sentiment = historical[0]['overall_sentiment'] if historical else 0
@@ -326,7 +460,7 @@ class TrendAnalyzer:
                 previous_sentiment=previous_sentiment,
                 current_sentiment=latest['overall_sentiment']
             )
-            db.session.add(alert)
+            alerts.append(alert)
         
         # Check for significant confidence change
         if abs(confidence_trend['change']) > self.significance_threshold:
@@ -338,14 +472,9 @@ class TrendAnalyzer:
                 previous_confidence=previous_confidence,
                 current_confidence=latest['management_confidence_score']
             )
-            db.session.add(alert)
+            alerts.append(alert)
         
-        # Commit alerts if any were created
-        try:
-            db.session.commit()
-        except Exception as e:
-            logger.error(f"Failed to create alerts: {str(e)}")
-            db.session.rollback()
+        return alerts
     
     def _create_insufficient_data_result(self, company_id: int) -> TrendResult:
         """Create result for insufficient data"""
@@ -361,9 +490,37 @@ class TrendAnalyzer:
             analysis_date=date.today()
         )
     
-    def save_trend_analysis(self, trend_result: TrendResult) -> TrendAnalysis:
-        """Save trend analysis to database"""
-        trend_analysis = TrendAnalysis(
+    def save_trend_analysis(self, trend_result: TrendResult,
+                            writer: Optional[BatchWriter] = None) -> TrendAnalysis:
+        """Save trend analysis and its alerts to database
+        
+        With a writer they are queued on it under ('trend', company_id) and
+        written with its next chunk; otherwise they are written and committed now.
+        """
+        trend_analysis = self._trend_analysis_model(trend_result)
+        key = ('trend', trend_result.company_id)
+        
+        if writer is not None:
+            writer.add(trend_analysis, *trend_result.alerts, key=key)
+        else:
+            with BatchWriter() as writer:
+                writer.add(trend_analysis, *trend_result.alerts, key=key)
+        
+        return trend_analysis
+    
+    def save_trend_analyses(self, trend_results: Iterable[TrendResult],
+                            writer: Optional[BatchWriter] = None) -> List[TrendAnalysis]:
+        """Save many trend analyses with their alerts, committing once per writer chunk"""
+        if writer is None:
+            with BatchWriter() as writer:
+                return self.save_trend_analyses(trend_results, writer)
+        
+        return [self.save_trend_analysis(trend_result, writer) for trend_result in trend_results]
+    
+    @staticmethod
+    def _trend_analysis_model(trend_result: TrendResult) -> TrendAnalysis:
+        """TrendAnalysis record for a result"""
+        return TrendAnalysis(
             company_id=trend_result.company_id,
             analysis_date=trend_result.analysis_date,
             trend_category=trend_result.trend_category,
@@ -373,11 +530,6 @@ class TrendAnalyzer:
             notable_quotes=[],  # To be implemented
             comparison_window=trend_result.comparison_window
         )
-        
-        db.session.add(trend_analysis)
-        db.session.commit()
-        
-        return trend_analysis
     
     def get_market_overview(self, analysis_date: Optional[date] = None) -> Dict[str, Any]:
         """Get market-wide trend overview"""
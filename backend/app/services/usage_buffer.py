@@ -0,0 +1,123 @@
+"""Buffered API Usage Accounting"""
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+from app.models import db, APIUsage
+
+logger = logging.getLogger(__name__)
+
+
+class UsageBuffer:
+    """In-process API call counters written to api_usage in batches
+
+    ``record`` only bumps a counter keyed by (date, endpoint, success), so
+    request threads never touch the database. A background thread writes
+    everything buffered with one upsert every ``flush_seconds``, and once
+    more at interpreter exit. Counts from a failed flush are put back for
+    the next one, so daily totals stay exact.
+
+    Flushes run in their own application context (and so their own
+    database session), using the Flask app of the first call recorded
+    inside one.
+    """
+
+    def __init__(self, flush_seconds: float):
+        self.flush_seconds = flush_seconds
+        self._counts: Dict[Tuple[date, str, bool], int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        atexit.register(self.close)
+
+    def record(self, endpoint: str, success: bool = True):
+        """Count one API call"""
+        if self._app is None and has_app_context():
+            self._app = current_app._get_current_object()
+
+        with self._lock:
+            self._counts[(date.today(), endpoint, success)] += 1
+            if self._thread is None and self.flush_seconds > 0:
+                self._thread = threading.Thread(target=self._run, name='api-usage-flush', daemon=True)
+                self._thread.start()
+
+    def pending(self) -> int:
+        """Calls recorded but not yet written"""
+        with self._lock:
+            return sum(self._counts.values())
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+    def flush(self) -> int:
+        """Write the buffered counts in one upsert; returns the number of calls written"""
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts = self._counts, defaultdict(int)
+            if not counts:
+                return 0
+
+            if self._app is None:
+                # Nothing recorded inside an app yet, so no database to write to
+                self._restore(counts)
+                return 0
+
+            totals: Dict[Tuple[date, str], Tuple[int, int, int]] = {}
+            for (day, endpoint, success), calls in counts.items():
+                total_calls, successes, errors = totals.get((day, endpoint), (0, 0, 0))
+                totals[(day, endpoint)] = (
+                    total_calls + calls,
+                    successes + (calls if success else 0),
+                    errors + (0 if success else calls)
+                )
+
+            try:
+                # Leaving the context removes its session, rolling back on failure
+                with self._app.app_context():
+                    APIUsage.add_counts(totals)
+                    db.session.commit()
+            except Exception as e:
+                logger.error(f"Failed to write API usage counts: {str(e)}")
+                self._restore(counts)
+                return 0
+
+            written = sum(counts.values())
+            logger.debug(f"Wrote {written} API calls across {len(totals)} usage rows")
+            return written
+
+    def _restore(self, counts: Dict[Tuple[date, str, bool], int]):
+        """Put unwritten counts back into the buffer"""
+        with self._lock:
+            for key, calls in counts.items():
+                self._counts[key] += calls
+
+    def close(self):
+        """Stop the background thread and write what is left"""
+        self._stop.set()
+        self.flush()
+        remaining = self.pending()
+        if remaining:
+            logger.warning(f"{remaining} API calls were never written to api_usage")
+
+
+_usage_buffer = None
+_usage_buffer_lock = threading.Lock()
+
+def get_usage_buffer(config=None) -> UsageBuffer:
+    """Get the process-wide API usage buffer"""
+    global _usage_buffer
+    with _usage_buffer_lock:
+        if _usage_buffer is None:
+            if config is None:
+                from config.config import get_config
+                config = get_config()
+            _usage_buffer = UsageBuffer(config.API_USAGE_FLUSH_SECONDS)
+        return _usage_buffer
@@ -42,9 +42,17 @@ class Config:
     FMP_BASE_URL = 'https://financialmodelingprep.com/api'
     FMP_RATE_LIMIT_DELAY = 0.25  # 250ms between calls for free tier
     FMP_TIMEOUT = 30  # seconds
+    FMP_MAX_CONCURRENCY = int(os.getenv('FMP_MAX_CONCURRENCY', 4))  # Requests in flight at once
+    FMP_BURST = int(os.getenv('FMP_BURST', 4))  # Requests allowed back to back after idling
     
     # Earnings Call API Configuration
     EARNINGS_CALL_API_KEY = os.getenv('EARNINGS_CALL_API_KEY', 'premium_44REQ4tOEr0T7ADdkEogjw')
+    EARNINGS_CALL_BASE_URL = os.getenv('EARNINGS_CALL_BASE_URL', 'https://v2.api.earningscall.biz')
+    EARNINGS_CALL_RATE_LIMIT = float(os.getenv('EARNINGS_CALL_RATE_LIMIT', 2.0))  # Requests per second across all threads
+    EARNINGS_CALL_BURST = int(os.getenv('EARNINGS_CALL_BURST', 4))  # Requests allowed back to back after idling
+    EARNINGS_CALL_MAX_CONCURRENCY = int(os.getenv('EARNINGS_CALL_MAX_CONCURRENCY', 4))  # Requests in flight at once
+    EARNINGS_CALL_RATE_LIMIT_RETRIES = int(os.getenv('EARNINGS_CALL_RATE_LIMIT_RETRIES', 3))  # Retries after a 429
+    EARNINGS_CALL_BATCH_SIZE = int(os.getenv('EARNINGS_CALL_BATCH_SIZE', 10))  # Transcripts per batch request (a ticker's are never split), 1 fetches singly
     
     # OpenAI Configuration (optional)
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
@@ -79,12 +87,55 @@ class Config:
     LOOKBACK_QUARTERS = 4  # Number of quarters to analyze for trends
     CONFIDENCE_THRESHOLD = 0.2  # Threshold for significant changes
     
+    # FinBERT Inference Configuration
+    FINBERT_MAX_BATCH_SIZE = int(os.getenv('FINBERT_MAX_BATCH_SIZE', 32))  # Chunks per forward pass
+    FINBERT_MAX_BATCH_TOKENS = int(os.getenv('FINBERT_MAX_BATCH_TOKENS', 8192))  # Padded tokens per forward pass
+    FINBERT_CHUNK_TOKENS = int(os.getenv('FINBERT_CHUNK_TOKENS', 512))  # Max tokens per chunk, special tokens included
+    FINBERT_CHUNK_OVERLAP = int(os.getenv('FINBERT_CHUNK_OVERLAP', 0))  # Tokens shared by consecutive chunks
+    FINBERT_MODEL = os.getenv('FINBERT_MODEL', 'ProsusAI/finbert')
+    FINBERT_BACKEND = os.getenv('FINBERT_BACKEND', 'torch')  # torch, torch_int8 or onnx
+    FINBERT_ONNX_PATH = os.getenv('FINBERT_ONNX_PATH', os.path.join(db_dir, 'finbert.onnx'))  # Exported on first use
+    FINBERT_LOAD_RETRY_SECONDS = int(os.getenv('FINBERT_LOAD_RETRY_SECONDS', 300))  # Wait before retrying a failed load
+    FINBERT_PRELOAD = os.getenv('FINBERT_PRELOAD', 'false').lower() == 'true'  # Load in a background thread at app startup
+    FINBERT_NUM_THREADS = int(os.getenv('FINBERT_NUM_THREADS', 0))  # 0 lets the runtime decide (or splits cores across workers)
+    SENTIMENT_WORKERS = int(os.getenv('SENTIMENT_WORKERS', 1))  # >1 analyzes in forked worker processes
+    SENTIMENT_TASK_SIZE = int(os.getenv('SENTIMENT_TASK_SIZE', 4))  # Transcripts sent to a worker at a time
+    FINBERT_CACHE_PATH = os.getenv('FINBERT_CACHE_PATH', os.path.join(db_dir, 'finbert_cache.sqlite'))  # Empty disables
+    FINBERT_CACHE_MAX_ENTRIES = int(os.getenv('FINBERT_CACHE_MAX_ENTRIES', 2_000_000))
+    
+    # Upstream API Response Cache
+    API_CACHE_PATH = os.getenv('API_CACHE_PATH', os.path.join(db_dir, 'api_cache.sqlite'))  # Empty disables
+    API_CACHE_MAX_ENTRIES = int(os.getenv('API_CACHE_MAX_ENTRIES', 50_000))
+    API_CACHE_MAX_MB = int(os.getenv('API_CACHE_MAX_MB', 512))  # Total JSON kept, transcripts included
+    API_CACHE_SYMBOLS_TTL = float(os.getenv('API_CACHE_SYMBOLS_TTL', 86400))  # Symbol lists and listings, seconds
+    API_CACHE_EVENTS_TTL = float(os.getenv('API_CACHE_EVENTS_TTL', 3600))  # Recent events and searches, seconds
+    API_CACHE_OFFLINE = os.getenv('API_CACHE_OFFLINE', 'false').lower() == 'true'  # Replay cached responses, never call out
+    
+    # Ingestion Pipeline Configuration
+    INGEST_QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', 8))  # Transcripts waiting between two stages
+    INGEST_CLEAN_WORKERS = int(os.getenv('INGEST_CLEAN_WORKERS', 2))  # Cleaning processes, 0 cleans on a thread
+    INGEST_SCORE_BATCH = int(os.getenv('INGEST_SCORE_BATCH', 8))  # Transcripts per FinBERT pass
+    INGEST_COMMIT_EVERY = int(os.getenv('INGEST_COMMIT_EVERY', 16))  # Transcripts per database commit
+    COMPANY_UPSERT_CHUNK = int(os.getenv('COMPANY_UPSERT_CHUNK', 500))  # Companies per upsert statement
+    WRITE_BATCH_SIZE = int(os.getenv('WRITE_BATCH_SIZE', 200))  # Derived rows (sentiment, trends, alerts) per batch write and commit
+    
+    # Historical Backfill Configuration
+    BACKFILL_WORKERS = int(os.getenv('BACKFILL_WORKERS', 4))  # Threads listing companies' transcripts
+    BACKFILL_MAX_ATTEMPTS = int(os.getenv('BACKFILL_MAX_ATTEMPTS', 3))  # Tries per transcript across runs
+    BACKFILL_PROGRESS_SECONDS = float(os.getenv('BACKFILL_PROGRESS_SECONDS', 30))  # Seconds between progress lines
+    
+    # Incremental Collection Configuration
+    COLLECTION_LOOKBACK_DAYS = int(os.getenv('COLLECTION_LOOKBACK_DAYS', 30))  # Days listed on the first run, before any watermark
+    COLLECTION_OVERLAP_HOURS = float(os.getenv('COLLECTION_OVERLAP_HOURS', 48))  # Relisted before the watermark for late transcripts
+    COLLECTION_RETRY_DAYS = int(os.getenv('COLLECTION_RETRY_DAYS', 7))  # Failed transcripts hold the watermark this long
+    
     # Scheduler Configuration
     WEEKLY_COLLECTION_DAY = 'friday'
     WEEKLY_COLLECTION_TIME = '18:00'  # 6 PM EST
     
     # API Rate Limiting
     API_RATE_LIMIT = '100 per hour'
+    API_USAGE_FLUSH_SECONDS = float(os.getenv('API_USAGE_FLUSH_SECONDS', 60))  # Buffered usage counts written this often
     
     # CORS Configuration
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
@@ -127,6 +178,7 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # In-memory SQLite uses a StaticPool, which takes no pool_size
     WTF_CSRF_ENABLED = False
 
 
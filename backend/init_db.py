@@ -18,7 +18,7 @@ os.environ['CACHE_TYPE'] = 'simple'
 os.environ['REDIS_URL'] = ''
 
 from app import create_app
-from app.models import db, Company, Transcript, SentimentAnalysis, TrendAnalysis, MonthlyReport, Alert, Watchlist
+from app.models import db, Company, CompanyLatest, Transcript, SentimentAnalysis, TrendAnalysis, MonthlyReport, Alert, Watchlist
 
 # Set up logging
 logging.basicConfig(
@@ -223,6 +223,9 @@ def init_database():
         )
         db.session.add(report)
         
+        # Derive the companies' latest state from the sample data
+        CompanyLatest.rebuild()
+        
         # Commit all changes
         db.session.commit()
         
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Move Transcript Bodies to a Compressed Side Table
+Copies transcripts.raw_text and cleaned_text into transcript_bodies, compressed,
+then drops the two columns so listings and joins on transcripts no longer read them.
+
+Safe to re-run: transcripts that already have a body are skipped, and the columns
+are only dropped once every transcript's text has been copied.
+
+Run this migration with:
+    python migrations/move_transcript_bodies.py [--chunk-size 200] [--keep-columns] [--vacuum]
+"""
+import os
+import sys
+import time
+import logging
+from typing import Dict
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.models import db, TranscriptBody
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# transcripts columns the bodies move out of
+BODY_COLUMNS = ('raw_text', 'cleaned_text')
+
+
+def move_bodies(chunk_size: int = 200, drop_columns: bool = True, vacuum: bool = False) -> Dict[str, int]:
+    """Run the migration against the current app's database; returns what it did"""
+    results = {'moved': 0, 'columns_dropped': 0}
+
+    TranscriptBody.__table__.create(db.engine, checkfirst=True)
+    columns = {column['name'] for column in db.inspect(db.engine).get_columns('transcripts')}
+    legacy = [column for column in BODY_COLUMNS if column in columns]
+    if not legacy:
+        logger.info("transcripts has no body columns - nothing to move")
+        return results
+
+    select_columns = ', '.join(f't.{column}' if column in legacy else f'NULL AS {column}' for column in BODY_COLUMNS)
+    last_id = 0
+    start = time.time()
+    while True:
+        rows = db.session.execute(
+            text(
+                f"SELECT t.id, {select_columns} FROM transcripts t "
+                "LEFT JOIN transcript_bodies b ON b.transcript_id = t.id "
+                "WHERE t.id > :last_id AND b.transcript_id IS NULL "
+                "ORDER BY t.id LIMIT :limit"
+            ),
+            {'last_id': last_id, 'limit': max(1, chunk_size)}
+        ).all()
+        if not rows:
+            break
+
+        for transcript_id, raw_text, cleaned_text in rows:
+            body = TranscriptBody(transcript_id=transcript_id)
+            body.raw_text = raw_text
+            body.cleaned_text = cleaned_text
+            db.session.add(body)
+        db.session.commit()
+        # Drop the loaded bodies; their texts are no longer needed
+        db.session.expunge_all()
+
+        results['moved'] += len(rows)
+        last_id = rows[-1][0]
+        logger.info(f"Moved {results['moved']} transcript bodies ({time.time() - start:.1f}s)")
+
+    if not drop_columns:
+        logger.info(f"Keeping transcripts columns {', '.join(legacy)}")
+        return results
+
+    missing = db.session.execute(text(
+        "SELECT COUNT(*) FROM transcripts t "
+        "LEFT JOIN transcript_bodies b ON b.transcript_id = t.id "
+        "WHERE b.transcript_id IS NULL"
+    )).scalar()
+    db.session.commit()
+    if missing:
+        logger.warning(f"{missing} transcripts still have no body - keeping columns {', '.join(legacy)}")
+        return results
+
+    with db.engine.begin() as conn:
+        for column in legacy:
+            logger.info(f"Dropping transcripts.{column}...")
+            conn.execute(text(f'ALTER TABLE transcripts DROP COLUMN {column}'))
+            results['columns_dropped'] += 1
+
+    if vacuum:
+        # Give the freed space back; VACUUM can't run inside a transaction
+        statement = 'VACUUM FULL transcripts' if db.engine.dialect.name == 'postgresql' else 'VACUUM'
+        logger.info(f"Running {statement}...")
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text(statement))
+
+    return results
+
+
+def run_migration():
+    """Run the transcript body migration"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Move transcript texts into the compressed transcript_bodies table')
+    parser.add_argument('--chunk-size', type=int, default=200, help='Transcripts copied per commit (default: 200)')
+    parser.add_argument('--keep-columns', action='store_true', help='Leave raw_text and cleaned_text on transcripts')
+    parser.add_argument('--vacuum', action='store_true', help='Reclaim the freed space afterwards (locks the table)')
+    args = parser.parse_args()
+
+    logger.info("Starting transcript body migration...")
+
+    app = create_app(os.environ.get('FLASK_ENV', 'development'))
+    with app.app_context():
+        try:
+            results = move_bodies(
+                chunk_size=args.chunk_size,
+                drop_columns=not args.keep_columns,
+                vacuum=args.vacuum
+            )
+        except Exception as e:
+            logger.error(f"Migration failed: {str(e)}")
+            db.session.rollback()
+            raise
+
+    logger.info("=" * 50)
+    logger.info("TRANSCRIPT BODY MIGRATION COMPLETE!")
+    logger.info(f"  - {results['moved']} transcript bodies moved")
+    logger.info(f"  - {results['columns_dropped']} transcripts columns dropped")
+    logger.info("=" * 50)
+
+
+if __name__ == '__main__':
+    # Set up logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    run_migration()
@@ -0,0 +1,82 @@
+"""API Response Cache Maintenance Script
+
+Inspect, export, warm or clear the on-disk cache of Earnings Call and FMP
+API responses. Exports are JSON Lines files, so a cache recorded by one
+online run can be shipped to another machine and replayed there with
+API_CACHE_OFFLINE=true.
+"""
+import os
+import sys
+import logging
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.disk_cache import DiskLRUCache
+from config.config import get_config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    config = get_config()
+
+    parser = argparse.ArgumentParser(description='Manage the upstream API response cache')
+    parser.add_argument(
+        'command',
+        choices=['stats', 'export', 'warm', 'clear'],
+        help='stats: show entry count; export/warm: write/read a JSON Lines file; clear: drop all entries'
+    )
+    parser.add_argument(
+        'file',
+        nargs='?',
+        help='JSON Lines file for export/warm'
+    )
+    parser.add_argument(
+        '--cache',
+        default=config.API_CACHE_PATH,
+        help=f'Cache database path (default: {config.API_CACHE_PATH})'
+    )
+
+    args = parser.parse_args()
+
+    if not args.cache:
+        parser.error('API_CACHE_PATH is empty; pass --cache')
+    if args.command in ('export', 'warm') and not args.file:
+        parser.error(f'{args.command} requires a file')
+
+    cache = DiskLRUCache(
+        args.cache,
+        max_entries=config.API_CACHE_MAX_ENTRIES,
+        max_bytes=config.API_CACHE_MAX_MB * 1024 * 1024
+    )
+
+    try:
+        if args.command == 'stats':
+            size = os.path.getsize(args.cache) if os.path.exists(args.cache) else 0
+            logger.info(f"Cache: {args.cache}")
+            logger.info(f"Entries: {len(cache)} / {cache.max_entries}")
+            logger.info(f"Values: {cache.total_bytes() / 1024 / 1024:.1f} / {config.API_CACHE_MAX_MB} MB")
+            logger.info(f"Database size: {size / 1024 / 1024:.1f} MB")
+        elif args.command == 'export':
+            cache.export(args.file)
+        elif args.command == 'warm':
+            cache.warm(args.file)
+        elif args.command == 'clear':
+            cache.clear()
+            logger.info(f"Cleared {args.cache}")
+    finally:
+        cache.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Company List Query Count Check
+
+Seeds an in-memory database with companies, transcripts and trend analyses,
+then requests /api/companies at several page sizes and counts the SQL
+statements each request runs. The count must not grow with the page size,
+and every company's payload must match the per-company to_dict path.
+Exits non-zero if either check fails. tests/test_company_list_queries.py
+runs the same checks under pytest with the seed and counter defined here.
+"""
+import os
+import sys
+import time
+import logging
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from app import create_app
+from app.models import db, Company, CompanyLatest, Transcript, TrendAnalysis
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+# Queries a page may run whatever its size: count, then the page joined to company_latest
+MAX_QUERIES_PER_PAGE = 2
+
+# Transaction control, which the SQLite engine setup emits itself, is not a query
+TRANSACTION_STATEMENTS = {'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE'}
+
+
+@contextmanager
+def counting_statements(engine):
+    """Collect the SQL statements run on engine inside the block, transaction control left out"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.split(None, 1)[0].upper() not in TRANSACTION_STATEMENTS:
+            statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def seed(companies, quarters, trends):
+    """Add companies, each with some transcripts and trend analyses"""
+    for index in range(companies):
+        company = Company(ticker=f'T{index:04d}', name=f'Test Company {index}', sector='Healthcare')
+        db.session.add(company)
+        db.session.flush()
+
+        # Leave every tenth company without history, to cover the empty case
+        if index % 10 == 0:
+            continue
+
+        for quarter in range(quarters):
+            year, fiscal_quarter = 2023 + quarter // 4, quarter % 4 + 1
+            db.session.add(Transcript(
+                company_id=company.id,
+                call_date=datetime(year, fiscal_quarter * 3, 1),
+                fiscal_year=year,
+                fiscal_quarter=fiscal_quarter
+            ))
+        for offset in range(trends):
+            db.session.add(TrendAnalysis(
+                company_id=company.id,
+                analysis_date=date.today() - timedelta(days=offset // 2),  # Same-day pairs exercise the tie-break
+                trend_category=('improving', 'stable', 'declining')[(index + offset) % 3],
+                sentiment_change=0.01 * offset,
+                confidence_change=-0.01 * offset
+            ))
+    CompanyLatest.rebuild()
+    db.session.commit()
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Check /api/companies runs a constant number of queries')
+    parser.add_argument('--companies', type=int, default=250, help='Companies to seed (default: 250)')
+    parser.add_argument('--quarters', type=int, default=6, help='Transcripts per company (default: 6)')
+    parser.add_argument('--trends', type=int, default=4, help='Trend analyses per company (default: 4)')
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    failures = []
+
+    with app.app_context():
+        seed(args.companies, args.quarters, args.trends)
+
+        client = app.test_client()
+        for per_page in (10, 50, 100):
+            start = time.time()
+            with counting_statements(db.engine) as statements:
+                response = client.get(f'/api/companies?per_page={per_page}')
+            elapsed = time.time() - start
+            count = len(statements)
+
+            payload = response.get_json()
+            logger.info(f"per_page={per_page}: {count} queries, {elapsed * 1000:.1f}ms, status {response.status_code}")
+            if response.status_code != 200:
+                failures.append(f"per_page={per_page} returned {response.status_code}")
+                continue
+            if count > MAX_QUERIES_PER_PAGE:
+                failures.append(f"per_page={per_page} ran {count} queries, expected at most {MAX_QUERIES_PER_PAGE}")
+
+            # Same payload as the per-company relationship path
+            db.session.expire_all()
+            for company_data in payload['companies']:
+                expected = Company.query.get(company_data['id']).to_dict(include_latest=True)
+                if company_data != expected:
+                    failures.append(f"{company_data['ticker']} payload differs: {company_data} != {expected}")
+
+    for failure in failures:
+        logger.error(failure)
+    if failures:
+        sys.exit(1)
+    logger.info("Query count is independent of page size and payloads match")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Earnings Call Client Concurrency Benchmark
+
+Starts the fake Earnings Call API locally and fetches the same transcripts
+with one request in flight and then with several, all drawing from one
+token bucket. Reports wall-clock, throughput, how many requests the server
+rejected with 429, and the peak number of concurrent requests. An
+over-limit run sets the client's rate above the server's to exercise the
+global 429 backoff. The batched runs group transcripts into batch-transcripts
+requests, once with complete batches and once with the server leaving some
+out so the client falls back to single fetches; compare their request counts
+with the one-request-per-transcript runs.
+"""
+import os
+import sys
+import time
+import logging
+from datetime import datetime
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import get_config
+from app.services.earnings_call_client import EarningsCallClient
+from app.services.rate_limiter import TokenBucket
+from fake_earnings_server import start_server, ServerStats
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def run(server, keys, concurrency, rate, burst, batch_size=1, batch_missing=0.0):
+    """Fetch every key; returns (seconds, transcripts fetched, server stats)"""
+    server.stats = ServerStats(server.stats.rate, server.stats.burst, server.stats.retry_after)
+    server.batch_missing = batch_missing
+
+    config = get_config()
+    config.EARNINGS_CALL_BASE_URL = f'http://127.0.0.1:{server.server_port}'
+    config.EARNINGS_CALL_MAX_CONCURRENCY = concurrency
+    config.EARNINGS_CALL_BATCH_SIZE = batch_size
+
+    client = EarningsCallClient(config=config)
+    client.rate_limiter = TokenBucket(rate, burst)  # Fresh bucket per run
+
+    start = time.time()
+    fetched = sum(1 for _, transcript in client.get_transcripts(keys) if transcript)
+    return time.time() - start, fetched, server.stats.to_dict()
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark concurrent Earnings Call fetching against a fake API')
+    parser.add_argument('--transcripts', type=int, default=40, help='Transcripts to fetch per run (default: 40)')
+    parser.add_argument('--rate', type=float, default=5.0, help='Requests per second allowed by the server (default: 5)')
+    parser.add_argument('--burst', type=int, default=5, help='Server and client burst size (default: 5)')
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds per response (default: 0.5)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Requests in flight for the concurrent run (default: 4)')
+    parser.add_argument('--batch-size', type=int, default=10, help='Transcripts per batch request in the batched runs (default: 10)')
+    parser.add_argument('--batch-missing', type=float, default=0.2, help='Share left out of batches in the partial run (default: 0.2)')
+
+    args = parser.parse_args()
+
+    server = start_server(rate=args.rate, burst=args.burst, retry_after=1.0, latency=args.latency, words=500)
+    # Every quarter of last year for each ticker, so batches cover several per ticker
+    year = datetime.now().year - 1
+    keys = [(f'BIO{i // 4:03d}', year, i % 4 + 1) for i in range(args.transcripts)]
+
+    runs = [
+        ('sequential', 1, args.rate, 1, 0.0),
+        ('concurrent', args.concurrency, args.rate, 1, 0.0),
+        ('over-limit', args.concurrency, args.rate * 2, 1, 0.0),
+        ('batched', args.concurrency, args.rate, args.batch_size, 0.0),
+        ('partial', args.concurrency, args.rate, args.batch_size, args.batch_missing)
+    ]
+
+    logger.info(f"{'run':<11} {'in flight':>9} {'client r/s':>10} {'seconds':>8} {'fetched':>8} "
+                f"{'req/s':>6} {'429s':>5} {'peak':>5} {'requests':>8}")
+    failed = False
+    for name, concurrency, rate, batch_size, batch_missing in runs:
+        elapsed, fetched, stats = run(server, keys, concurrency, rate, args.burst, batch_size, batch_missing)
+        logger.info(
+            f"{name:<11} {concurrency:>9} {rate:>10g} {elapsed:>8.1f} {fetched:>8} "
+            f"{fetched / elapsed:>6.2f} {stats['rejected']:>5} {stats['max_in_flight']:>5} {stats['accepted']:>8}"
+        )
+        failed = failed or fetched != len(keys)
+
+    server.shutdown()
+    if failed:
+        logger.error("Some transcripts were not fetched")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""FinBERT Backend Benchmark Script
+
+Scores a fixture corpus with each inference backend (fp32 PyTorch, dynamic
+int8 PyTorch, ONNX Runtime), checks label parity against fp32, and reports
+chunks/sec and resident memory. Each backend runs in its own process so
+memory figures are not polluted by the others.
+"""
+import os
+import sys
+import time
+import logging
+import multiprocessing
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import get_config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'finbert_corpus.txt')
+
+
+def load_corpus(path):
+    """Read one text per non-empty line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def run_backend(backend_name, texts, repeat, onnx_path, num_threads):
+    """Load a backend, score the corpus and return labels, timings and memory"""
+    import psutil
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    from app.services.inference_backends import load_backend
+    from app.services.inference_engine import BatchInferenceEngine
+
+    config = get_config()
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    start = time.time()
+    tokenizer = AutoTokenizer.from_pretrained(config.FINBERT_MODEL)
+    model = AutoModelForSequenceClassification.from_pretrained(config.FINBERT_MODEL)
+    backend = load_backend(backend_name, model, onnx_path=onnx_path, num_threads=num_threads)
+    del model
+    load_seconds = time.time() - start
+
+    engine = BatchInferenceEngine(
+        tokenizer,
+        backend,
+        max_batch_size=config.FINBERT_MAX_BATCH_SIZE,
+        max_batch_tokens=config.FINBERT_MAX_BATCH_TOKENS
+    )
+    sequences = engine.encode(texts)
+
+    # Warm up kernels and allocator before timing
+    engine.score_encoded(sequences[:config.FINBERT_MAX_BATCH_SIZE])
+
+    start = time.time()
+    for _ in range(repeat):
+        scores = engine.score_encoded(sequences)
+    elapsed = time.time() - start
+
+    return {
+        'backend': backend.name,
+        'labels': [chunk_score.label if chunk_score else None for chunk_score in scores],
+        'scores': [chunk_score.score if chunk_score else None for chunk_score in scores],
+        'load_seconds': load_seconds,
+        'chunks_per_second': len(sequences) * repeat / elapsed if elapsed > 0 else 0.0,
+        'rss_mb': process.memory_info().rss / 1024 / 1024,
+        'rss_delta_mb': (process.memory_info().rss - rss_before) / 1024 / 1024
+    }
+
+
+def compare(reference, result):
+    """Label agreement and worst score drift against the fp32 reference"""
+    pairs = list(zip(reference['labels'], result['labels']))
+    agreement = sum(1 for ref, got in pairs if ref == got) / len(pairs) if pairs else 0.0
+    drift = [
+        abs(ref_score - score)
+        for ref_label, label, ref_score, score in zip(
+            reference['labels'], result['labels'], reference['scores'], result['scores']
+        )
+        if ref_label == label and score is not None and ref_score is not None
+    ]
+    mismatches = [i for i, (ref, got) in enumerate(pairs) if ref != got]
+    return agreement, max(drift) if drift else 0.0, mismatches
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    config = get_config()
+
+    parser = argparse.ArgumentParser(description='Benchmark FinBERT inference backends')
+    parser.add_argument(
+        '--backends',
+        default='torch,torch_int8,onnx',
+        help='Comma-separated backends to compare (default: torch,torch_int8,onnx)'
+    )
+    parser.add_argument(
+        '--corpus',
+        default=DEFAULT_CORPUS,
+        help='Text file with one chunk per line (default: scripts/fixtures/finbert_corpus.txt)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help='Timed passes over the corpus per backend (default: 5)'
+    )
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=config.FINBERT_NUM_THREADS,
+        help='Intra-op threads per backend, 0 for the runtime default'
+    )
+    parser.add_argument(
+        '--min-agreement',
+        type=float,
+        default=0.95,
+        help='Minimum label agreement with fp32 before the check fails (default: 0.95)'
+    )
+
+    args = parser.parse_args()
+
+    texts = load_corpus(args.corpus)
+    backends = [name.strip() for name in args.backends.split(',') if name.strip()]
+    if 'torch' in backends:
+        backends.remove('torch')
+    backends.insert(0, 'torch')  # fp32 is the parity reference
+
+    logger.info(f"Scoring {len(texts)} chunks x {args.repeat} passes with: {', '.join(backends)}")
+
+    # A fresh process per backend keeps resident memory comparable
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for name in backends:
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(
+                run_backend, (name, texts, args.repeat, config.FINBERT_ONNX_PATH, args.threads)
+            )
+        if results[name]['backend'] != name:
+            logger.warning(f"Backend {name} was unavailable and fell back to {results[name]['backend']}")
+
+    reference = results['torch']
+    failed = False
+
+    logger.info("=" * 78)
+    logger.info(f"{'backend':<12} {'load s':>8} {'chunks/s':>10} {'speedup':>8} {'RSS MB':>9} "
+                f"{'agree':>7} {'max drift':>10}")
+    for name, result in results.items():
+        agreement, drift, mismatches = compare(reference, result)
+        speedup = result['chunks_per_second'] / reference['chunks_per_second'] if reference['chunks_per_second'] else 0.0
+        logger.info(
+            f"{name:<12} {result['load_seconds']:>8.2f} {result['chunks_per_second']:>10.1f} "
+            f"{speedup:>7.2f}x {result['rss_mb']:>9.0f} {agreement:>7.1%} {drift:>10.4f}"
+        )
+        for index in mismatches:
+            logger.info(f"    label mismatch ({reference['labels'][index]} -> {result['labels'][index]}): "
+                        f"{texts[index][:80]}")
+        if agreement < args.min_agreement:
+            failed = True
+            logger.error(f"{name} agrees with fp32 on only {agreement:.1%} of labels")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
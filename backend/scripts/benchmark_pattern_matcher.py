@@ -0,0 +1,141 @@
+"""Transcript Pattern Matching Benchmark
+
+Builds a synthetic transcript from the FinBERT fixture corpus and times the
+TranscriptProcessor pattern sets scanned one regex at a time with finditer
+against the shared-index PatternMatcher, checking both give identical matches.
+"""
+import os
+import sys
+import time
+import random
+import logging
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pattern_matcher import TextIndex
+from app.services.transcript_processor import TranscriptProcessor
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'finbert_corpus.txt')
+
+
+def build_text(words, corpus_path):
+    """Synthetic transcript of roughly the given word count from fixture sentences"""
+    with open(corpus_path, 'r', encoding='utf-8') as f:
+        sentences = [line.strip() for line in f if line.strip()]
+
+    rng = random.Random(42)
+    parts = []
+    count = 0
+    while count < words:
+        sentence = rng.choice(sentences)
+        parts.append(sentence)
+        count += len(sentence.split())
+    return ' '.join(parts)
+
+
+def matcher_inputs(processor, text):
+    """(label, matcher, subject text) for every pattern set the processor scans"""
+    text_lower = text.lower()
+    return [
+        ('confidence', processor._confidence_matcher, text_lower),
+        ('products', processor._product_matcher, text),
+        ('guidance', processor._guidance_matcher, text),
+        ('metrics', processor._metric_matcher, text),
+        ('dollars', processor._dollar_matcher, text)
+    ]
+
+
+def scan_separately(matcher, subject):
+    """One finditer pass per pattern"""
+    return {name: list(pattern.finditer(subject)) for name, pattern in matcher.patterns.items()}
+
+
+def signature(found):
+    """Comparable form of a scan result"""
+    return {name: [(match.span(), match.groups()) for match in matches] for name, matches in found.items()}
+
+
+def best_of(repeats, fn):
+    """Fastest of several timed runs, in milliseconds"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark transcript pattern matching')
+    parser.add_argument(
+        '--words',
+        type=int,
+        default=15000,
+        help='Approximate words in the synthetic transcript (default: 15000)'
+    )
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=5,
+        help='Timed runs per measurement, fastest is reported (default: 5)'
+    )
+    parser.add_argument(
+        '--corpus',
+        default=DEFAULT_CORPUS,
+        help='Sentence-per-line corpus to build the transcript from'
+    )
+
+    args = parser.parse_args()
+
+    text = build_text(args.words, args.corpus)
+    processor = TranscriptProcessor()
+    logger.info(f"Transcript: {len(text.split())} words, {len(text)} characters")
+
+    mismatches = 0
+    total_separate = 0.0
+    total_shared = 0.0
+    logger.info(f"{'patterns':>12} {'finditer ms':>12} {'matcher ms':>11} {'speedup':>8} {'matches':>8}")
+    for label, matcher, subject in matcher_inputs(processor, text):
+        expected = signature(scan_separately(matcher, subject))
+        actual = signature(matcher.scan(subject))
+        if actual != expected:
+            mismatches += 1
+            logger.error(f"{label}: matcher results differ from finditer")
+
+        separate_ms = best_of(args.repeats, lambda: scan_separately(matcher, subject))
+        shared_ms = best_of(args.repeats, lambda: matcher.scan(subject, TextIndex(subject)))
+        total_separate += separate_ms
+        total_shared += shared_ms
+        count = sum(len(matches) for matches in expected.values())
+        logger.info(f"{label:>12} {separate_ms:>12.2f} {shared_ms:>11.2f} {separate_ms / shared_ms:>7.2f}x {count:>8}")
+
+    logger.info(f"{'total':>12} {total_separate:>12.2f} {total_shared:>11.2f} {total_separate / total_shared:>7.2f}x")
+
+    # End to end, the processor's extract methods now run on the matcher
+    extract_ms = best_of(args.repeats, lambda: (
+        processor.extract_confidence_indicators(text),
+        processor.extract_product_mentions(text),
+        processor.locate_guidance(text),
+        processor.extract_key_metrics(text)
+    ))
+    logger.info(f"All extract methods: {extract_ms:.2f} ms per transcript")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Regex Worst-case Scaling Benchmark
+
+Scans adversarial texts of doubling size with every pattern in the shared
+registry and checks that scan time grows linearly. The texts are dense with
+the keywords the patterns start from but lack the amounts, percentages and
+sentence ends that would complete a match, which is the input that makes an
+unbounded ``.*?`` gap rescan the rest of the text from every keyword.
+"""
+import os
+import sys
+import math
+import time
+import logging
+import itertools
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.patterns import all_patterns
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+# Words that open or continue a match in at least one pattern
+KEYWORDS = [
+    'we expect', 'anticipate', 'revenue', 'earnings', 'guidance', 'outlook', 'full-year',
+    'annual', 'FY 2025', 'our guidance', 'increased', 'grew', 'clinical trial', 'results',
+    'Phase II', 'study', 'fda', 'approval', 'submission', 'pipeline', 'progress', 'up',
+    'growth', 'decline', 'patient enrollment', 'quarter', 'month', 'regulatory', 'filing',
+    'CEO:', 'Chief Financial Officer', 'our', '(', 'sales', 'target', 'project'
+]
+
+ADVERSARIAL_TEXTS = {
+    # Keywords only: no numbers, currency, percentages or sentence ends
+    'keywords': lambda: itertools.cycle(KEYWORDS),
+    # Long runs without sentence ends, interleaved with bare numbers
+    'numbers': lambda: itertools.cycle(KEYWORDS[:12] + ['1', '42', '2025', 'million']),
+    # One opening keyword followed by filler, the classic quadratic case
+    'filler': lambda: itertools.chain(['revenue expect CEO ('], itertools.cycle(['lorem', 'ipsum']))
+}
+
+
+def build_text(kind, size):
+    """Adversarial text of at least size characters"""
+    parts = []
+    length = 0
+    for word in ADVERSARIAL_TEXTS[kind]():
+        parts.append(word)
+        length += len(word) + 1
+        if length >= size:
+            break
+    return ' '.join(parts)
+
+
+def scan_ms(pattern, text, repeats):
+    """Fastest full finditer scan, in milliseconds"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in pattern.finditer(text):
+            pass
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Check registered regex patterns scale linearly')
+    parser.add_argument(
+        '--min-chars',
+        type=int,
+        default=25000,
+        help='Smallest adversarial text size (default: 25000)'
+    )
+    parser.add_argument(
+        '--doublings',
+        type=int,
+        default=3,
+        help='Number of times the text size is doubled (default: 3)'
+    )
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=3,
+        help='Timed runs per measurement, fastest is reported (default: 3)'
+    )
+    parser.add_argument(
+        '--max-exponent',
+        type=float,
+        default=1.3,
+        help='Largest acceptable growth exponent of time in text size (default: 1.3)'
+    )
+    parser.add_argument(
+        '--min-ms',
+        type=float,
+        default=2.0,
+        help='Ignore patterns whose slowest scan is faster than this (default: 2.0)'
+    )
+
+    args = parser.parse_args()
+
+    sizes = [args.min_chars * 2 ** i for i in range(args.doublings + 1)]
+    patterns = all_patterns()
+    failures = []
+
+    logger.info(f"{len(patterns)} patterns, text sizes {sizes}")
+    logger.info(f"{'pattern':<28} {'input':<9} {'ms at ' + str(sizes[-1]):>14} {'exponent':>9}")
+    for kind in ADVERSARIAL_TEXTS:
+        texts = [build_text(kind, size) for size in sizes]
+        for name, pattern in patterns.items():
+            times = [scan_ms(pattern, text, args.repeats) for text in texts]
+
+            # Slope of log(time) against log(size): 1 is linear, 2 quadratic
+            if times[0] > 0:
+                exponent = math.log(times[-1] / times[0]) / math.log(sizes[-1] / sizes[0])
+            else:
+                exponent = 0.0
+
+            if times[-1] < args.min_ms:
+                continue
+            logger.info(f"{name:<28} {kind:<9} {times[-1]:>14.2f} {exponent:>9.2f}")
+            if exponent > args.max_exponent:
+                failures.append((name, kind, exponent))
+
+    if failures:
+        for name, kind, exponent in failures:
+            logger.error(f"{name} grows superlinearly on {kind} input (exponent {exponent:.2f})")
+        sys.exit(1)
+
+    logger.info("All patterns scale linearly")
+
+
+if __name__ == '__main__':
+    main()
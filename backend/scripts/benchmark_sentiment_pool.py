@@ -0,0 +1,133 @@
+"""Sentiment Worker Pool Scaling Benchmark
+
+Builds synthetic transcripts from the FinBERT fixture corpus and analyzes
+them with 1, 2, 4, ... worker processes, reporting transcripts/sec and the
+speedup over a single process.
+"""
+import os
+import sys
+import time
+import random
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import get_config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'finbert_corpus.txt')
+
+
+def build_transcripts(count, sentences_per_transcript, corpus_path):
+    """Synthetic processed transcripts assembled from fixture sentences"""
+    from app.services.transcript_processor import TranscriptProcessor, ProcessedTranscript
+
+    with open(corpus_path, 'r', encoding='utf-8') as f:
+        sentences = [line.strip() for line in f if line.strip()]
+
+    processor = TranscriptProcessor()
+    rng = random.Random(42)
+    transcripts = []
+    for i in range(count):
+        # Fixture sentences are already clean text
+        text = ' '.join(rng.choice(sentences) for _ in range(sentences_per_transcript))
+        section_spans = processor.locate_sections(text)
+        guidance_spans = processor.locate_guidance(text)
+        transcripts.append(ProcessedTranscript(
+            date=datetime(2025, 5, 1),
+            symbol=f'T{i:03d}',
+            year=2025,
+            quarter=1,
+            cleaned_text=text,
+            sections={name: ' '.join(text[a:b] for a, b in spans) for name, spans in section_spans.items()},
+            word_count=len(text.split()),
+            confidence_indicators=processor.extract_confidence_indicators(text),
+            product_mentions=processor.extract_product_mentions(text),
+            guidance_statements=[text[a:b] for a, b in guidance_spans],
+            key_metrics=processor.extract_key_metrics(text),
+            section_spans=section_spans,
+            guidance_spans=guidance_spans
+        ))
+    return transcripts
+
+
+def run(workers, transcripts):
+    """Analyze all transcripts with the given worker count in a fresh process"""
+    from app.services.sentiment_analyzer import SentimentAnalyzer
+
+    config = get_config()
+    config.SENTIMENT_WORKERS = workers
+    config.FINBERT_CACHE_PATH = ''  # Measure the model, not the cache
+
+    analyzer = SentimentAnalyzer(config)
+    start = time.time()
+    completed = sum(1 for _, analysis in analyzer.analyze_transcripts(transcripts) if analysis)
+    elapsed = time.time() - start
+    analyzer.close()
+
+    return completed, elapsed
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark sentiment worker pool scaling')
+    parser.add_argument(
+        '--transcripts',
+        type=int,
+        default=32,
+        help='Number of synthetic transcripts (default: 32)'
+    )
+    parser.add_argument(
+        '--sentences',
+        type=int,
+        default=400,
+        help='Sentences per synthetic transcript (default: 400)'
+    )
+    parser.add_argument(
+        '--max-workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Largest worker count to try (default: CPU count)'
+    )
+
+    args = parser.parse_args()
+
+    transcripts = build_transcripts(args.transcripts, args.sentences, DEFAULT_CORPUS)
+
+    counts = []
+    workers = 1
+    while workers <= args.max_workers:
+        counts.append(workers)
+        workers *= 2
+    if counts[-1] != args.max_workers:
+        counts.append(args.max_workers)
+
+    # Each configuration runs in its own (non-daemonic, so it may fork workers)
+    # process so no pool or model state carries over
+    context = multiprocessing.get_context('spawn')
+    baseline = None
+    logger.info(f"{'workers':>8} {'seconds':>9} {'transcripts/s':>14} {'speedup':>8} {'efficiency':>11}")
+    for workers in counts:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            completed, elapsed = executor.submit(run, workers, transcripts).result()
+        rate = completed / elapsed if elapsed > 0 else 0.0
+        baseline = baseline or rate
+        speedup = rate / baseline if baseline else 0.0
+        logger.info(f"{workers:>8} {elapsed:>9.1f} {rate:>14.2f} {speedup:>7.2f}x {speedup / workers:>10.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""Transcript Storage Benchmark
+
+Builds a scratch SQLite database in the old layout, with raw_text and
+cleaned_text on the transcripts table, and measures the table's size and
+the latency of listing queries. It then runs the move_transcript_bodies
+migration and measures again.
+
+The listing queries select every transcripts column, as Transcript.query
+does. So before the migration they read the bodies, and after it they
+don't. Body reads are timed too: plain column reads before, and lazy
+loads through Transcript.cleaned_text (decompression included) after.
+Exits non-zero if any migrated body differs from the original.
+"""
+import os
+import sys
+import time
+import random
+import logging
+import tempfile
+import statistics
+from datetime import datetime
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the app at a scratch database before its config is read
+SCRATCH_DIR = tempfile.mkdtemp(prefix='transcript_storage_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(SCRATCH_DIR, 'benchmark.db')}"
+
+from sqlalchemy import bindparam, text
+
+from app import create_app
+from app.models import db, Company, Transcript
+from app.models.transcript_body import CODEC
+from migrations.move_transcript_bodies import move_bodies
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+VOCABULARY = (
+    'revenue growth quarter guidance pipeline trial patients phase data approval fda launch '
+    'margin expenses cash runway enrollment readout partnership milestone commercial sales '
+    'we expect to continue strong momentum year over year million billion percent across our '
+    'portfolio and the team remains confident in execution with results ahead of plan'
+).split()
+
+LISTING_QUERIES = {
+    'page_of_50': ("SELECT * FROM transcripts ORDER BY call_date DESC LIMIT 50", None),
+    'company_history': (
+        "SELECT * FROM transcripts WHERE company_id = :company_id "
+        "ORDER BY fiscal_year DESC, fiscal_quarter DESC LIMIT 8",
+        'company_ids'
+    ),
+    'full_scan': ("SELECT * FROM transcripts", None),
+}
+
+
+def make_transcript(rng: random.Random, words: int) -> str:
+    """Synthetic call transcript: speaker turns of random sentences"""
+    turns = []
+    while words > 0:
+        sentences = []
+        for _ in range(rng.randint(3, 8)):
+            length = rng.randint(8, 24)
+            words -= length
+            sentence = ' '.join(rng.choice(VOCABULARY) for _ in range(length))
+            sentences.append(sentence.capitalize() + f' {rng.randint(1, 999)}.')
+        turns.append(f"{rng.choice(('Operator', 'CEO', 'CFO', 'Analyst'))}:  " + '  '.join(sentences))
+    return '\n\n'.join(turns)
+
+
+def seed_legacy(companies: int, quarters: int, words: int) -> int:
+    """Add companies and transcripts with their texts on the transcripts table"""
+    with db.engine.begin() as conn:
+        for column in ('raw_text', 'cleaned_text'):
+            conn.execute(text(f'ALTER TABLE transcripts ADD COLUMN {column} TEXT'))
+
+    rng = random.Random(0)
+    rows = []
+    for index in range(companies):
+        company = Company(ticker=f'T{index:04d}', name=f'Test Company {index}', sector='Healthcare')
+        db.session.add(company)
+        db.session.flush()
+        for quarter in range(quarters):
+            year, fiscal_quarter = 2023 + quarter // 4, quarter % 4 + 1
+            raw_text = make_transcript(rng, words)
+            cleaned_text = ' '.join(raw_text.split())
+            rows.append({
+                'company_id': company.id,
+                'call_date': datetime(year, fiscal_quarter * 3, 1),
+                'fiscal_year': year,
+                'fiscal_quarter': fiscal_quarter,
+                'raw_text': raw_text,
+                'cleaned_text': cleaned_text,
+                'word_count': len(cleaned_text.split()),
+                'fmp_fetch_date': datetime.utcnow(),
+                'created_at': datetime.utcnow()
+            })
+    db.session.execute(
+        text(
+            "INSERT INTO transcripts (company_id, call_date, fiscal_year, fiscal_quarter, raw_text, cleaned_text, "
+            "word_count, fmp_fetch_date, created_at) VALUES (:company_id, :call_date, :fiscal_year, :fiscal_quarter, "
+            ":raw_text, :cleaned_text, :word_count, :fmp_fetch_date, :created_at)"
+        ),
+        rows
+    )
+    db.session.commit()
+    return len(rows)
+
+
+def table_sizes() -> dict:
+    """Bytes used by the transcript tables and by the whole database file"""
+    sizes = {}
+    try:
+        for name, size in db.session.execute(text(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN ('transcripts', 'transcript_bodies') GROUP BY name"
+        )):
+            sizes[name] = size
+    except Exception:
+        logger.info("SQLite was built without dbstat; reporting the database size only")
+        db.session.rollback()
+    page_size = db.session.execute(text('PRAGMA page_size')).scalar()
+    page_count = db.session.execute(text('PRAGMA page_count')).scalar()
+    sizes['database'] = page_size * page_count
+    return sizes
+
+
+def time_listings(company_ids, repeat: int) -> dict:
+    """Median seconds for each listing query"""
+    timings = {}
+    for name, (sql, over) in LISTING_QUERIES.items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for params in ([{'company_id': company_id} for company_id in company_ids] if over else [{}]):
+                db.session.execute(text(sql), params).all()
+            samples.append(time.perf_counter() - start)
+        timings[name] = statistics.median(samples)
+    return timings
+
+
+def time_body_reads(transcript_ids, legacy: bool, repeat: int) -> float:
+    """Median seconds to read the cleaned text of every given transcript"""
+    samples = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        for transcript_id in transcript_ids:
+            if legacy:
+                db.session.execute(text('SELECT cleaned_text FROM transcripts WHERE id = :id'), {'id': transcript_id}).scalar()
+            else:
+                db.session.get(Transcript, transcript_id).cleaned_text
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def report(label: str, sizes: dict, listings: dict, body_reads: float, body_count: int):
+    """Log one set of measurements"""
+    logger.info(f"{label}:")
+    for name, size in sizes.items():
+        logger.info(f"  {name:<20} {size / 1024 / 1024:10.2f} MB")
+    for name, seconds in listings.items():
+        logger.info(f"  {name:<20} {seconds * 1000:10.2f} ms")
+    logger.info(f"  {'body_reads':<20} {body_reads * 1000:10.2f} ms for {body_count} transcripts")
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure transcripts table size and listing latency around the body migration')
+    parser.add_argument('--companies', type=int, default=50, help='Companies to seed (default: 50)')
+    parser.add_argument('--quarters', type=int, default=8, help='Transcripts per company (default: 8)')
+    parser.add_argument('--words', type=int, default=9000, help='Words per transcript (default: 9000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query, the median is reported (default: 5)')
+    parser.add_argument('--body-reads', type=int, default=50, help='Transcripts whose text is read (default: 50)')
+    args = parser.parse_args()
+
+    app = create_app('development')
+    with app.app_context():
+        count = seed_legacy(args.companies, args.quarters, args.words)
+        logger.info(f"Seeded {count} transcripts in {SCRATCH_DIR}")
+
+        company_ids = [company_id for company_id, in db.session.query(Company.id)]
+        transcript_ids = [transcript_id for transcript_id, in db.session.execute(
+            text('SELECT id FROM transcripts ORDER BY id LIMIT :limit'), {'limit': args.body_reads}
+        )]
+        originals = dict(db.session.execute(
+            text('SELECT id, cleaned_text FROM transcripts WHERE id IN :ids').bindparams(bindparam('ids', expanding=True)),
+            {'ids': transcript_ids}
+        ).all())
+
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text('VACUUM'))
+        before = (
+            table_sizes(),
+            time_listings(company_ids, args.repeat),
+            time_body_reads(transcript_ids, legacy=True, repeat=args.repeat)
+        )
+
+        start = time.time()
+        results = move_bodies(vacuum=True)
+        logger.info(f"Migration moved {results['moved']} bodies ({CODEC}) in {time.time() - start:.1f}s")
+
+        after = (
+            table_sizes(),
+            time_listings(company_ids, args.repeat),
+            time_body_reads(transcript_ids, legacy=False, repeat=args.repeat)
+        )
+
+        db.session.expunge_all()
+        mismatched = [
+            transcript_id for transcript_id in transcript_ids
+            if db.session.get(Transcript, transcript_id).cleaned_text != originals[transcript_id]
+        ]
+
+    report('Before (texts on transcripts)', *before, len(transcript_ids))
+    report(f'After (texts in transcript_bodies, {CODEC})', *after, len(transcript_ids))
+    for name in LISTING_QUERIES:
+        logger.info(f"{name}: {before[1][name] / max(after[1][name], 1e-9):.1f}x faster")
+    if 'transcripts' in before[0] and 'transcripts' in after[0]:
+        logger.info(f"transcripts table: {before[0]['transcripts'] / max(after[0]['transcripts'], 1):.1f}x smaller")
+
+    if mismatched:
+        logger.error(f"{len(mismatched)} transcript bodies differ after the migration: {mismatched[:10]}")
+        sys.exit(1)
+    logger.info("All sampled transcript bodies match")
+
+
+if __name__ == '__main__':
+    main()
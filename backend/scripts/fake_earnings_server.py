@@ -0,0 +1,244 @@
+"""Fake Earnings Call API Server
+
+Serves synthetic responses for the Earnings Call API endpoints the client
+uses, with configurable latency and a server-side rate limit that answers
+429 with Retry-After, so EarningsCallClient concurrency and backoff can be
+exercised locally. Point the client at it with
+EARNINGS_CALL_BASE_URL=http://127.0.0.1:<port>.
+"""
+import json
+import hashlib
+import time
+import random
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+TICKERS = [f'BIO{i:03d}' for i in range(300)]
+
+
+class ServerStats:
+    """Request counters and the server-side rate limit"""
+
+    def __init__(self, rate: float, burst: int, retry_after: float):
+        self.rate = rate
+        self.burst = burst
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.accepted = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.not_modified = 0
+
+    def admit(self) -> bool:
+        """Whether a request fits the rate limit right now"""
+        with self.lock:
+            if self.rate <= 0:
+                self.accepted += 1
+                return True
+
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.accepted += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def enter(self):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def count_not_modified(self):
+        with self.lock:
+            self.not_modified += 1
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'max_in_flight': self.max_in_flight,
+                'not_modified': self.not_modified
+            }
+
+
+def transcript_text(ticker, year, quarter, words):
+    """Deterministic filler transcript"""
+    rng = random.Random(f'{ticker}-{year}-{quarter}')
+    vocabulary = ['revenue', 'growth', 'pipeline', 'trial', 'patients', 'guidance', 'quarter',
+                  'strong', 'momentum', 'data', 'approval', 'expect', 'margin', 'launch']
+    return ' '.join(rng.choice(vocabulary) for _ in range(words)) + '.'
+
+
+class FakeEarningsHandler(BaseHTTPRequestHandler):
+    """Request handler; the server instance carries stats and settings"""
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        stats = self.server.stats
+        stats.enter()
+        try:
+            if not stats.admit():
+                self._send(429, {'error': 'Too Many Requests'}, {'Retry-After': f'{stats.retry_after:g}'})
+                return
+
+            time.sleep(self.server.latency)
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+            payload = self._route(url.path.strip('/'), params, body)
+
+            # Answer conditional requests for unchanged payloads with 304
+            etag = '"%s"' % hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+            if self.headers.get('If-None-Match') == etag:
+                stats.count_not_modified()
+                self._send(304, None, {'ETag': etag})
+                return
+            self._send(200, payload, {'ETag': etag})
+        finally:
+            stats.leave()
+
+    def _route(self, path, params, body):
+        today = datetime.now().date()
+
+        if path == 'transcript':
+            ticker = params.get('symbol', 'UNKNOWN')
+            year = int(params.get('year', today.year))
+            quarter = int(params.get('quarter', 1))
+            return {
+                'date': datetime(year, quarter * 3, 15).isoformat(),
+                'transcript': transcript_text(ticker, year, quarter, self.server.words),
+                'participants': [],
+                'qa_session': []
+            }
+
+        if path == 'batch-transcripts':
+            start = datetime.fromisoformat(body['start_date']).date() if body.get('start_date') else date.min
+            results = []
+            for ticker in body.get('tickers') or []:
+                for year in (today.year - 1, today.year):
+                    for quarter in (1, 2, 3, 4):
+                        call_date = datetime(year, quarter * 3, 15).date()
+                        if not start <= call_date < today:
+                            continue
+                        # Leave out a share of transcripts to exercise the client's fallback
+                        if random.Random(f'{ticker}-{year}-{quarter}').random() < self.server.batch_missing:
+                            continue
+                        results.append({
+                            'symbol': ticker, 'year': year, 'quarter': quarter,
+                            'date': datetime(year, quarter * 3, 15).isoformat(),
+                            'transcript': transcript_text(ticker, year, quarter, self.server.words)
+                        })
+            return results
+
+        if path.startswith('transcripts/'):
+            ticker = path.split('/', 1)[1]
+            return [
+                {'symbol': ticker, 'year': year, 'quarter': quarter,
+                 'date': datetime(year, quarter * 3, 15).isoformat()}
+                for year in (today.year - 1, today.year)
+                for quarter in (1, 2, 3, 4)
+                if datetime(year, quarter * 3, 15).date() < today
+            ]
+
+        if path == 'events':
+            return [
+                {'symbol': ticker, 'year': today.year, 'quarter': 1, 'hasTranscript': True,
+                 'date': (today - timedelta(days=i % 30)).isoformat(), 'exchange': 'nasdaq'}
+                for i, ticker in enumerate(TICKERS)
+            ]
+
+        if path == 'symbols':
+            return [
+                {'symbol': ticker, 'name': f'{ticker} Therapeutics', 'industry': 'Biotechnology',
+                 'sector': 'Healthcare', 'marketCap': 100_000_000 + i * 1_000_000}
+                for i, ticker in enumerate(TICKERS)
+            ]
+
+        return {'error': f'Unknown endpoint: {path}'}
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(port=0, rate=2.0, burst=4, retry_after=1.0, latency=0.2, words=2000, batch_missing=0.0):
+    """Start the fake server in a background thread; returns the server"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeEarningsHandler)
+    server.daemon_threads = True
+    server.stats = ServerStats(rate, burst, retry_after)
+    server.latency = latency
+    server.words = words
+    server.batch_missing = batch_missing
+
+    thread = threading.Thread(target=server.serve_forever, name='fake-earnings-server', daemon=True)
+    thread.start()
+    logger.info(
+        f"Fake Earnings Call API on http://127.0.0.1:{server.server_port} "
+        f"({rate:g} req/s, burst {burst}, {latency * 1000:.0f} ms latency)"
+    )
+    return server
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run a local fake Earnings Call API')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--rate', type=float, default=2.0, help='Allowed requests per second, 0 for unlimited (default: 2)')
+    parser.add_argument('--burst', type=int, default=4, help='Requests allowed back to back (default: 4)')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds sent with 429 (default: 1)')
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds each response takes (default: 0.2)')
+    parser.add_argument('--words', type=int, default=2000, help='Words per transcript (default: 2000)')
+    parser.add_argument('--batch-missing', type=float, default=0.0, help='Share of transcripts left out of batch responses (default: 0)')
+
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.rate, args.burst, args.retry_after, args.latency, args.words, args.batch_missing)
+    try:
+        while True:
+            time.sleep(10)
+            logger.info(f"Stats: {server.stats.to_dict()}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
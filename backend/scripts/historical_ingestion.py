@@ -12,7 +12,8 @@ from datetime import datetime, timedelta
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app
-from app.models import db, Company, Transcript
+from app.models import Company
+from app.services.backfill_engine import BackfillEngine
 from app.services.earnings_call_client import EarningsCallClient
 from app.services.data_collector import DataCollector
 from config.config import get_config
@@ -30,8 +31,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def ingest_historical_data(years_back=2):
-    """Ingest historical earnings call data for all tracked companies"""
+def ingest_historical_data(years_back=2, workers=None, commit_every=None, run_name='historical',
+                           replan=False, max_companies=None):
+    """Ingest historical earnings call data for all tracked companies
+    
+    Progress is checkpointed per transcript, so running again with the same
+    run name resumes where an interrupted run stopped.
+    """
     logger.info(f"Starting historical data ingestion for the past {years_back} years")
     
     # Create Flask app context
@@ -41,6 +47,14 @@ def ingest_historical_data(years_back=2):
         config = get_config()
         earnings_client = EarningsCallClient(config=config)
         collector = DataCollector(earnings_client=earnings_client, config=config)
+        engine = BackfillEngine(
+            earnings_client,
+            collector.sentiment_analyzer,
+            config,
+            run_name=run_name,
+            workers=workers,
+            commit_every=commit_every
+        )
         
         # First, update the company list
         logger.info("Updating company list...")
@@ -48,110 +62,34 @@ def ingest_historical_data(years_back=2):
         logger.info(f"Updated {updated} companies")
         
         # Get all tracked companies
-        companies = Company.query.filter_by(earnings_call_has_transcripts=True).all()
+        query = Company.query.filter_by(earnings_call_has_transcripts=True).order_by(Company.ticker)
+        if max_companies:
+            query = query.limit(max_companies)
+        companies = query.all()
         logger.info(f"Found {len(companies)} companies to process")
         
         # Calculate date range
         end_date = datetime.now()
         start_date = end_date - timedelta(days=365 * years_back)
         
-        total_transcripts = 0
-        total_processed = 0
-        failed_companies = []
+        pending = engine.plan(companies, start_date, replan=replan)
+        result = engine.run(pending)
         
-        # Process each company
-        for i, company in enumerate(companies, 1):
-            logger.info(f"Processing {i}/{len(companies)}: {company.ticker} - {company.name}")
-            
-            try:
-                # Get available transcripts for this company
-                available_transcripts = earnings_client.get_available_transcripts(company.ticker)
-                
-                if not available_transcripts:
-                    logger.warning(f"No transcripts available for {company.ticker}")
-                    continue
-                
-                company_transcripts = 0
-                
-                for transcript_meta in available_transcripts:
-                    try:
-                        # Check if transcript is within our date range
-                        transcript_date = transcript_meta.get('date')
-                        if transcript_date:
-                            try:
-                                t_date = datetime.fromisoformat(transcript_date.replace('Z', '+00:00'))
-                                if t_date < start_date:
-                                    continue  # Skip transcripts older than our range
-                            except:
-                                pass
-                        
-                        year = transcript_meta.get('year')
-                        quarter = transcript_meta.get('quarter')
-                        
-                        if not year or not quarter:
-                            continue
-                        
-                        # Check if we already have this transcript
-                        exists = Transcript.query.filter_by(
-                            company_id=company.id,
-                            fiscal_year=year,
-                            fiscal_quarter=quarter
-                        ).first()
-                        
-                        if exists:
-                            logger.debug(f"Transcript already exists: {company.ticker} {year}Q{quarter}")
-                            continue
-                        
-                        # Fetch the full transcript
-                        logger.info(f"Fetching transcript: {company.ticker} {year}Q{quarter}")
-                        full_transcript = earnings_client.get_transcript(company.ticker, year, quarter)
-                        
-                        if full_transcript:
-                            # Process the transcript
-                            full_transcript['company_id'] = company.id
-                            processed = collector.process_transcripts([full_transcript])
-                            
-                            if processed:
-                                # Run sentiment analysis
-                                analyses = collector.analyze_transcripts(processed)
-                                company_transcripts += 1
-                                total_transcripts += 1
-                                
-                                logger.info(f"Successfully processed {company.ticker} {year}Q{quarter}")
-                            else:
-                                logger.warning(f"Failed to process {company.ticker} {year}Q{quarter}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing transcript: {str(e)}")
-                        continue
-                
-                logger.info(f"Processed {company_transcripts} transcripts for {company.ticker}")
-                total_processed += 1
-                
-                # Generate trend analysis for this company
-                try:
-                    trend_result = collector.trend_analyzer.analyze_company_trend(company.id)
-                    if trend_result:
-                        collector.trend_analyzer.save_trend_analysis(trend_result)
-                        logger.info(f"Generated trend analysis for {company.ticker}")
-                except Exception as e:
-                    logger.error(f"Failed to generate trend analysis for {company.ticker}: {str(e)}")
-                
-            except Exception as e:
-                logger.error(f"Failed to process company {company.ticker}: {str(e)}")
-                failed_companies.append(company.ticker)
-                continue
+        # Generate trend analysis for every company that got new transcripts
+        collector.generate_trend_analyses(company_ids=result['company_ids'])
         
         logger.info("="*50)
         logger.info(f"Historical ingestion completed!")
-        logger.info(f"Total companies processed: {total_processed}/{len(companies)}")
-        logger.info(f"Total transcripts ingested: {total_transcripts}")
+        logger.info(f"Total transcripts ingested: {result['ingested']}/{result['planned']}")
+        logger.info(f"Checkpoints: {result['checkpoints']}")
+        logger.info(f"Pipeline: {result['pipeline']}")
+        logger.info(f"Fetch requests: {result['fetch_requests']}")
         
-        if failed_companies:
-            logger.warning(f"Failed companies: {', '.join(failed_companies)}")
+        if result['failed']:
+            logger.warning(f"{result['failed']} transcripts failed; run again to retry them")
         
         # Generate initial monthly report if we have data
-        if total_transcripts > 0:
+        if result['ingested'] > 0:
             try:
                 logger.info("Generating initial monthly report...")
                 trends = collector.generate_trend_analyses()
@@ -178,15 +116,42 @@ def main():
         action='store_true',
         help='Test mode - only process first 5 companies'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Threads listing companies\' transcripts (default: BACKFILL_WORKERS)'
+    )
+    parser.add_argument(
+        '--commit-every',
+        type=int,
+        default=None,
+        help='Transcripts stored per database commit (default: INGEST_COMMIT_EVERY)'
+    )
+    parser.add_argument(
+        '--run-name',
+        default='historical',
+        help='Checkpoint run to resume or start (default: historical)'
+    )
+    parser.add_argument(
+        '--replan',
+        action='store_true',
+        help='List available transcripts again instead of resuming the saved plan'
+    )
     
     args = parser.parse_args()
     
     if args.test:
         logger.info("Running in test mode - will only process first 5 companies")
-        # Temporarily limit companies in test mode
-        # This would be implemented in the ingest_historical_data function
     
-    ingest_historical_data(years_back=args.years)
+    ingest_historical_data(
+        years_back=args.years,
+        workers=args.workers,
+        commit_every=args.commit_every,
+        run_name=args.run_name,
+        replan=args.replan,
+        max_companies=5 if args.test else None
+    )
 
 
 if __name__ == '__main__':
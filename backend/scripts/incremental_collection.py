@@ -0,0 +1,52 @@
+"""Incremental Collection Script
+
+Collects the transcripts released since the last run's watermark and updates
+the trends of the companies they belong to. Cheap enough to run from cron
+every hour, e.g.:
+
+    0 * * * * cd /path/to/backend && python scripts/incremental_collection.py
+"""
+import os
+import sys
+import json
+import logging
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.services.data_collector import DataCollector
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Collect transcripts released since the last run')
+    parser.add_argument(
+        '--exchange',
+        default='nasdaq',
+        help='Exchange to collect (default: nasdaq)'
+    )
+
+    args = parser.parse_args()
+
+    app = create_app(os.environ.get('FLASK_ENV', 'development'))
+    with app.app_context():
+        results = DataCollector().run_incremental_collection(exchange=args.exchange)
+
+    print(json.dumps(results, indent=2, default=str))
+    if results['status'] != 'completed':
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
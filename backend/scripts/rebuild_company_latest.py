@@ -0,0 +1,50 @@
+"""Rebuild the company_latest Summary Table
+
+Recomputes every company's latest transcript, sentiment and trend from the
+source tables in one transaction. Ingestion and trend writers keep the
+table current, so this is only needed after creating it on an existing
+database or after editing the source tables by hand.
+"""
+import os
+import sys
+import time
+import logging
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.models import db, CompanyLatest
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rebuild company_latest from transcripts and trend analyses')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Companies recomputed per query (default: 500)')
+    args = parser.parse_args()
+
+    app = create_app(os.environ.get('FLASK_ENV', 'development'))
+    with app.app_context():
+        start = time.time()
+        try:
+            written = CompanyLatest.rebuild(chunk_size=args.chunk_size)
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Rebuild failed: {str(e)}")
+            db.session.rollback()
+            sys.exit(1)
+        logger.info(f"Rebuilt {written} company_latest rows in {time.time() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
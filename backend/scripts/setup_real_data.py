@@ -12,7 +12,7 @@ from typing import Dict, Any
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app
-from app.models import db, Company, Transcript, SentimentAnalysis
+from app.models import db, Company, CompanyLatest, Transcript, SentimentAnalysis
 from app.services.earnings_call_client import EarningsCallClient
 from app.services.data_collector import DataCollector
 from config.config import get_config
@@ -252,6 +252,7 @@ def fetch_historical_data():
                     logger.warning(f"Could not fetch {company.ticker} {year}Q{quarter}: {str(e)}")
                     continue
         
+        CompanyLatest.refresh(company.id for company in companies)
         db.session.commit()
         logger.info(f"Successfully loaded {results['transcripts']} historical transcripts")
         return results
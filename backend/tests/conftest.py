@@ -0,0 +1,25 @@
+"""Shared pytest fixtures"""
+import os
+import sys
+
+import pytest
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# No on-disk caches from test runs; set before config is first imported
+os.environ.setdefault('API_CACHE_PATH', '')
+os.environ.setdefault('FINBERT_CACHE_PATH', '')
+
+from app import create_app
+from app.models import db
+
+
+@pytest.fixture
+def app():
+    """App on a fresh in-memory database, with an app context pushed"""
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
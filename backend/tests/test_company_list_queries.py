@@ -0,0 +1,28 @@
+"""/api/companies query count"""
+from app.models import db, Company
+from scripts.benchmark_company_list import MAX_QUERIES_PER_PAGE, counting_statements, seed
+
+
+def test_company_list_runs_constant_queries_whatever_the_page_size(app):
+    seed(companies=120, quarters=3, trends=2)
+    client = app.test_client()
+
+    counts = {}
+    for per_page in (10, 50, 100):
+        with counting_statements(db.engine) as statements:
+            response = client.get(f'/api/companies?per_page={per_page}')
+        assert response.status_code == 200
+        assert len(response.get_json()['companies']) == per_page
+        counts[per_page] = len(statements)
+
+    assert len(set(counts.values())) == 1, counts
+    assert counts[100] <= MAX_QUERIES_PER_PAGE
+
+
+def test_company_list_matches_per_company_payloads(app):
+    seed(companies=30, quarters=3, trends=4)
+    payload = app.test_client().get('/api/companies?per_page=30').get_json()
+
+    db.session.expire_all()
+    for company_data in payload['companies']:
+        assert company_data == db.session.get(Company, company_data['id']).to_dict(include_latest=True)
@@ -0,0 +1,30 @@
+"""DiskLRUCache size caps"""
+import json
+import sqlite3
+
+from app.services.disk_cache import DiskLRUCache
+
+
+def test_byte_cap_evicts_least_recently_used_entries(tmp_path):
+    cache = DiskLRUCache(str(tmp_path / 'cache.sqlite'), max_bytes=100_000)
+    for index in range(50):
+        cache.set(f'key{index}', 'x' * 10_000)
+        if index == 5:
+            cache.get('key0')
+
+    keys = {key for key, _ in cache.items()}
+    assert cache.total_bytes() <= 100_000 + 100_000 // 20
+    assert 'key49' in keys and 'key0' not in keys and 'key1' not in keys
+
+
+def test_sizes_are_backfilled_for_files_without_them(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed INTEGER NOT NULL)')
+    conn.execute('INSERT INTO entries VALUES (?, ?, 1)', ('old', json.dumps('x' * 1000)))
+    conn.commit()
+    conn.close()
+
+    cache = DiskLRUCache(path, max_bytes=100_000)
+    assert cache.total_bytes() == len(json.dumps('x' * 1000))
+    assert cache.get('old') == 'x' * 1000
@@ -0,0 +1,50 @@
+"""RealDataCollector writes"""
+import asyncio
+
+from app.models import db, Alert, Company, SentimentAnalysis, Transcript
+from app.services.batch_writer import BatchWriter
+from app.services.real_data_collector import RealDataCollector
+from config.config import TestingConfig
+
+CONTENT = (
+    "CEO: We expect revenue to grow strongly through the rest of the year. "
+    "Our guidance is raised on strong demand for the launch. "
+    "CFO: Revenue increased 40% year over year on the back of new patients."
+)
+
+
+def test_high_sentiment_transcript_is_written_with_its_alerts(app):
+    company = Company(ticker='HIGH', name='High Sentiment Co')
+    db.session.add(company)
+    db.session.commit()
+
+    collector = RealDataCollector(config=TestingConfig())
+    cleaned = collector._clean_transcript_text(CONTENT)
+    quote_count = len(collector._find_quote_texts(cleaned))
+    assert quote_count >= 2
+
+    transcript_data = {
+        'company_id': company.id,
+        'symbol': 'HIGH',
+        'year': 2025,
+        'quarter': 1,
+        'date': '2025-04-30',
+        'content': CONTENT
+    }
+    with BatchWriter() as writer:
+        processed = asyncio.run(collector._process_transcript_with_enhancement(
+            transcript_data,
+            cleaned_content=cleaned,
+            sentiment_result={'overall_sentiment': 0.8, 'confidence': 0.7},
+            quote_sentiments=[{'overall_sentiment': 0.6}] * quote_count,
+            writer=writer
+        ))
+
+    assert processed is not None
+    assert writer.failures == {}
+    assert Transcript.query.count() == 1
+    assert SentimentAnalysis.query.one().overall_sentiment == 0.8
+
+    alert = Alert.query.filter_by(alert_type='significant_sentiment_change').one()
+    assert alert.severity == 'high'
+    assert [quote['text'] for quote in alert.data['key_quotes']] == [quote.text for quote in processed['quotes'][:2]]
@@ -70,6 +70,9 @@ class Config:
     
     # API settings
     FMP_API_KEY = os.getenv('FMP_API_KEY', '9a835ed8bbff501bf036a6f843d5a6fe')
+    
+    # FinBERT backend: 'torch' (fp32) or 'torch_int8' (dynamic quantization, CPU)
+    FINBERT_BACKEND = os.getenv('FINBERT_BACKEND', 'torch')
 
 
 # In-memory cache implementation
@@ -277,8 +280,13 @@ class SentimentAnalyzer:
             logger.info("Loading FinBERT model...")
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
             self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            self.model.eval()
+            if Config.FINBERT_BACKEND == 'torch_int8':
+                self.model = torch.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
             self.model_loaded = True
-            logger.info("FinBERT model loaded successfully")
+            logger.info(f"FinBERT model loaded successfully ({Config.FINBERT_BACKEND} backend)")
         except Exception as e:
             logger.error(f"Error loading FinBERT model: {e}")
             self.tokenizer = None